@@ -1,17 +1,21 @@
-# agents/__init__.py
 """
 Moduł agentów AgileFlow.
-Eksportuje node functions do użycia w LangGraph.
+Eksportuje node functions do użycia w LangGraph (sync i async).
 """
 
-from agents.product_owner import product_owner_node
-from agents.architect import architect_node
-from agents.developer import developer_node
-from agents.qa import qa_node
+from agents.product_owner import product_owner_node, aproduct_owner_node
+from agents.architect import architect_node, aarchitect_node
+from agents.developer import developer_node, adeveloper_node
+from agents.qa import qa_node, aqa_node, get_qa_stats
 
 __all__ = [
     "product_owner_node",
     "architect_node",
     "developer_node",
-    "qa_node"
-]
+    "qa_node",
+    "aproduct_owner_node",
+    "aarchitect_node",
+    "adeveloper_node",
+    "aqa_node",
+    "get_qa_stats"
+]
\ No newline at end of file
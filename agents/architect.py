@@ -4,12 +4,14 @@ Agent Architekt.
 Projektuje strukturę plików projektu z wykorzystaniem RAG.
 """
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List
 from agents.base import BaseAgent
 from core.state import ProjectState
 from prompts import ARCHITECT_PROMPT
 from services.vector_store_service import vector_store_service
 from config import settings
+from utils.token_budget import PromptSection, SECTION_LOW, SECTION_HIGH, SECTION_REQUIRED
 
 
 class ArchitectAgent(BaseAgent):
@@ -18,6 +20,9 @@ class ArchitectAgent(BaseAgent):
     Korzysta z RAG do wyszukiwania podobnych projektów jako inspiracji.
     """
     
+    # Kontekst RAG jest częścią promptu, więc zmiana bazy daje nowy klucz cache
+    use_cache = True
+    
     @property
     def name(self) -> str:
         return "Architect"
@@ -42,7 +47,8 @@ class ArchitectAgent(BaseAgent):
         Returns:
             Sformatowany kontekst lub pusty string
         """
-        similar = vector_store_service.search_similar(query, k=8)
+        # Wyszukiwanie hybrydowe z rerankingiem - do promptu idą tylko najlepsze chunki
+        similar = vector_store_service.search_similar(query, k=settings.rag_prompt_chunks)
         
         if not similar:
             self.logger.debug("Brak podobnych projektów w RAG")
@@ -50,38 +56,41 @@ class ArchitectAgent(BaseAgent):
         
         context = "\n\nISTNIEJĄCE PODOBNE PROJEKTY (użyj jako inspiracja):\n"
         
-        for item in similar[:5]:
-            content_preview = item['content'][:1500]
-            context += f"\n=== {item['project']} / {item['filename']} ===\n{content_preview}\n"
+        for item in similar:
+            # Chunki są ograniczone przez rag_chunk_chars i cięte na granicach definicji
+            symbols = f" ({item['symbols']})" if item.get("symbols") else ""
+            context += f"\n=== {item['project']} / {item['filename']}{symbols} ===\n{item['content']}\n"
         
         self.logger.info(f"Znaleziono {len(similar)} podobnych projektów w RAG")
         return context
     
-    def process(self, state: ProjectState) -> Dict[str, Any]:
-        """
-        Projektuje strukturę plików na podstawie specyfikacji.
-        
-        Args:
-            state: Stan z requirements
-        
-        Returns:
-            Dict z tech_stack i logs
-        """
+    def _build_user_message(self, state: ProjectState, rag_context: str) -> List[PromptSection]:
+        """Buduje wiadomość do LLM ze specyfikacji i kontekstu RAG."""
         requirements = state.get("requirements", "")
-        user_request = state.get("user_request", "")
-        
-        # Buduj zapytanie RAG
-        rag_query = f"{user_request}\n{requirements}"
-        rag_context = self._build_rag_context(rag_query)
-        
-        user_message = f"""Specyfikacja techniczna od Tech Leada:
-{requirements if requirements else 'Brak specyfikacji'}
-{rag_context}
-Na podstawie powyższego zaprojektuj strukturę plików.
-Podaj krótki opis projektu, listę plików z opisami i na samym końcu dokładnie jeden czysty blok JSON z listą nazw plików."""
-        
-        response = self.invoke(user_message)
         
+        return [
+            PromptSection(
+                "requirements",
+                f"Specyfikacja techniczna od Tech Leada:\n{requirements if requirements else 'Brak specyfikacji'}",
+                priority=SECTION_HIGH
+            ),
+            # Kontekst RAG jest tylko inspiracją - przycinany jako pierwszy
+            PromptSection("rag_context", rag_context, priority=SECTION_LOW),
+            PromptSection(
+                "instructions",
+                "Na podstawie powyższego zaprojektuj strukturę plików.\n"
+                "Podaj krótki opis projektu, listę plików z opisami i na samym końcu "
+                "dokładnie jeden czysty blok JSON z listą nazw plików.",
+                priority=SECTION_REQUIRED
+            ),
+        ]
+    
+    def _build_rag_query(self, state: ProjectState) -> str:
+        """Buduje zapytanie RAG z żądania użytkownika i specyfikacji."""
+        return f"{state.get('user_request', '')}\n{state.get('requirements', '')}"
+    
+    def _build_result(self, response) -> Dict[str, Any]:
+        """Zamienia odpowiedź LLM na aktualizację stanu."""
         if response is None:
             return {
                 "tech_stack": "",
@@ -94,6 +103,32 @@ Podaj krótki opis projektu, listę plików z opisami i na samym końcu dokładn
             "tech_stack": response.content,
             "logs": ["Architekt zaprojektował strukturę z wykorzystaniem RAG"]
         }
+    
+    def process(self, state: ProjectState) -> Dict[str, Any]:
+        """
+        Projektuje strukturę plików na podstawie specyfikacji.
+        
+        Args:
+            state: Stan z requirements
+        
+        Returns:
+            Dict z tech_stack i logs
+        """
+        rag_context = self._build_rag_context(self._build_rag_query(state))
+        user_message = self._build_user_message(state, rag_context)
+        
+        response = self.invoke(user_message)
+        return self._build_result(response)
+    
+    async def aprocess(self, state: ProjectState) -> Dict[str, Any]:
+        """Asynchroniczna wersja process() - wyszukiwanie RAG w wątku."""
+        rag_context = await asyncio.to_thread(
+            self._build_rag_context, self._build_rag_query(state)
+        )
+        user_message = self._build_user_message(state, rag_context)
+        
+        response = await self.ainvoke(user_message)
+        return self._build_result(response)
 
 
 # Instancja dla LangGraph node
@@ -102,4 +137,9 @@ _agent = ArchitectAgent()
 
 def architect_node(state: ProjectState) -> Dict[str, Any]:
     """Node function dla LangGraph."""
-    return _agent(state)
\ No newline at end of file
+    return _agent(state)
+
+
+async def aarchitect_node(state: ProjectState) -> Dict[str, Any]:
+    """Async node function dla LangGraph (nie blokuje event loopa)."""
+    return await _agent.acall(state)
\ No newline at end of file
@@ -4,12 +4,18 @@ Klasa bazowa dla wszystkich agentów.
 Wspólna logika: inicjalizacja LLM, budowanie promptów, obsługa błędów.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Union
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
-from services.llm_service import llm_service
+from config import settings
+from services.llm_service import llm_service, DegenerateOutputError, PRIORITY_NORMAL
 from core.state import ProjectState
 from utils.logger import get_agent_logger
+from utils.token_budget import PromptSection, TokenBudget, estimate_tokens
+
+# Wiadomość do LLM: gotowy tekst albo sekcje z priorytetami przycinania
+UserMessage = Union[str, List[PromptSection]]
 
 
 class BaseAgent(ABC):
@@ -20,8 +26,19 @@ class BaseAgent(ABC):
     - name: nazwa agenta
     - system_prompt: prompt systemowy
     - process(): logika przetwarzania
+    
+    Opcjonalnie aprocess(): natywna ścieżka async (domyślnie process() w wątku).
     """
     
+    # Czy odpowiedzi agenta mogą pochodzić z cache LLM (opt-in per agent)
+    use_cache: bool = False
+    
+    # Priorytet w schedulerze LLM (krótkie wywołania przed długimi generacjami)
+    priority: int = PRIORITY_NORMAL
+    
+    # Spodziewana długość odpowiedzi - na jej podstawie dobierany jest num_ctx
+    expected_output_tokens: int = 1024
+    
     def __init__(
         self,
         model_name: Optional[str] = None,
@@ -61,29 +78,96 @@ class BaseAgent(ABC):
             )
         return self._llm
     
-    def build_messages(self, user_message: str) -> List[BaseMessage]:
+    def output_reserve(self, expected_output_tokens: Optional[int] = None) -> int:
+        """
+        Ile tokenów kontekstu zarezerwować na odpowiedź.
+        
+        Args:
+            expected_output_tokens: Nadpisuje self.expected_output_tokens
+        
+        Returns:
+            Spodziewana długość odpowiedzi, nie mniej niż llm_output_reserve
+            i nie więcej niż llm_num_predict (TokenBudget ogranicza do pół num_ctx)
+        """
+        expected = expected_output_tokens or self.expected_output_tokens
+        return min(settings.llm_num_predict, max(settings.llm_output_reserve, expected))
+    
+    def build_messages(
+        self,
+        user_message: UserMessage,
+        system_prompt: Optional[str] = None,
+        expected_output_tokens: Optional[int] = None
+    ) -> List[BaseMessage]:
         """
         Tworzy listę wiadomości do LLM.
         Używa bezpośrednich Message obiektów zamiast template,
         żeby uniknąć problemów z {} w kodzie.
         
+        Prompt jest dopasowywany do num_ctx: rezerwuje miejsce na odpowiedź
+        i przycina sekcje o najniższym priorytecie (RAG, feedback).
+        Rezerwa to spodziewana długość odpowiedzi (co najmniej
+        llm_output_reserve, najwyżej pół kontekstu) - llm_service przycina
+        num_predict do miejsca, które faktycznie zostało po prompcie.
+        
         Args:
-            user_message: Wiadomość użytkownika
+            user_message: Wiadomość użytkownika (tekst lub lista PromptSection)
+            system_prompt: Nadpisuje self.system_prompt (np. etapy review QA)
+            expected_output_tokens: Nadpisuje self.expected_output_tokens
         
         Returns:
             Lista wiadomości
         """
+        system_prompt = system_prompt or self.system_prompt
+        
+        if isinstance(user_message, str):
+            user_message = [PromptSection("user_message", user_message)]
+        
+        budget = TokenBudget(
+            num_ctx=settings.llm_num_ctx,
+            output_reserve=self.output_reserve(expected_output_tokens)
+        )
+        sections, report = budget.fit(
+            user_message,
+            fixed_tokens=estimate_tokens(system_prompt)
+        )
+        
+        if report.trimmed or not report.fits:
+            self.logger.warning(f"Budżet: {report.summary()}")
+        else:
+            self.logger.info(f"Budżet: {report.summary()}")
+        
         return [
-            SystemMessage(content=self.system_prompt),
-            HumanMessage(content=user_message)
+            SystemMessage(content=system_prompt),
+            HumanMessage(content="\n".join(section.content for section in sections))
         ]
     
-    def invoke(self, user_message: str) -> Optional[BaseMessage]:
+    def _log_usage(self, response: BaseMessage) -> None:
+        """Loguje użycie tokenów jeśli dostępne."""
+        if hasattr(response, 'response_metadata'):
+            metadata = response.response_metadata
+            input_tokens = metadata.get("prompt_eval_count", "?")
+            output_tokens = metadata.get("eval_count", "?")
+            self.logger.debug(f"Tokeny: input={input_tokens}, output={output_tokens}")
+    
+    def _resolve_cache(self, use_cache: Optional[bool]) -> bool:
+        """Ustawienie per wywołanie ma pierwszeństwo nad domyślnym agenta."""
+        return self.use_cache if use_cache is None else use_cache
+    
+    def invoke(
+        self,
+        user_message: UserMessage,
+        use_cache: Optional[bool] = None,
+        expected_output_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None
+    ) -> Optional[BaseMessage]:
         """
         Wywołuje LLM z obsługą błędów.
         
         Args:
             user_message: Wiadomość do LLM
+            use_cache: Nadpisuje self.use_cache (False = pomiń cache)
+            expected_output_tokens: Nadpisuje self.expected_output_tokens
+            system_prompt: Nadpisuje self.system_prompt
         
         Returns:
             Odpowiedź LLM lub None
@@ -91,22 +175,109 @@ class BaseAgent(ABC):
         self.logger.info("Rozpoczynam przetwarzanie...")
         
         try:
-            messages = self.build_messages(user_message)
-            response = self.llm.invoke(messages)
-            
-            # Loguj użycie tokenów jeśli dostępne
-            if hasattr(response, 'response_metadata'):
-                metadata = response.response_metadata
-                input_tokens = metadata.get("prompt_eval_count", "?")
-                output_tokens = metadata.get("eval_count", "?")
-                self.logger.debug(f"Tokeny: input={input_tokens}, output={output_tokens}")
+            messages = self.build_messages(user_message, system_prompt, expected_output_tokens)
+            response = llm_service.invoke(
+                self.llm,
+                messages,
+                use_cache=self._resolve_cache(use_cache),
+                priority=self.priority,
+                expected_output_tokens=expected_output_tokens or self.expected_output_tokens
+            )
+            self._log_usage(response)
+            return response
             
+        except Exception as e:
+            self.logger.error(f"Błąd wywołania LLM: {e}")
+            raise
+    
+    async def ainvoke(
+        self,
+        user_message: UserMessage,
+        use_cache: Optional[bool] = None,
+        expected_output_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None
+    ) -> Optional[BaseMessage]:
+        """
+        Asynchroniczne wywołanie LLM - nie blokuje event loopa Chainlit,
+        więc wiele sesji może działać równolegle w jednym procesie.
+        
+        Args:
+            user_message: Wiadomość do LLM
+            use_cache: Nadpisuje self.use_cache (False = pomiń cache)
+            expected_output_tokens: Nadpisuje self.expected_output_tokens
+            system_prompt: Nadpisuje self.system_prompt
+        
+        Returns:
+            Odpowiedź LLM lub None
+        """
+        self.logger.info("Rozpoczynam przetwarzanie (async)...")
+        
+        try:
+            messages = self.build_messages(user_message, system_prompt, expected_output_tokens)
+            response = await llm_service.ainvoke(
+                self.llm,
+                messages,
+                use_cache=self._resolve_cache(use_cache),
+                priority=self.priority,
+                expected_output_tokens=expected_output_tokens or self.expected_output_tokens
+            )
+            self._log_usage(response)
             return response
             
         except Exception as e:
             self.logger.error(f"Błąd wywołania LLM: {e}")
             raise
     
+    async def astream(
+        self,
+        user_message: UserMessage,
+        use_cache: Optional[bool] = None,
+        expected_output_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        repeat_penalty: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streamuje odpowiedź LLM token po tokenie (async).
+        
+        Args:
+            user_message: Wiadomość do LLM
+            use_cache: Nadpisuje self.use_cache (False = pomiń cache)
+            expected_output_tokens: Nadpisuje self.expected_output_tokens
+            system_prompt: Nadpisuje self.system_prompt
+            repeat_penalty: Kara za powtórzenia (ponowienie po zapętleniu)
+        
+        Yields:
+            Kolejne fragmenty tekstu odpowiedzi (aclose() przerywa generację)
+        
+        Raises:
+            DegenerateOutputError: Gdy model wpadł w pętlę i stream został przerwany
+        """
+        self.logger.info("Rozpoczynam przetwarzanie (stream)...")
+        
+        try:
+            messages = self.build_messages(user_message, system_prompt, expected_output_tokens)
+            stream = llm_service.astream(
+                self.llm,
+                messages,
+                use_cache=self._resolve_cache(use_cache),
+                priority=self.priority,
+                expected_output_tokens=expected_output_tokens or self.expected_output_tokens,
+                repeat_penalty=repeat_penalty
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.content:
+                        yield chunk.content
+            finally:
+                await stream.aclose()
+            
+        except DegenerateOutputError:
+            # Zalogowane przez llm_service - decyzję o ponowieniu podejmuje agent
+            raise
+        except Exception as e:
+            self.logger.error(f"Błąd streamingu LLM: {e}")
+            raise
+    
     @abstractmethod
     def process(self, state: ProjectState) -> Dict[str, Any]:
         """
@@ -131,3 +302,30 @@ class BaseAgent(ABC):
             Aktualizacje stanu
         """
         return self.process(state)
+    
+    async def aprocess(self, state: ProjectState) -> Dict[str, Any]:
+        """
+        Asynchroniczna wersja process().
+        
+        Domyślnie uruchamia process() w wątku, żeby nie blokować event loopa.
+        Agenci nadpisują tę metodę natywną implementacją opartą o ainvoke().
+        
+        Args:
+            state: Aktualny stan projektu
+        
+        Returns:
+            Słownik z aktualizacjami stanu
+        """
+        return await asyncio.to_thread(self.process, state)
+    
+    async def acall(self, state: ProjectState) -> Dict[str, Any]:
+        """
+        Asynchroniczny odpowiednik __call__ (async node w LangGraph).
+        
+        Args:
+            state: Stan projektu
+        
+        Returns:
+            Aktualizacje stanu
+        """
+        return await self.aprocess(state)
@@ -4,13 +4,45 @@ Agent Developer.
 Generuje kompletny kod dla każdego pliku z listy Architekta.
 """
 
-from typing import Dict, Any, List
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from langgraph.config import get_stream_writer
 from agents.base import BaseAgent
+from services.llm_service import DegenerateOutputError, PRIORITY_LOW
 from core.state import ProjectState
 from prompts import DEVELOPER_PROMPT
-from services.file_service import file_service
-from utils.parsers import parse_code_blocks, extract_file_list
+from services.file_service import FileService, get_file_service
+from services.code_checker import code_checker
+from utils.code_checks import Diagnostic, SEVERITY_ERROR
+from utils.parsers import (
+    parse_code_blocks, extract_file_list, extract_signatures, find_mentioned_files,
+    StreamingCodeBlockParser
+)
 from config import settings
+from utils.token_budget import (
+    PromptSection, SECTION_LOW, SECTION_NORMAL, SECTION_HIGH, SECTION_REQUIRED, estimate_tokens
+)
+
+# Callback (filename, content) dla plików gotowych w trakcie streamingu
+FileCallback = Callable[[str, str], None]
+
+# Szacowana długość nowego pliku tworzonego w iteracji fix
+NEW_FILE_TOKENS = 1024
+
+
+@dataclass
+class StreamedGeneration:
+    """Wynik streamowanej generacji (także przerwanej po błędzie krytycznym lub zapętleniu)."""
+    text: str = ""
+    generated_code: Dict[str, str] = field(default_factory=dict)
+    save_results: Dict[str, bool] = field(default_factory=dict)
+    aborted_on: Optional[str] = None
+    degenerated: Optional[str] = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    tokens_saved: int = 0
 
 
 class DeveloperAgent(BaseAgent):
@@ -19,6 +51,12 @@ class DeveloperAgent(BaseAgent):
     Obsługuje zarówno pierwszą implementację jak i poprawki po QA.
     """
     
+    # Najdłuższe generacje - ustępują miejsca krótkim wywołaniom innych agentów
+    priority = PRIORITY_LOW
+    
+    # Cały projekt w jednej odpowiedzi - potrzebny pełny limit num_predict
+    expected_output_tokens = settings.llm_num_predict
+    
     @property
     def name(self) -> str:
         return "Developer"
@@ -32,6 +70,7 @@ class DeveloperAgent(BaseAgent):
             model_name=settings.model_reasoning,
             temperature=0.2
         )
+        self._stats = {"aborts": 0, "tokens_saved": 0, "degenerate_retries": 0}
     
     def _build_file_list_str(self, file_list: List[str]) -> str:
         """Formatuje listę plików do promptu."""
@@ -60,85 +99,404 @@ NAPRAW DOKŁADNIE TO CO WSKAZALI POWYŻEJ.
             return []
         return [f for f in file_list if f not in generated]
     
-    def process(self, state: ProjectState) -> Dict[str, Any]:
-        """
-        Generuje kod dla wszystkich plików z listy Architekta.
-        
-        Args:
-            state: Stan z tech_stack, requirements, qa_feedback
-        
-        Returns:
-            Dict z generated_code i logs
-        """
-        # Pobierz listę plików od Architekta
-        tech_stack = state.get("tech_stack", "")
-        file_list = extract_file_list(tech_stack)
+    def _get_file_list(self, state: ProjectState) -> List[str]:
+        """Pobiera listę plików od Architekta."""
+        file_list = extract_file_list(state.get("tech_stack", ""))
         
         if file_list:
             self.logger.info(f"Lista plików: {file_list}")
         else:
             self.logger.warning("Architekt nie dostarczył listy plików")
         
-        # Buduj prompt
+        return file_list
+    
+    def _build_user_message(self, state: ProjectState, file_list: List[str]) -> List[PromptSection]:
+        """Buduje prompt dla LLM (sekcje z priorytetami dla budżetu tokenów)."""
         context = self._build_context(state)
         file_list_str = self._build_file_list_str(file_list)
         
-        user_message = f"""
-{context}
-
-SPECYFIKACJA:
-{state.get('requirements', '')}
-
-STRUKTURA PROJEKTU:
-{tech_stack}
-
-LISTA PLIKÓW DO WYGENEROWANIA:
-{file_list_str}
-
-Wygeneruj KOMPLETNY kod dla każdego pliku.
-Użyj formatu:
---- filename ---
-```language
-kod
-```
-"""
+        return [
+            # Feedback QA bywa długi - przy braku miejsca zostaje jego początek
+            PromptSection("context", f"\n{context}\n", priority=SECTION_LOW),
+            PromptSection(
+                "requirements",
+                f"SPECYFIKACJA:\n{state.get('requirements', '')}\n",
+                priority=SECTION_HIGH
+            ),
+            PromptSection(
+                "tech_stack",
+                f"STRUKTURA PROJEKTU:\n{state.get('tech_stack', '')}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection(
+                "file_list",
+                f"LISTA PLIKÓW DO WYGENEROWANIA:\n{file_list_str}\n",
+                priority=SECTION_REQUIRED
+            ),
+            PromptSection(
+                "instructions",
+                "Wygeneruj KOMPLETNY kod dla każdego pliku.\n"
+                "Użyj formatu:\n"
+                "--- filename ---\n"
+                "```language\n"
+                "kod\n"
+                "```\n",
+                priority=SECTION_REQUIRED
+            ),
+        ]
+    
+    def _describe_sibling(self, state: ProjectState, filename: str) -> str:
+        """
+        Interfejs innego pliku projektu: sygnatury z poprzedniej iteracji
+        albo opis pliku od Architekta (pierwsza implementacja).
+        """
+        previous = state.get("generated_code", {}).get(filename)
+        if previous:
+            return extract_signatures(filename, previous)
+        
+        for line in state.get("tech_stack", "").splitlines():
+            if filename in line and not line.strip().startswith(("[", "```")):
+                return line.strip()
+        
+        return "(brak opisu)"
+    
+    def _build_file_message(
+        self,
+        state: ProjectState,
+        filename: str,
+        file_list: List[str]
+    ) -> List[PromptSection]:
+        """Prompt generujący jeden plik (tryb równoległy)."""
+        siblings = "\n\n".join(
+            f"--- {other} ---\n{self._describe_sibling(state, other)}"
+            for other in file_list if other != filename
+        )
+        
+        return [
+            PromptSection("context", f"\n{self._build_context(state)}\n", priority=SECTION_LOW),
+            PromptSection(
+                "requirements",
+                f"SPECYFIKACJA:\n{state.get('requirements', '')}\n",
+                priority=SECTION_HIGH
+            ),
+            PromptSection(
+                "tech_stack",
+                f"STRUKTURA PROJEKTU:\n{state.get('tech_stack', '')}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection(
+                "siblings",
+                f"INTERFEJSY POZOSTAŁYCH PLIKÓW (generowane równolegle):\n{siblings}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection(
+                "instructions",
+                f"Wygeneruj KOMPLETNY kod TYLKO dla pliku: {filename}\n"
+                "Pozostałe pliki powstają równolegle - korzystaj wyłącznie z ich interfejsów powyżej.\n"
+                "Użyj formatu:\n"
+                f"--- {filename} ---\n"
+                "```language\n"
+                "kod\n"
+                "```\n",
+                priority=SECTION_REQUIRED
+            ),
+        ]
+    
+    def _pick_file(self, filename: str, raw_text: str) -> Optional[str]:
+        """Wyciąga kod wskazanego pliku z odpowiedzi (tryb per plik)."""
+        blocks = parse_code_blocks(raw_text)
+        
+        if filename in blocks:
+            return blocks[filename]
+        if len(blocks) == 1:
+            return next(iter(blocks.values()))
+        
+        self.logger.warning(f"Nie znaleziono kodu {filename} w odpowiedzi")
+        return None
+    
+    def _merge_file_results(
+        self,
+        file_list: List[str],
+        results: List[Any]
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Łączy wyniki generacji per plik w generated_code (kolejność Architekta).
         
-        # Wywołaj LLM
-        response = self.invoke(user_message)
+        Returns:
+            (połączone surowe odpowiedzi do debugowania, generated_code)
+        """
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+        
+        raw_parts = []
+        generated_code: Dict[str, str] = {}
+        
+        for filename, result in zip(file_list, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Generacja {filename} nieudana: {result}")
+                continue
+            
+            raw_text, code = result
+            raw_parts.append(raw_text)
+            if code:
+                generated_code[filename] = code
+        
+        return "\n\n".join(raw_parts), generated_code
+    
+    def _fix_targets(self, state: ProjectState, file_list: List[str]) -> Optional[List[str]]:
+        """
+        Pliki do poprawy w iteracji fix: wskazane w feedbacku QA + brakujące.
+        
+        Returns:
+            Lista plików lub None (pierwsza implementacja albo QA nie wskazało
+            konkretnych plików - wtedy pełna regeneracja)
+        """
+        previous = state.get("generated_code", {})
+        feedback = state.get("qa_feedback", "")
         
-        if response is None:
-            return {
-                "generated_code": {},
-                "logs": ["Developer: Błąd generowania kodu"]
-            }
+        if not settings.developer_incremental_fix or not previous or not feedback:
+            return None
+        if state.get("iteration_count", 0) == 0:
+            return None
         
-        # Parsuj odpowiedź
-        generated_code = parse_code_blocks(response.content)
+        known = list(dict.fromkeys(file_list + list(previous)))
+        targets = find_mentioned_files(feedback, known)
+        
+        if not targets:
+            self.logger.info("QA nie wskazało konkretnych plików - pełna regeneracja")
+            return None
+        
+        missing = [f for f in self._check_missing_files(file_list, previous) if f not in targets]
+        return targets + missing
+    
+    def _build_fix_message(self, state: ProjectState, targets: List[str]) -> List[PromptSection]:
+        """Prompt poprawki: obecny kod plików do zmiany + interfejsy pozostałych."""
+        previous = state.get("generated_code", {})
+        
+        current = "\n\n".join(
+            f"--- {f} ---\n```\n{previous[f]}\n```" if f in previous
+            else f"--- {f} ---\n(brak pliku - utwórz go)"
+            for f in targets
+        )
+        unchanged = "\n\n".join(
+            f"--- {f} ---\n{extract_signatures(f, content)}"
+            for f, content in previous.items() if f not in targets
+        )
+        
+        return [
+            PromptSection("context", f"\n{self._build_context(state)}\n", priority=SECTION_HIGH),
+            PromptSection(
+                "current_files",
+                f"PLIKI DO POPRAWY (obecna wersja):\n{current}\n",
+                priority=SECTION_HIGH,
+                keep="middle"
+            ),
+            PromptSection(
+                "unchanged",
+                f"POZOSTAŁE PLIKI (bez zmian, tylko interfejsy):\n{unchanged or '(brak)'}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection(
+                "requirements",
+                f"SPECYFIKACJA:\n{state.get('requirements', '')}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection(
+                "tech_stack",
+                f"STRUKTURA PROJEKTU:\n{state.get('tech_stack', '')}\n",
+                priority=SECTION_LOW
+            ),
+            PromptSection(
+                "instructions",
+                f"Zwróć TYLKO poprawione pliki: {', '.join(targets)}\n"
+                "Pozostałe pliki zostają bez zmian - NIE generuj ich ponownie.\n"
+                "Każdy zwrócony plik podaj w CAŁOŚCI, w formacie:\n"
+                "--- filename ---\n"
+                "```language\n"
+                "kod\n"
+                "```\n",
+                priority=SECTION_REQUIRED
+            ),
+        ]
+    
+    def _fix_output_tokens(self, state: ProjectState, targets: List[str]) -> int:
+        """Oczekiwana długość odpowiedzi - proporcjonalna do poprawianych plików."""
+        previous = state.get("generated_code", {})
+        sizes = [
+            estimate_tokens(previous[f]) if f in previous else NEW_FILE_TOKENS
+            for f in targets
+        ]
+        # Zapas na nagłówki bloków i poprawki wydłużające plik
+        return min(settings.llm_num_predict, int(sum(sizes) * 1.2) + 256)
+    
+    def _file_request(
+        self,
+        state: ProjectState,
+        filename: str,
+        file_list: List[str],
+        fix: bool
+    ) -> Tuple[List[PromptSection], Optional[int]]:
+        """Prompt i oczekiwana długość odpowiedzi dla generacji jednego pliku."""
+        if fix:
+            return self._build_fix_message(state, [filename]), self._fix_output_tokens(state, [filename])
+        return self._build_file_message(state, filename, file_list), None
+    
+    def _process_per_file(
+        self,
+        state: ProjectState,
+        targets: List[str],
+        file_list: List[str],
+        fix: bool
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Tryb równoległy (sync): jedna generacja na plik w puli wątków.
+        
+        Returns:
+            (połączone surowe odpowiedzi, generated_code)
+        """
+        self.logger.info(f"Generuję {len(targets)} plików równolegle")
+        
+        def generate(filename: str) -> Any:
+            try:
+                user_message, expected = self._file_request(state, filename, file_list, fix)
+                response = self.invoke(user_message, expected_output_tokens=expected)
+                raw_text = response.content if response is not None else ""
+                return raw_text, self._pick_file(filename, raw_text)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=settings.developer_max_parallel) as executor:
+            results = list(executor.map(generate, targets))
+        
+        return self._merge_file_results(targets, results)
+    
+    async def _aprocess_per_file(
+        self,
+        state: ProjectState,
+        targets: List[str],
+        file_list: List[str],
+        fix: bool,
+        on_file: Optional[FileCallback],
+        files: FileService
+    ) -> Tuple[str, Dict[str, str], Dict[str, bool]]:
+        """
+        Tryb równoległy (async): jedna generacja na plik, max
+        developer_max_parallel naraz. Czas ~ najdłuższy plik, nie suma.
+        
+        Returns:
+            (połączone surowe odpowiedzi, generated_code, wyniki zapisu)
+        """
+        self.logger.info(f"Generuję {len(targets)} plików równolegle")
+        previous = state.get("generated_code", {}) if fix else {}
+        semaphore = asyncio.Semaphore(settings.developer_max_parallel)
+        save_results: Dict[str, bool] = {}
+        started = time.perf_counter()
+        
+        async def generate(filename: str) -> Tuple[str, Optional[str]]:
+            user_message, expected = self._file_request(state, filename, file_list, fix)
+            async with semaphore:
+                response = await self.ainvoke(user_message, expected_output_tokens=expected)
+            
+            raw_text = response.content if response is not None else ""
+            code = self._pick_file(filename, raw_text)
+            
+            if code and code != previous.get(filename):
+                self.logger.info(f"Plik {filename} gotowy po {time.perf_counter() - started:.1f}s")
+                save_results[filename] = await self._emit_file(files, filename, code, on_file)
+            
+            return raw_text, code
+        
+        results = await asyncio.gather(
+            *(generate(filename) for filename in targets),
+            return_exceptions=True
+        )
+        
+        raw_text, generated_code = self._merge_file_results(targets, results)
+        return raw_text, generated_code, save_results
+    
+    def _state_update(
+        self,
+        generated_code: Dict[str, str],
+        changed: List[str],
+        iteration: int,
+        mode: str,
+        log: str
+    ) -> Dict[str, Any]:
+        """Aktualizacja stanu z historią zmian iteracji."""
+        return {
+            "generated_code": generated_code,
+            "changed_files": changed,
+            "iteration_changes": [{"iteration": iteration, "mode": mode, "changed": changed}],
+            "generation_aborted": False,
+            "logs": [log]
+        }
+    
+    def _build_result(
+        self,
+        raw_text: Optional[str],
+        generated_code: Dict[str, str],
+        file_list: List[str],
+        save_results: Optional[Dict[str, bool]] = None,
+        previous: Optional[Dict[str, str]] = None,
+        iteration: int = 0,
+        targets: Optional[List[str]] = None,
+        files: Optional[FileService] = None
+    ) -> Dict[str, Any]:
+        """
+        Buduje aktualizację stanu z przeparsowanej odpowiedzi LLM.
+        
+        Args:
+            raw_text: Surowa odpowiedź LLM (None przy błędzie)
+            generated_code: Słownik {filename: content}
+            file_list: Lista plików od Architekta
+            save_results: Wyniki zapisu plików zapisanych już w trakcie streamingu
+            previous: generated_code z poprzedniej iteracji
+            iteration: Numer iteracji Dev-QA
+            targets: Pliki poprawiane przyrostowo (None = pełna generacja)
+            files: Serwis plików sesji (domyślnie settings.output_dir)
+        """
+        previous = previous or {}
+        fix = targets is not None
+        mode = "fix" if fix else "full"
+        # Przy poprawce błąd nie może skasować działających plików
+        fallback = previous if fix else {}
+        
+        if fix:
+            ignored = [f for f in generated_code if f not in targets]
+            if ignored:
+                self.logger.warning(f"Pominięto pliki spoza poprawki: {ignored}")
+            generated_code = {f: c for f, c in generated_code.items() if f in targets}
+        
+        if raw_text is None:
+            return self._state_update(fallback, [], iteration, mode, "Developer: Błąd generowania kodu")
         
         if not generated_code:
             self.logger.error("Parser nie wyciągnął żadnego kodu!")
             # Zapisz debug do pliku
             try:
                 with open("debug_llm_response.txt", "w", encoding="utf-8") as f:
-                    f.write(response.content)
+                    f.write(raw_text)
                 self.logger.info("Zapisano debug do debug_llm_response.txt")
             except Exception:
                 pass
             
-            return {
-                "generated_code": {},
-                "logs": ["Developer: Błąd parsowania odpowiedzi LLM"]
-            }
+            return self._state_update(fallback, [], iteration, mode, "Developer: Błąd parsowania odpowiedzi LLM")
         
-        self.logger.info(f"Wygenerowano {len(generated_code)} plików")
+        changed = [f for f, content in generated_code.items() if previous.get(f) != content]
+        merged = {**previous, **generated_code} if fix else generated_code
+        
+        self.logger.info(f"Wygenerowano {len(generated_code)} plików, zmienione: {changed}")
         
         # Sprawdź brakujące pliki
-        missing = self._check_missing_files(file_list, generated_code)
+        missing = self._check_missing_files(file_list, merged)
         if missing:
             self.logger.warning(f"Brakujące pliki: {missing}")
         
-        # Zapisz pliki na dysk
-        save_results = file_service.save_files(generated_code)
+        # Zapisz pliki na dysk (przy poprawce tylko zmienione)
+        if save_results is None:
+            to_save = {f: generated_code[f] for f in changed} if fix else generated_code
+            save_results = (files or get_file_service()).save_files(to_save)
         
         saved_count = sum(save_results.values())
         failed = [f for f, ok in save_results.items() if not ok]
@@ -146,10 +504,342 @@ kod
         if failed:
             self.logger.warning(f"Nie zapisano: {failed}")
         
-        return {
-            "generated_code": generated_code,
-            "logs": [f"Developer wygenerował {len(generated_code)} plików, zapisano {saved_count}."]
-        }
+        if fix:
+            log = (
+                f"Developer poprawił {len(changed)} z {len(merged)} plików "
+                f"({', '.join(changed) or 'bez zmian'}), zapisano {saved_count}."
+            )
+        else:
+            log = f"Developer wygenerował {len(generated_code)} plików, zapisano {saved_count}."
+        
+        return self._state_update(merged, changed, iteration, mode, log)
+    
+    async def _emit_file(
+        self,
+        files: FileService,
+        filename: str,
+        content: str,
+        on_file: Optional[FileCallback]
+    ) -> bool:
+        """Zapisuje gotowy plik na dysk i powiadamia UI."""
+        saved = await asyncio.to_thread(files.save_file, filename, content)
+        
+        if on_file:
+            on_file(filename, content)
+        
+        return saved
+    
+    def _fatal_diagnostics(self, filename: str, content: str) -> List[Diagnostic]:
+        """Błędy krytyczne pliku (te same checkery co w QA, wynik trafia do cache)."""
+        return [d for d in code_checker.check_file(filename, content) if d.severity == SEVERITY_ERROR]
+    
+    async def _astream_files(
+        self,
+        user_message: List[PromptSection],
+        on_file: Optional[FileCallback],
+        previous: Dict[str, str],
+        expected_files: List[str],
+        targets: Optional[List[str]] = None,
+        expected_output_tokens: Optional[int] = None,
+        files: Optional[FileService] = None
+    ) -> StreamedGeneration:
+        """
+        Streamuje generację, ponawiając ją z repeat_penalty gdy model wpadnie w pętlę.
+        
+        Pliki gotowe przed przerwaniem są już zapisane - ponowienie zapisuje
+        tylko te, które wyszły inaczej. Gdy ponowienia się wyczerpią, wynik
+        zawiera to, co udało się wygenerować (braki wykryje QA).
+        
+        Args:
+            expected_files: Pliki, które powinny powstać (do szacowania oszczędności)
+            files: Serwis plików sesji (domyślnie settings.output_dir)
+        """
+        files = files or get_file_service()
+        attempts = settings.llm_guard_retries + 1
+        emitted: Dict[str, str] = {}
+        save_results: Dict[str, bool] = {}
+        repeat_penalty = None
+        
+        for attempt in range(attempts):
+            result = await self._astream_attempt(
+                user_message, on_file, {**previous, **emitted}, expected_files,
+                targets, expected_output_tokens, repeat_penalty, files
+            )
+            result.generated_code = {**emitted, **result.generated_code}
+            result.save_results = {**save_results, **result.save_results}
+            
+            if not result.degenerated or attempt + 1 == attempts:
+                break
+            
+            emitted, save_results = result.generated_code, result.save_results
+            repeat_penalty = settings.llm_guard_repeat_penalty
+            self._stats["degenerate_retries"] += 1
+            self.logger.warning(
+                f"Model wpadł w pętlę ({result.degenerated}) po {len(emitted)} plikach - "
+                f"ponawiam generację z repeat_penalty={repeat_penalty}"
+            )
+        
+        if result.degenerated:
+            self.logger.error(
+                f"Generacja zapętlona także po ponowieniu - zostaje {len(result.generated_code)} plików"
+            )
+        return result
+    
+    async def _astream_attempt(
+        self,
+        user_message: List[PromptSection],
+        on_file: Optional[FileCallback],
+        previous: Dict[str, str],
+        expected_files: List[str],
+        targets: Optional[List[str]],
+        expected_output_tokens: Optional[int],
+        repeat_penalty: Optional[float],
+        files: FileService
+    ) -> StreamedGeneration:
+        """
+        Streamuje odpowiedź i zapisuje każdy plik zaraz po zamknięciu bloku.
+        Pliki spoza targets i identyczne z previous nie są zapisywane.
+        
+        Każdy gotowy plik przed zapisem przechodzi analizę statyczną - przy błędzie
+        krytycznym (developer_abort_on_fatal) plik nie jest zapisywany ani pokazywany,
+        a stream jest zamykany, co anuluje żądanie do Ollama.
+        Zapętlenie przerwane przez guard kończy próbę z ustawionym degenerated.
+        """
+        parser = StreamingCodeBlockParser()
+        result = StreamedGeneration()
+        started = time.perf_counter()
+        
+        def is_change(filename: str, content: str) -> bool:
+            return (targets is None or filename in targets) and previous.get(filename) != content
+        
+        stream = self.astream(
+            user_message, expected_output_tokens=expected_output_tokens, repeat_penalty=repeat_penalty
+        )
+        try:
+            async for token in stream:
+                for filename, content in parser.feed(token):
+                    if not is_change(filename, content):
+                        continue
+                    if settings.developer_abort_on_fatal:
+                        # Przed zapisem - plik z błędem krytycznym nie trafia na dysk ani do UI
+                        fatal = await asyncio.to_thread(self._fatal_diagnostics, filename, content)
+                        if fatal:
+                            result.aborted_on = filename
+                            result.diagnostics = fatal
+                            break
+                    
+                    if not result.save_results:
+                        self.logger.info(
+                            f"Pierwszy plik ({filename}) po {time.perf_counter() - started:.1f}s"
+                        )
+                    result.save_results[filename] = await self._emit_file(files, filename, content, on_file)
+                
+                if result.aborted_on:
+                    break
+        except DegenerateOutputError as e:
+            result.degenerated = e.reason
+        finally:
+            await stream.aclose()
+        
+        result.text = parser.text
+        
+        if result.aborted_on or result.degenerated:
+            # Tylko kompletne bloki - ostatni plik mógł zostać urwany w połowie
+            result.generated_code = {f: c for f, c in parser.emitted.items() if is_change(f, c)}
+        
+        if result.degenerated:
+            return result
+        
+        if result.aborted_on:
+            result.tokens_saved = self._estimate_tokens_saved(parser.text, expected_files, parser.emitted)
+            self.logger.warning(
+                f"Błąd krytyczny w {result.aborted_on} - przerwano generację po "
+                f"{time.perf_counter() - started:.1f}s, oszczędność ~{result.tokens_saved} tokenów"
+            )
+            return result
+        
+        # Pliki w innych formatach (lub zmienione przez pełne parsowanie)
+        result.generated_code = parser.finish()
+        for filename, content in result.generated_code.items():
+            if parser.emitted.get(filename) != content and is_change(filename, content):
+                result.save_results[filename] = await self._emit_file(files, filename, content, on_file)
+        
+        self.logger.info(f"Generacja zakończona po {time.perf_counter() - started:.1f}s")
+        return result
+    
+    def _estimate_tokens_saved(
+        self,
+        text: str,
+        expected_files: List[str],
+        emitted: Dict[str, str]
+    ) -> int:
+        """Szacunek niewygenerowanych tokenów: brakujące pliki x średni rozmiar gotowego."""
+        remaining = [f for f in expected_files if f not in emitted]
+        per_file = estimate_tokens(text) / max(len(emitted), 1)
+        return int(per_file * len(remaining))
+    
+    def _build_abort_result(
+        self,
+        streamed: StreamedGeneration,
+        state: ProjectState,
+        targets: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Aktualizacja stanu po przerwaniu generacji: od razu iteracja fix
+        z diagnostykami (graf omija QA - patrz route_after_developer).
+        """
+        self._stats["aborts"] += 1
+        self._stats["tokens_saved"] += streamed.tokens_saved
+        
+        previous = state.get("generated_code", {})
+        iteration = state.get("iteration_count", 0)
+        fix = targets is not None
+        merged = {**previous, **streamed.generated_code} if fix else streamed.generated_code
+        changed = [f for f, c in streamed.generated_code.items() if previous.get(f) != c]
+        
+        diagnostics = "\n".join(f"- {d.format()}" for d in streamed.diagnostics)
+        feedback = (
+            f"REJECTED: Generację przerwano - błąd krytyczny w {streamed.aborted_on}:\n"
+            f"{diagnostics}\n"
+            "Popraw ten plik i wygeneruj brakujące pliki."
+        )
+        
+        # Przerwana poprawka - pliki, do których nie doszło, nadal wymagają zmian
+        pending = [f for f in targets or [] if f not in streamed.generated_code]
+        if pending:
+            feedback += (
+                f"\nNie zdążono poprawić: {', '.join(pending)}\n\n"
+                f"Poprzedni feedback QA:\n{state.get('qa_feedback', '')}"
+            )
+        
+        update = self._state_update(
+            merged, changed, iteration, "fix" if fix else "full",
+            f"Developer: przerwano generację ({streamed.aborted_on}), "
+            f"oszczędność ~{streamed.tokens_saved} tokenów."
+        )
+        update.update({
+            "qa_status": "REJECTED",
+            "qa_feedback": feedback,
+            "iteration_count": iteration + 1,
+            "generation_aborted": True
+        })
+        return update
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki przerwanych generacji.
+        
+        Returns:
+            Słownik z aborts, tokens_saved i degenerate_retries (łącznie od startu procesu)
+        """
+        return dict(self._stats)
+    
+    def process(self, state: ProjectState) -> Dict[str, Any]:
+        """
+        Generuje kod dla wszystkich plików z listy Architekta.
+        
+        W iteracji fix regeneruje tylko pliki wskazane przez QA (plus
+        brakujące); pozostałe pliki zostają bajt w bajt bez zmian.
+        
+        Args:
+            state: Stan z tech_stack, requirements, qa_feedback, generated_code
+        
+        Returns:
+            Dict z generated_code, changed_files, iteration_changes i logs
+        """
+        file_list = self._get_file_list(state)
+        previous = state.get("generated_code", {})
+        iteration = state.get("iteration_count", 0)
+        targets = self._fix_targets(state, file_list)
+        fix = targets is not None
+        
+        if fix:
+            self.logger.info(f"Poprawka przyrostowa plików: {targets}")
+        
+        if settings.developer_parallel_files and (targets or file_list):
+            raw_text, generated_code = self._process_per_file(
+                state, targets or file_list, file_list, fix
+            )
+        else:
+            if fix:
+                response = self.invoke(
+                    self._build_fix_message(state, targets),
+                    expected_output_tokens=self._fix_output_tokens(state, targets)
+                )
+            else:
+                response = self.invoke(self._build_user_message(state, file_list))
+            
+            raw_text = response.content if response is not None else None
+            generated_code = parse_code_blocks(raw_text) if raw_text is not None else {}
+        
+        return self._build_result(
+            raw_text, generated_code, file_list,
+            previous=previous, iteration=iteration, targets=targets,
+            files=get_file_service(state.get("output_dir"))
+        )
+    
+    async def aprocess(
+        self,
+        state: ProjectState,
+        on_file: Optional[FileCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Asynchroniczna wersja process() ze streamingiem tokenów.
+        
+        Każdy blok `--- filename ---` jest zapisywany i przekazywany do
+        on_file zaraz po zamknięciu, a nie dopiero po całej generacji.
+        Przy developer_parallel_files każdy plik ma osobną generację.
+        Błąd krytyczny w gotowym pliku przerywa generację i od razu
+        zwraca REJECTED (generation_aborted) - bez czekania na resztę plików.
+        
+        Args:
+            state: Stan z tech_stack, requirements, qa_feedback, generated_code
+            on_file: Callback (filename, content) wołany dla każdego zmienionego pliku
+        
+        Returns:
+            Dict z generated_code, changed_files, iteration_changes i logs
+        """
+        file_list = self._get_file_list(state)
+        previous = state.get("generated_code", {})
+        iteration = state.get("iteration_count", 0)
+        targets = self._fix_targets(state, file_list)
+        fix = targets is not None
+        files = get_file_service(state.get("output_dir"))
+        
+        if fix:
+            self.logger.info(f"Poprawka przyrostowa plików: {targets}")
+        
+        if settings.developer_parallel_files and (targets or file_list):
+            raw_text, generated_code, save_results = await self._aprocess_per_file(
+                state, targets or file_list, file_list, fix, on_file, files
+            )
+        else:
+            if fix:
+                streamed = await self._astream_files(
+                    self._build_fix_message(state, targets),
+                    on_file,
+                    previous,
+                    expected_files=targets,
+                    targets=targets,
+                    expected_output_tokens=self._fix_output_tokens(state, targets),
+                    files=files
+                )
+            else:
+                streamed = await self._astream_files(
+                    self._build_user_message(state, file_list), on_file, {}, expected_files=file_list, files=files
+                )
+            
+            if streamed.aborted_on:
+                return self._build_abort_result(streamed, state, targets)
+            
+            raw_text, generated_code, save_results = (
+                streamed.text, streamed.generated_code, streamed.save_results
+            )
+        
+        return self._build_result(
+            raw_text, generated_code, file_list, save_results,
+            previous=previous, iteration=iteration, targets=targets, files=files
+        )
 
 
 # Instancja dla LangGraph node
@@ -158,4 +848,19 @@ _agent = DeveloperAgent()
 
 def developer_node(state: ProjectState) -> Dict[str, Any]:
     """Node function dla LangGraph."""
-    return _agent(state)
\ No newline at end of file
+    return _agent(state)
+
+
+async def adeveloper_node(state: ProjectState) -> Dict[str, Any]:
+    """
+    Async node function dla LangGraph.
+    
+    Gotowe pliki są wysyłane jako zdarzenia custom (stream_mode="custom"):
+    {"event": "developer_file", "filename": ..., "content": ...}
+    """
+    writer = get_stream_writer()
+    
+    def on_file(filename: str, content: str) -> None:
+        writer({"event": "developer_file", "filename": filename, "content": content})
+    
+    return await _agent.aprocess(state, on_file=on_file)
\ No newline at end of file
@@ -6,6 +6,7 @@ Tworzy specyfikację techniczną na podstawie pomysłu użytkownika.
 
 from typing import Dict, Any
 from agents.base import BaseAgent
+from services.llm_service import PRIORITY_HIGH
 from core.state import ProjectState
 from prompts import PRODUCT_OWNER_PROMPT
 from config import settings
@@ -17,6 +18,12 @@ class ProductOwnerAgent(BaseAgent):
     Nie zajmuje się architekturą ani strukturą plików.
     """
     
+    # Powtórzone zadanie -> ta sama specyfikacja, odpowiedź z cache LLM
+    use_cache = True
+    
+    # Krótkie wywołanie - w kolejce LLM przed długimi generacjami Developera
+    priority = PRIORITY_HIGH
+    
     @property
     def name(self) -> str:
         return "ProductOwner"
@@ -31,6 +38,31 @@ class ProductOwnerAgent(BaseAgent):
             temperature=0.2
         )
     
+    def _build_user_message(self, state: ProjectState) -> str:
+        """Buduje wiadomość do LLM (pusty string gdy brak zadania)."""
+        user_request = state.get("user_request", "")
+        
+        if not user_request:
+            self.logger.warning("Brak user_request w stanie!")
+            return ""
+        
+        return f"Zadanie użytkownika:\n{user_request}"
+    
+    def _build_result(self, response) -> Dict[str, Any]:
+        """Zamienia odpowiedź LLM na aktualizację stanu."""
+        if response is None:
+            return {
+                "requirements": "",
+                "logs": ["Tech Lead: Błąd generowania specyfikacji"]
+            }
+        
+        self.logger.info("Specyfikacja gotowa")
+        
+        return {
+            "requirements": response.content.strip(),
+            "logs": ["Tech Lead przygotował czystą specyfikację."]
+        }
+    
     def process(self, state: ProjectState) -> Dict[str, Any]:
         """
         Przetwarza request użytkownika i generuje specyfikację.
@@ -41,31 +73,29 @@ class ProductOwnerAgent(BaseAgent):
         Returns:
             Dict z requirements i logs
         """
-        user_request = state.get("user_request", "")
+        user_message = self._build_user_message(state)
         
-        if not user_request:
-            self.logger.warning("Brak user_request w stanie!")
+        if not user_message:
             return {
                 "requirements": "",
                 "logs": ["Tech Lead: Brak zadania od użytkownika"]
             }
         
-        user_message = f"Zadanie użytkownika:\n{user_request}"
-        
         response = self.invoke(user_message)
+        return self._build_result(response)
+    
+    async def aprocess(self, state: ProjectState) -> Dict[str, Any]:
+        """Asynchroniczna wersja process()."""
+        user_message = self._build_user_message(state)
         
-        if response is None:
+        if not user_message:
             return {
                 "requirements": "",
-                "logs": ["Tech Lead: Błąd generowania specyfikacji"]
+                "logs": ["Tech Lead: Brak zadania od użytkownika"]
             }
         
-        self.logger.info("Specyfikacja gotowa")
-        
-        return {
-            "requirements": response.content.strip(),
-            "logs": ["Tech Lead przygotował czystą specyfikację."]
-        }
+        response = await self.ainvoke(user_message)
+        return self._build_result(response)
 
 
 # Instancja dla LangGraph node
@@ -74,4 +104,9 @@ _agent = ProductOwnerAgent()
 
 def product_owner_node(state: ProjectState) -> Dict[str, Any]:
     """Node function dla LangGraph."""
-    return _agent(state)
\ No newline at end of file
+    return _agent(state)
+
+
+async def aproduct_owner_node(state: ProjectState) -> Dict[str, Any]:
+    """Async node function dla LangGraph (nie blokuje event loopa)."""
+    return await _agent.acall(state)
\ No newline at end of file
@@ -4,20 +4,64 @@ Agent QA Engineer.
 Audytuje kod pod kątem kompletności i poprawności.
 """
 
-import re
-from typing import Dict, Any, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
 from agents.base import BaseAgent
+from services.llm_service import PRIORITY_HIGH
+from services.code_checker import code_checker
+from services.sandbox_service import (
+    sandbox_service, STATUS_ERROR as RUN_ERROR, STATUS_WARNING as RUN_WARNING
+)
 from core.state import ProjectState
-from prompts import QA_PROMPT
+from prompts import QA_PROMPT, QA_FILE_REVIEW_PROMPT, QA_REDUCE_PROMPT
 from config import settings
+from utils.code_checks import Diagnostic, SEVERITY_ERROR, SEVERITY_WARNING
+from utils.parsers import extract_json_from_response, extract_signatures
+from utils.token_budget import (
+    PromptSection, TokenBudget, estimate_tokens, CHARS_PER_TOKEN,
+    SECTION_LOW, SECTION_NORMAL, SECTION_HIGH, SECTION_REQUIRED
+)
+
+# Kolejność raportu - najpoważniejsze problemy pierwsze
+SEVERITY_ORDER = {"critical": 0, "major": 1, "minor": 2}
+
+# Odpowiedź review fragmentu to krótki JSON
+MAP_OUTPUT_TOKENS = 512
+
+# (plik, etykieta fragmentu, treść)
+ReviewChunk = Tuple[str, str, str]
+
+STATIC_SEVERITY_LABELS = {SEVERITY_ERROR: "błąd", SEVERITY_WARNING: "ostrzeżenie"}
+
+
+@dataclass
+class ReviewFinding:
+    """Problem znaleziony w review pojedynczego pliku (etap map)."""
+    file: str
+    severity: str
+    problem: str
+    line: Optional[int] = None
+    
+    def format(self) -> str:
+        """Linia raportu dla etapu reduce."""
+        where = f"{self.file}:{self.line}" if self.line else self.file
+        return f"[{self.severity}] {where} - {self.problem}"
 
 
 class QAAgent(BaseAgent):
     """
     QA Engineer - audytuje kod pod kątem jakości.
-    Wykonuje automatyczne checky składni + AI review logiki.
+    Wykonuje automatyczne checky składni (parsery z cache po treści),
+    smoke-test importu w sandboxie + AI review logiki.
+    Duże projekty (ponad num_ctx) są oceniane map-reduce: review
+    fragmentów równolegle, potem krótki werdykt z raportu.
     """
     
+    # Werdykt jest krótki - w kolejce LLM przed generacjami Developera
+    priority = PRIORITY_HIGH
+    
     @property
     def name(self) -> str:
         return "QA"
@@ -31,43 +75,21 @@ class QAAgent(BaseAgent):
             model_name=settings.model_reasoning,
             temperature=0.1
         )
+        self._stats = {"static_rejections": 0, "static_issues": 0, "sandbox_rejections": 0}
+        self._approval_iterations: List[int] = []
     
-    def _check_python_syntax(self, filename: str, content: str) -> Optional[str]:
-        """Sprawdza składnię Pythona."""
-        try:
-            compile(content, filename, 'exec')
-            return None
-        except SyntaxError as e:
-            return f"Błąd składni Python w {filename}: {e.msg} (linia {e.lineno})"
-    
-    def _check_javascript_syntax(self, filename: str, content: str) -> Optional[str]:
-        """Podstawowe sprawdzenie JavaScript."""
-        # Sprawdź czy nie ma var
-        if re.search(r'\bvar\s+\w+', content):
-            return f"W {filename} użyto 'var' zamiast 'const'/'let' (bad practice)"
-        
-        # Sprawdź balans klamer
-        if content.count('{') != content.count('}'):
-            return f"W {filename} niezbalansowane nawiasy klamrowe"
-        
-        return None
-    
-    def _check_html_syntax(self, filename: str, content: str) -> Optional[str]:
-        """Podstawowe sprawdzenie HTML."""
-        if not re.search(r'<!DOCTYPE html>', content, re.IGNORECASE):
-            return f"W {filename} brakuje <!DOCTYPE html>"
-        
-        if '<html' not in content or '</html>' not in content:
-            return f"W {filename} brakuje tagów <html>"
+    def collect_issues(self, filename: str, content: str) -> List[Diagnostic]:
+        """
+        Wszystkie problemy statyczne pliku (nie tylko pierwszy).
         
-        return None
-    
-    def _check_css_syntax(self, filename: str, content: str) -> Optional[str]:
-        """Podstawowe sprawdzenie CSS."""
-        if content.count('{') != content.count('}'):
-            return f"W {filename} niezbalansowane nawiasy klamrowe"
+        Args:
+            filename: Nazwa pliku
+            content: Zawartość pliku
         
-        return None
+        Returns:
+            Lista diagnostyk z linią i kolumną (pusta jeśli OK)
+        """
+        return code_checker.check_file(filename, content)
     
     def quick_syntax_check(self, filename: str, content: str) -> Optional[str]:
         """
@@ -78,32 +100,45 @@ class QAAgent(BaseAgent):
             content: Zawartość pliku
         
         Returns:
-            Opis błędu lub None jeśli OK
+            Opis pierwszego błędu lub None jeśli OK
         """
-        if filename.endswith(".py"):
-            return self._check_python_syntax(filename, content)
-        elif filename.endswith(".js"):
-            return self._check_javascript_syntax(filename, content)
-        elif filename.endswith(".html"):
-            return self._check_html_syntax(filename, content)
-        elif filename.endswith(".css"):
-            return self._check_css_syntax(filename, content)
-        
-        return None
+        issues = self.collect_issues(filename, content)
+        return issues[0].format() if issues else None
     
-    def process(self, state: ProjectState) -> Dict[str, Any]:
+    def static_report(self, code_dict: Dict[str, str]) -> List[Diagnostic]:
         """
-        Audytuje wygenerowany kod.
+        Analiza statyczna całego projektu - wszystkie pliki, wszystkie problemy,
+        posortowane: błędy przed ostrzeżeniami, w kolejności plików.
+        Niezmienione pliki są brane z cache (hash treści).
         
         Args:
-            state: Stan z generated_code
+            code_dict: Słownik {filename: content}
         
         Returns:
-            Dict z qa_status, qa_feedback, iteration_count, logs
+            Posortowana lista diagnostyk
         """
-        code_dict = state.get("generated_code", {})
-        iteration = state.get("iteration_count", 0)
+        return code_checker.check_files(code_dict)
+    
+    def _format_static_feedback(self, issues: List[Diagnostic]) -> str:
+        """Jeden raport ze wszystkimi problemami - Developer naprawia wszystko naraz."""
+        files = list(dict.fromkeys(issue.file for issue in issues))
+        lines = [
+            f"REJECTED: Analiza statyczna znalazła {len(issues)} problemów "
+            f"w {len(files)} plikach ({', '.join(files)}):"
+        ]
+        lines += [
+            f"{i}. [{STATIC_SEVERITY_LABELS[issue.severity]}] {issue.format()}"
+            for i, issue in enumerate(issues, 1)
+        ]
+        return "\n".join(lines)
+    
+    def _static_check(self, code_dict: Dict[str, str], iteration: int) -> Optional[Dict[str, Any]]:
+        """
+        ETAP 1: Automatyczne sprawdzenie składni wszystkich plików.
         
+        Returns:
+            Aktualizacja stanu (REJECTED z pełnym raportem) lub None jeśli składnia OK
+        """
         if not code_dict:
             self.logger.warning("Brak kodu do sprawdzenia!")
             return {
@@ -113,29 +148,84 @@ class QAAgent(BaseAgent):
                 "logs": ["QA: Brak kodu do sprawdzenia"]
             }
         
-        # ETAP 1: Automatyczne sprawdzenie składni
         self.logger.info(f"Sprawdzam składnię ({len(code_dict)} plików)...")
         
-        for filename, content in code_dict.items():
-            syntax_error = self.quick_syntax_check(filename, content)
-            if syntax_error:
-                self.logger.warning(f"Auto-reject: {syntax_error}")
-                return {
-                    "qa_status": "REJECTED",
-                    "qa_feedback": syntax_error,
-                    "iteration_count": iteration + 1,
-                    "logs": [f"QA Auto-Reject: {filename}"]
-                }
+        issues = self.static_report(code_dict)
+        if issues:
+            self._stats["static_rejections"] += 1
+            self._stats["static_issues"] += len(issues)
+            self.logger.warning(f"Auto-reject: {len(issues)} problemów statycznych")
+            
+            files = list(dict.fromkeys(issue.file for issue in issues))
+            return {
+                "qa_status": "REJECTED",
+                "qa_feedback": self._format_static_feedback(issues),
+                "iteration_count": iteration + 1,
+                "logs": [f"QA Auto-Reject: {', '.join(files)}"]
+            }
         
         self.logger.info("Składnia OK, przechodzę do analizy AI...")
+        return None
+    
+    def _sandbox_check(self, code_dict: Dict[str, str], iteration: int) -> Optional[Dict[str, Any]]:
+        """
+        ETAP 1b: Import modułów i testy w sandboxie.
+        Crash przy imporcie kończy QA z tracebackiem - bez kosztownego review AI.
+        
+        Returns:
+            Aktualizacja stanu (REJECTED) lub None jeśli kod się uruchamia
+        """
+        if not settings.sandbox_enabled:
+            return None
         
-        # ETAP 2: AI review (logika, kompletność)
-        full_code = "\n\n".join([f"=== {k} ===\n{v}" for k, v in code_dict.items()])
+        results = sandbox_service.run_project(code_dict)
         
-        user_message = f"Sprawdź poniższy kod:\n\n{full_code}"
+        for result in results:
+            if result.status == RUN_WARNING:
+                self.logger.info(f"Sandbox ({result.file}): {result.output.splitlines()[-1]}")
+        
+        failures = [r for r in results if r.status == RUN_ERROR]
+        if not failures:
+            return None
         
-        response = self.invoke(user_message)
+        self._stats["sandbox_rejections"] += 1
+        self.logger.warning(f"Auto-reject: {len(failures)} plików nie przeszło uruchomienia")
         
+        kinds = {"import": "import", "test": "testy"}
+        feedback = "\n\n".join(
+            f"{i}. {failure.file} ({kinds[failure.kind]}):\n{failure.output}"
+            for i, failure in enumerate(failures, 1)
+        )
+        
+        return {
+            "qa_status": "REJECTED",
+            "qa_feedback": f"REJECTED: Kod nie uruchamia się ({len(failures)} plików):\n{feedback}",
+            "iteration_count": iteration + 1,
+            "logs": [f"QA Sandbox-Reject: {', '.join(f.file for f in failures)}"]
+        }
+    
+    def _build_user_message(self, code_dict: Dict[str, str]) -> List[PromptSection]:
+        """
+        ETAP 2: Prompt do AI review (logika, kompletność).
+        Każdy plik to osobna sekcja - przy braku miejsca największe pliki
+        tracą środek, a początek i koniec zostają do oceny.
+        """
+        sections = [
+            PromptSection("header", "Sprawdź poniższy kod:\n", priority=SECTION_REQUIRED)
+        ]
+        
+        for filename, content in code_dict.items():
+            sections.append(PromptSection(
+                filename,
+                f"=== {filename} ===\n{content}\n",
+                priority=SECTION_NORMAL,
+                keep="middle"
+            ))
+        
+        return sections
+    
+    def _build_result(self, response, iteration: int) -> Dict[str, Any]:
+        """Parsuje decyzję AI i buduje aktualizację stanu."""
         if response is None:
             return {
                 "qa_status": "REJECTED",
@@ -144,12 +234,15 @@ class QAAgent(BaseAgent):
                 "logs": ["QA: Błąd wywołania AI"]
             }
         
-        # Parsuj decyzję
-        decision = response.content.strip()
+        return self._build_verdict(response.content.strip(), iteration)
+    
+    def _build_verdict(self, decision: str, iteration: int) -> Dict[str, Any]:
+        """Buduje aktualizację stanu z werdyktu (APPROVED / REJECTED: ...)."""
         status = "APPROVED" if "APPROVED" in decision else "REJECTED"
         
         if status == "APPROVED":
             self.logger.info("APPROVED - Kod jest OK!")
+            self._approval_iterations.append(iteration + 1)
         else:
             self.logger.warning(f"REJECTED: {decision[:100]}...")
         
@@ -159,6 +252,270 @@ class QAAgent(BaseAgent):
             "iteration_count": iteration + 1,
             "logs": [f"QA: {status}"]
         }
+    
+    def _use_map_reduce(self, code_dict: Dict[str, str]) -> bool:
+        """
+        Czy review ma iść trybem map-reduce.
+        W trybie auto - gdy cały kod nie mieści się w budżecie num_ctx
+        (pojedynczy prompt zostałby przycięty).
+        """
+        mode = settings.qa_review_mode
+        if mode != "auto":
+            return mode == "map_reduce"
+        
+        budget = TokenBudget(
+            num_ctx=settings.llm_num_ctx,
+            output_reserve=self.output_reserve()
+        )
+        needed = estimate_tokens(self.system_prompt) + sum(
+            estimate_tokens(section.content) for section in self._build_user_message(code_dict)
+        )
+        
+        if needed <= budget.available:
+            return False
+        
+        self.logger.info(f"Kod ~{needed} tokenów > budżet {budget.available} - review map-reduce")
+        return True
+    
+    def _split_chunks(self, code_dict: Dict[str, str]) -> List[ReviewChunk]:
+        """Dzieli pliki na fragmenty po max qa_chunk_tokens (po granicach linii)."""
+        max_chars = int(settings.qa_chunk_tokens * CHARS_PER_TOKEN)
+        chunks: List[ReviewChunk] = []
+        
+        for filename, content in code_dict.items():
+            if len(content) <= max_chars:
+                chunks.append((filename, filename, content))
+                continue
+            
+            lines = content.splitlines(keepends=True)
+            start, buffer, size = 0, [], 0
+            
+            for i, line in enumerate(lines):
+                if buffer and size + len(line) > max_chars:
+                    chunks.append((filename, f"{filename} (linie {start + 1}-{i})", "".join(buffer)))
+                    start, buffer, size = i, [], 0
+                buffer.append(line)
+                size += len(line)
+            
+            if buffer:
+                chunks.append((filename, f"{filename} (linie {start + 1}-{len(lines)})", "".join(buffer)))
+        
+        return chunks
+    
+    def _interfaces(self, code_dict: Dict[str, str], exclude: Optional[str] = None) -> str:
+        """Sygnatury plików projektu (kontekst spójności bez całego kodu)."""
+        return "\n\n".join(
+            f"--- {filename} ---\n{extract_signatures(filename, content)}"
+            for filename, content in code_dict.items() if filename != exclude
+        ) or "(brak)"
+    
+    def _build_map_message(self, code_dict: Dict[str, str], chunk: ReviewChunk) -> List[PromptSection]:
+        """Prompt review jednego fragmentu (etap map)."""
+        filename, label, content = chunk
+        
+        return [
+            PromptSection(
+                "project",
+                f"PLIKI PROJEKTU: {', '.join(code_dict)}\n",
+                priority=SECTION_REQUIRED
+            ),
+            PromptSection(
+                "interfaces",
+                f"INTERFEJSY POZOSTAŁYCH PLIKÓW:\n{self._interfaces(code_dict, exclude=filename)}\n",
+                priority=SECTION_LOW
+            ),
+            PromptSection("code", f"=== {label} ===\n{content}\n", priority=SECTION_NORMAL, keep="middle"),
+            PromptSection(
+                "instructions",
+                f"Oceń TYLKO fragment: {label}. Odpowiedz wyłącznie JSON-em.\n",
+                priority=SECTION_REQUIRED
+            ),
+        ]
+    
+    def _parse_findings(self, filename: str, raw_text: str) -> List[ReviewFinding]:
+        """Parsuje JSON z review fragmentu na listę problemów."""
+        data = extract_json_from_response(raw_text)
+        
+        if not isinstance(data, dict):
+            if not raw_text.strip() or "APPROVED" in raw_text:
+                return []
+            self.logger.warning(f"Review {filename}: odpowiedź bez JSON")
+            return [ReviewFinding(filename, "major", raw_text.strip()[:300])]
+        
+        findings = []
+        for issue in data.get("issues", []):
+            if not isinstance(issue, dict) or not issue.get("problem"):
+                continue
+            
+            severity = str(issue.get("severity", "major")).lower()
+            line = issue.get("line")
+            findings.append(ReviewFinding(
+                file=filename,
+                severity=severity if severity in SEVERITY_ORDER else "major",
+                problem=str(issue["problem"]),
+                line=line if isinstance(line, int) else None
+            ))
+        
+        return findings
+    
+    def _review_chunk_response(self, chunk: ReviewChunk, response) -> List[ReviewFinding]:
+        """Problemy z odpowiedzi na review fragmentu."""
+        findings = self._parse_findings(chunk[0], response.content if response is not None else "")
+        self.logger.info(f"Review {chunk[1]}: {len(findings)} problemów")
+        return findings
+    
+    def _map_review(self, code_dict: Dict[str, str]) -> List[ReviewFinding]:
+        """ETAP map (sync): review fragmentów w puli wątków."""
+        chunks = self._split_chunks(code_dict)
+        self.logger.info(f"Review map: {len(chunks)} fragmentów z {len(code_dict)} plików")
+        
+        def review(chunk: ReviewChunk) -> List[ReviewFinding]:
+            response = self.invoke(
+                self._build_map_message(code_dict, chunk),
+                use_cache=True,
+                expected_output_tokens=MAP_OUTPUT_TOKENS,
+                system_prompt=QA_FILE_REVIEW_PROMPT
+            )
+            return self._review_chunk_response(chunk, response)
+        
+        with ThreadPoolExecutor(max_workers=settings.qa_max_parallel) as executor:
+            results = list(executor.map(review, chunks))
+        
+        return self._rank_findings(results)
+    
+    async def _amap_review(self, code_dict: Dict[str, str]) -> List[ReviewFinding]:
+        """ETAP map (async): max qa_max_parallel review naraz."""
+        chunks = self._split_chunks(code_dict)
+        self.logger.info(f"Review map: {len(chunks)} fragmentów z {len(code_dict)} plików")
+        semaphore = asyncio.Semaphore(settings.qa_max_parallel)
+        
+        async def review(chunk: ReviewChunk) -> List[ReviewFinding]:
+            async with semaphore:
+                response = await self.ainvoke(
+                    self._build_map_message(code_dict, chunk),
+                    use_cache=True,
+                    expected_output_tokens=MAP_OUTPUT_TOKENS,
+                    system_prompt=QA_FILE_REVIEW_PROMPT
+                )
+            return self._review_chunk_response(chunk, response)
+        
+        results = await asyncio.gather(*(review(chunk) for chunk in chunks))
+        return self._rank_findings(results)
+    
+    def _rank_findings(self, results: List[List[ReviewFinding]]) -> List[ReviewFinding]:
+        """Spłaszcza wyniki map i sortuje od najpoważniejszych."""
+        findings = [finding for result in results for finding in result]
+        return sorted(findings, key=lambda f: SEVERITY_ORDER[f.severity])
+    
+    def _build_reduce_message(
+        self,
+        code_dict: Dict[str, str],
+        findings: List[ReviewFinding]
+    ) -> List[PromptSection]:
+        """Prompt etapu reduce: raport z review plików + interfejsy."""
+        report = "\n".join(finding.format() for finding in findings)
+        
+        return [
+            PromptSection(
+                "findings",
+                f"WYNIKI REVIEW PLIKÓW ({len(findings)} problemów):\n{report}\n",
+                priority=SECTION_HIGH
+            ),
+            PromptSection(
+                "interfaces",
+                f"INTERFEJSY PLIKÓW:\n{self._interfaces(code_dict)}\n",
+                priority=SECTION_NORMAL
+            ),
+            PromptSection("instructions", "Wydaj werdykt dla całego projektu.\n", priority=SECTION_REQUIRED),
+        ]
+    
+    def _reduce(self, code_dict: Dict[str, str], findings: List[ReviewFinding], iteration: int) -> Dict[str, Any]:
+        """ETAP reduce (sync): jeden krótki werdykt z raportu."""
+        if not findings:
+            return self._build_verdict("APPROVED", iteration)
+        
+        response = self.invoke(
+            self._build_reduce_message(code_dict, findings),
+            system_prompt=QA_REDUCE_PROMPT
+        )
+        return self._build_result(response, iteration)
+    
+    async def _areduce(
+        self,
+        code_dict: Dict[str, str],
+        findings: List[ReviewFinding],
+        iteration: int
+    ) -> Dict[str, Any]:
+        """ETAP reduce (async)."""
+        if not findings:
+            return self._build_verdict("APPROVED", iteration)
+        
+        response = await self.ainvoke(
+            self._build_reduce_message(code_dict, findings),
+            system_prompt=QA_REDUCE_PROMPT
+        )
+        return self._build_result(response, iteration)
+    
+    def process(self, state: ProjectState) -> Dict[str, Any]:
+        """
+        Audytuje wygenerowany kod.
+        
+        Args:
+            state: Stan z generated_code
+        
+        Returns:
+            Dict z qa_status, qa_feedback, iteration_count, logs
+        """
+        code_dict = state.get("generated_code", {})
+        iteration = state.get("iteration_count", 0)
+        
+        rejection = self._static_check(code_dict, iteration) or self._sandbox_check(code_dict, iteration)
+        if rejection:
+            return rejection
+        
+        if self._use_map_reduce(code_dict):
+            findings = self._map_review(code_dict)
+            return self._reduce(code_dict, findings, iteration)
+        
+        response = self.invoke(self._build_user_message(code_dict))
+        return self._build_result(response, iteration)
+    
+    async def aprocess(self, state: ProjectState) -> Dict[str, Any]:
+        """Asynchroniczna wersja process()."""
+        code_dict = state.get("generated_code", {})
+        iteration = state.get("iteration_count", 0)
+        
+        # Analiza statyczna i sandbox blokują - poza event loopem
+        rejection = await asyncio.to_thread(self._static_check, code_dict, iteration)
+        if rejection:
+            return rejection
+        
+        rejection = await asyncio.to_thread(self._sandbox_check, code_dict, iteration)
+        if rejection:
+            return rejection
+        
+        if self._use_map_reduce(code_dict):
+            findings = await self._amap_review(code_dict)
+            return await self._areduce(code_dict, findings, iteration)
+        
+        response = await self.ainvoke(self._build_user_message(code_dict))
+        return self._build_result(response, iteration)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki QA procesu.
+        
+        Returns:
+            Słownik z approved, avg_iterations_to_approval,
+            static_rejections, static_issues
+        """
+        approvals = list(self._approval_iterations)
+        stats = dict(self._stats)
+        stats["approved"] = len(approvals)
+        stats["avg_iterations_to_approval"] = (
+            round(sum(approvals) / len(approvals), 2) if approvals else 0.0
+        )
+        return stats
 
 
 # Instancja dla LangGraph node
@@ -167,4 +524,14 @@ _agent = QAAgent()
 
 def qa_node(state: ProjectState) -> Dict[str, Any]:
     """Node function dla LangGraph."""
-    return _agent(state)
\ No newline at end of file
+    return _agent(state)
+
+
+async def aqa_node(state: ProjectState) -> Dict[str, Any]:
+    """Async node function dla LangGraph (nie blokuje event loopa)."""
+    return await _agent.acall(state)
+
+
+def get_qa_stats() -> Dict[str, Any]:
+    """Statystyki QA (m.in. średnia liczba iteracji do akceptacji)."""
+    return _agent.get_stats()
\ No newline at end of file
@@ -4,6 +4,8 @@ AgileFlow Pro - główna aplikacja Chainlit.
 Orkiestracja workflow agentów przez LangGraph.
 """
 
+import asyncio
+import operator
 import shutil
 from pathlib import Path
 
@@ -12,13 +14,29 @@ from langgraph.graph import StateGraph, END
 
 from config import settings
 from core.state import ProjectState, create_initial_state
-from agents import product_owner_node, architect_node, developer_node, qa_node
-from services.file_service import file_service
+from agents import (
+    product_owner_node, architect_node, developer_node, qa_node,
+    aproduct_owner_node, aarchitect_node, adeveloper_node, aqa_node
+)
+from services.file_service import FileService
+from services.llm_service import llm_service, SchedulerQueueFullError
 from services.vector_store_service import add_project_to_rag
+from services.ingest_queue import ingest_queue
 from utils.logger import get_logger
 
 logger = get_logger("app")
 
+# Startup: załaduj modele w tle i utrzymuj je w pamięci Ollama
+if settings.llm_warmup_on_startup:
+    llm_service.start_keep_alive()
+
+# Worker ingestii RAG - dokańcza też zadania sprzed restartu
+if settings.rag_ingest_background:
+    ingest_queue.start()
+
+# Pola stanu akumulowane przez reducer (Annotated[..., operator.add])
+ACCUMULATED_STATE_KEYS = ("logs", "iteration_changes")
+
 
 def should_continue(state: ProjectState) -> str:
     """
@@ -38,14 +56,33 @@ def should_continue(state: ProjectState) -> str:
     return "fix"
 
 
-def build_graph() -> StateGraph:
+def route_after_developer(state: ProjectState) -> str:
+    """
+    Po przerwanej generacji (błąd krytyczny w trakcie streamingu) od razu
+    kolejna iteracja Developera - QA nie ma czego oceniać.
+    
+    Returns:
+        "fix" - przerwana generacja i jest jeszcze limit iteracji
+        "qa" - normalna ścieżka
+    """
+    if state.get("generation_aborted") and state.get("iteration_count", 0) < settings.max_iterations:
+        return "fix"
+    return "qa"
+
+
+def build_graph(use_async: bool = True) -> StateGraph:
     """
     Buduje graf workflow AgileFlow.
     
     Flow:
         product_owner -> architect -> developer -> qa_engineer
-                                            ^            |
-                                            |--- fix <---|
+                                            ^  |         |
+                                            |  | abort   |
+                                            |--+- fix <--|
+    
+    Args:
+        use_async: True - async nodes (Chainlit, wiele sesji w jednym procesie),
+                   False - sync nodes (skrypty, graph.invoke)
     
     Returns:
         Skompilowany graf LangGraph
@@ -53,16 +90,26 @@ def build_graph() -> StateGraph:
     workflow = StateGraph(ProjectState)
     
     # Dodaj nodes
-    workflow.add_node("product_owner", product_owner_node)
-    workflow.add_node("architect", architect_node)
-    workflow.add_node("developer", developer_node)
-    workflow.add_node("qa_engineer", qa_node)
+    if use_async:
+        workflow.add_node("product_owner", aproduct_owner_node)
+        workflow.add_node("architect", aarchitect_node)
+        workflow.add_node("developer", adeveloper_node)
+        workflow.add_node("qa_engineer", aqa_node)
+    else:
+        workflow.add_node("product_owner", product_owner_node)
+        workflow.add_node("architect", architect_node)
+        workflow.add_node("developer", developer_node)
+        workflow.add_node("qa_engineer", qa_node)
     
     # Ustaw przepływ
     workflow.set_entry_point("product_owner")
     workflow.add_edge("product_owner", "architect")
     workflow.add_edge("architect", "developer")
-    workflow.add_edge("developer", "qa_engineer")
+    workflow.add_conditional_edges(
+        "developer",
+        route_after_developer,
+        {"fix": "developer", "qa": "qa_engineer"}
+    )
     
     # Warunkowa pętla QA -> Developer
     workflow.add_conditional_edges(
@@ -82,15 +129,28 @@ async def start():
     await cl.Message(content="**AgileFlow Pro Ready!** Co robimy?").send()
 
 
+def _session_dir() -> Path:
+    """Katalog sesji Chainlit - równoległe sesje nie mogą kasować sobie plików."""
+    return settings.output_dir / cl.context.session.id
+
+
+@cl.on_chat_end
+async def end():
+    """Sprzątanie plików sesji (projekt i ZIP)."""
+    await asyncio.to_thread(shutil.rmtree, _session_dir(), True)
+    logger.info("Sesja zakończona")
+
+
 @cl.on_message
 async def main(message: cl.Message):
     """Główna obsługa wiadomości użytkownika."""
     
-    # Czyść folder output przed nowym projektem
-    file_service.clear_output()
+    # Czyść folder projektu sesji przed nowym projektem
+    output_dir = _session_dir() / "project"
+    FileService(output_dir).clear_output()
     
     app = cl.user_session.get("app")
-    state = create_initial_state(message.content)
+    state = create_initial_state(message.content, output_dir=str(output_dir))
     
     # TaskList - progress bar w UI
     task_list = cl.TaskList()
@@ -110,87 +170,146 @@ async def main(message: cl.Message):
     msg = cl.Message(content="")
     await msg.send()
     
+    # Stan końcowy składany z aktualizacji węzłów (state to tylko stan początkowy)
+    final_state = dict(state)
+    
+    # Pliki wyświetlone już w trakcie streamingu Developera (bieżąca iteracja)
+    streamed_files = []
+    
     # Streamuj wykonanie workflow
-    async for output in app.astream(state):
-        for key, value in output.items():
-            
-            if key == "product_owner":
-                task_po.status = cl.TaskStatus.DONE
-                task_arch.status = cl.TaskStatus.RUNNING
-                await task_list.send()
-                await cl.Message(
-                    author="Tech Lead",
-                    content=f"**Specyfikacja:**\n{value['requirements']}"
-                ).send()
-            
-            elif key == "architect":
-                task_arch.status = cl.TaskStatus.DONE
-                task_dev.status = cl.TaskStatus.RUNNING
-                await task_list.send()
-                await cl.Message(
-                    author="Architekt",
-                    content=f"**Plan projektu:**\n{value['tech_stack']}"
-                ).send()
+    try:
+        async for mode, chunk in app.astream(state, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                if chunk.get("event") == "developer_file":
+                    streamed_files.append(chunk["filename"])
+                    await cl.Message(
+                        author="Coder",
+                        content=f"`{chunk['filename']}`",
+                        elements=[
+                            cl.Text(
+                                name=chunk["filename"],
+                                content=chunk["content"],
+                                language=_get_language(chunk["filename"]),
+                                display="inline"
+                            )
+                        ]
+                    ).send()
+                continue
             
-            elif key == "developer":
-                task_dev.status = cl.TaskStatus.DONE
-                task_qa.status = cl.TaskStatus.RUNNING
-                await task_list.send()
+            for key, value in chunk.items():
+                _merge_update(final_state, value)
                 
-                # Wyświetl wygenerowane pliki
-                files = list(value['generated_code'].keys())
-                elements = [
-                    cl.Text(
-                        name=f,
-                        content=c,
-                        language=_get_language(f),
-                        display="inline"
-                    )
-                    for f, c in value['generated_code'].items()
-                ]
-                await cl.Message(
-                    author="Coder",
-                    content=f"Pliki ({len(files)}):",
-                    elements=elements
-                ).send()
-            
-            elif key == "qa_engineer":
-                if value['qa_status'] == "APPROVED":
-                    task_qa.status = cl.TaskStatus.DONE
-                    task_list.status = "Done"
+                if key == "product_owner":
+                    task_po.status = cl.TaskStatus.DONE
+                    task_arch.status = cl.TaskStatus.RUNNING
                     await task_list.send()
                     await cl.Message(
-                        author="QA",
-                        content="**APPROVED** – Kod przeszedł testy!"
+                        author="Tech Lead",
+                        content=f"**Specyfikacja:**\n{value['requirements']}"
                     ).send()
-                else:
-                    task_qa.status = cl.TaskStatus.FAILED
+                
+                elif key == "architect":
+                    task_arch.status = cl.TaskStatus.DONE
                     task_dev.status = cl.TaskStatus.RUNNING
                     await task_list.send()
                     await cl.Message(
-                        author="QA",
-                        content=f"**REJECTED**\n{value['qa_feedback']}"
+                        author="Architekt",
+                        content=f"**Plan projektu:**\n{value['tech_stack']}"
                     ).send()
+                
+                elif key == "developer":
+                    task_dev.status = cl.TaskStatus.DONE
+                    task_qa.status = cl.TaskStatus.RUNNING
+                    await task_list.send()
+                    
+                    # Pliki streamowane były już wyświetlane pojedynczo,
+                    # a przy poprawce pokazujemy tylko zmienione
+                    files = list(value['generated_code'].keys())
+                    changed = value.get('changed_files', files)
+                    elements = [
+                        cl.Text(
+                            name=f,
+                            content=c,
+                            language=_get_language(f),
+                            display="inline"
+                        )
+                        for f, c in value['generated_code'].items()
+                        if f in changed and f not in streamed_files
+                    ]
+                    streamed_files = []
+                    await cl.Message(
+                        author="Coder",
+                        content=f"Pliki ({len(files)}), zmienione: {len(changed)}",
+                        elements=elements
+                    ).send()
+                    
+                    if value.get('generation_aborted'):
+                        await cl.Message(
+                            author="Coder",
+                            content=f"**Przerwano generację**\n{value['qa_feedback']}\n\n_{value['logs'][-1]}_"
+                        ).send()
+                
+                elif key == "qa_engineer":
+                    if value['qa_status'] == "APPROVED":
+                        task_qa.status = cl.TaskStatus.DONE
+                        task_list.status = "Done"
+                        await task_list.send()
+                        await cl.Message(
+                            author="QA",
+                            content="**APPROVED** – Kod przeszedł testy!"
+                        ).send()
+                    else:
+                        task_qa.status = cl.TaskStatus.FAILED
+                        task_dev.status = cl.TaskStatus.RUNNING
+                        await task_list.send()
+                        await cl.Message(
+                            author="QA",
+                            content=f"**REJECTED**\n{value['qa_feedback']}"
+                        ).send()
+    except SchedulerQueueFullError as e:
+        logger.warning(f"Odrzucono żądanie: {e}")
+        task_list.status = "Failed"
+        await task_list.send()
+        await cl.Message(content=f"**Serwer LLM przeciążony** – {e}").send()
+        return
     
     # ZIP na koniec
-    project_name = _sanitize_project_name(state["user_request"])
-    zip_path = shutil.make_archive(f"projekt_{project_name}", 'zip', "output_projects")
+    project_name = _sanitize_project_name(final_state["user_request"])
+    zip_path = shutil.make_archive(str(_session_dir() / f"projekt_{project_name}"), 'zip', output_dir)
     
     await cl.Message(
         content="**Projekt gotowy!**",
         elements=[cl.File(name=f"{project_name}.zip", path=zip_path, display="inline")]
     ).send()
     
-    # Zapisz do RAG jeśli APPROVED
-    if state.get("qa_status") == "APPROVED" and state.get("generated_code"):
-        add_project_to_rag(project_name, state["generated_code"])
-        await cl.Message(
-            content=f"RAG: Projekt \"{project_name}\" zapisany do pamięci długoterminowej"
-        ).send()
+    # Zapisz do RAG jeśli APPROVED - w tle, żeby nie czekać na chunkowanie i embeddingi
+    if final_state.get("qa_status") == "APPROVED" and final_state.get("generated_code"):
+        if settings.rag_ingest_background:
+            await asyncio.to_thread(ingest_queue.enqueue, project_name, final_state["generated_code"])
+            await cl.Message(
+                content=f"RAG: Projekt \"{project_name}\" w kolejce do pamięci długoterminowej"
+            ).send()
+        else:
+            ingest = await asyncio.to_thread(add_project_to_rag, project_name, final_state["generated_code"])
+            await cl.Message(
+                content=(
+                    f"RAG: Projekt \"{project_name}\" zapisany do pamięci długoterminowej "
+                    f"(chunki: +{ingest.added}, bez zmian {ingest.kept}, usunięte {ingest.deleted})"
+                )
+            ).send()
     
     logger.info(f"Projekt '{project_name}' zakończony")
 
 
+def _merge_update(state: dict, update: dict) -> None:
+    """Nakłada aktualizację węzła na stan (pola akumulowane są doklejane)."""
+    for key, value in update.items():
+        if key in ACCUMULATED_STATE_KEYS:
+            state[key] = operator.add(state.get(key, []), value)
+        else:
+            state[key] = value
+
+
 def _get_language(filename: str) -> str:
     """Mapuje rozszerzenie pliku na język dla Chainlit."""
     ext_map = {
@@ -0,0 +1 @@
+"""Benchmarki wydajności (wymagają działającego serwera Ollama)."""
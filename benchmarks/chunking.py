@@ -0,0 +1,145 @@
+# benchmarks/chunking.py
+"""
+Benchmark: chunkowanie po rozmiarze vs chunkowanie świadome składni.
+
+Korpus to pliki źródłowe tego repozytorium i projekty z archiwów .zip
+w katalogu głównym. Mierzy liczbę chunków (= liczba embeddingów),
+rozmiar indeksu, średnią długość chunka (tokeny na trafienie),
+duplikację treści przez overlap oraz ile definicji Pythona
+mieszczących się w 1500 znakach zostało mimo to przeciętych.
+
+Splitter po rozmiarze ma limit 1500 znaków z overlapem 200, więc jego
+chunki mają średnio ~1300 znaków treści; chunker składniowy używa
+settings.rag_chunk_chars (1800) i daje chunki o podobnej średniej.
+
+Uruchomienie:
+    python -m benchmarks.chunking
+"""
+
+import ast
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from config import settings
+from utils.chunkers import chunk_file, detect_language, LANGUAGE_PYTHON
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_SUFFIXES = {".py", ".js", ".css", ".html", ".md", ".json"}
+MAX_CHARS = 1500
+OVERLAP = 200
+
+# Chunk jako zakres linii (start, end) - do sprawdzania przeciętych definicji
+LineRange = Tuple[int, int]
+Chunker = Callable[[str, str], List[Tuple[str, LineRange]]]
+
+
+def legacy_chunks(filename: str, content: str) -> List[Tuple[str, LineRange]]:
+    """Dotychczasowy splitter VectorStoreService._chunk_code (1500 znaków, overlap 200)."""
+    spans = []
+    if len(content) <= MAX_CHARS:
+        spans.append((0, len(content)))
+    else:
+        start = 0
+        while start < len(content):
+            end = start + MAX_CHARS
+            if end < len(content):
+                newline_pos = content.rfind("\n", start, end)
+                if newline_pos > start:
+                    end = newline_pos + 1
+            spans.append((start, end))
+            # Bezpiecznik - oryginał przy bardzo długiej linii mógł się cofać
+            start = max(end - OVERLAP, start + 1)
+    
+    return [
+        (content[s:e], (content.count("\n", 0, s) + 1, content.count("\n", 0, max(e - 1, s)) + 1))
+        for s, e in spans
+    ]
+
+
+def syntax_chunks(filename: str, content: str) -> List[Tuple[str, LineRange]]:
+    """Nowy chunker z utils.chunkers."""
+    return [
+        (chunk.text, (chunk.start_line, chunk.end_line))
+        for chunk in chunk_file(filename, content, settings.rag_chunk_chars, settings.rag_chunk_overlap)
+    ]
+
+
+def load_corpus() -> Dict[str, str]:
+    """Pliki tekstowe repozytorium i projektów z archiwów .zip."""
+    corpus: Dict[str, str] = {}
+    
+    for path in sorted(ROOT.rglob("*")):
+        relative = path.relative_to(ROOT)
+        # Pomijamy katalogi ukryte (np. tłumaczenia UI w .chainlit) i cache
+        if any(part.startswith(".") or part == "__pycache__" for part in relative.parts):
+            continue
+        if path.suffix in SOURCE_SUFFIXES and path.is_file():
+            corpus[str(relative)] = path.read_text(encoding="utf-8", errors="replace")
+    
+    for archive in sorted(ROOT.glob("*.zip")):
+        with zipfile.ZipFile(archive) as zf:
+            for name in zf.namelist():
+                if Path(name).suffix in SOURCE_SUFFIXES and "__pycache__" not in name:
+                    corpus[f"{archive.stem}/{name}"] = zf.read(name).decode("utf-8", errors="replace")
+    
+    return corpus
+
+
+def python_definitions(content: str) -> List[LineRange]:
+    """Zakresy linii funkcji i klas, które zmieściłyby się w jednym chunku."""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return []
+    
+    lines = content.splitlines(keepends=True)
+    ranges = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            if sum(len(line) for line in lines[start - 1:node.end_lineno]) <= MAX_CHARS:
+                ranges.append((start, node.end_lineno))
+    return ranges
+
+
+def measure(corpus: Dict[str, str], chunker: Chunker) -> Dict[str, float]:
+    """Metryki indeksu dla jednego chunkera."""
+    chunks = indexed = split = definitions = 0
+    
+    for filename, content in corpus.items():
+        produced = chunker(filename, content)
+        chunks += len(produced)
+        indexed += sum(len(text) for text, _ in produced)
+        
+        if detect_language(filename) == LANGUAGE_PYTHON:
+            for start, end in python_definitions(content):
+                definitions += 1
+                if not any(first <= start and end <= last for _, (first, last) in produced):
+                    split += 1
+    
+    original = sum(len(content) for content in corpus.values())
+    return {
+        "chunks": chunks,
+        "indexed_kb": indexed / 1024,
+        "avg_chars": indexed / chunks if chunks else 0.0,
+        "duplication": indexed / original - 1 if original else 0.0,
+        "split_defs": split,
+        "definitions": definitions,
+    }
+
+
+def main() -> None:
+    corpus = load_corpus()
+    print(f"Korpus: {len(corpus)} plików, {sum(map(len, corpus.values())) / 1024:.0f} KB")
+    
+    for label, chunker in (("po rozmiarze", legacy_chunks), ("składniowy", syntax_chunks)):
+        m = measure(corpus, chunker)
+        print(
+            f"{label:<14} chunki={m['chunks']:<5} indeks={m['indexed_kb']:.0f} KB "
+            f"średnio={m['avg_chars']:.0f} znaków "
+            f"duplikacja={m['duplication']:.1%} przecięte definicje={m['split_defs']}/{m['definitions']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
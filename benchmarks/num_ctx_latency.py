@@ -0,0 +1,76 @@
+# benchmarks/num_ctx_latency.py
+"""
+Benchmark: latencja małych promptów przy stałym num_ctx vs dobieranym per wywołanie.
+
+Z --ping-interval w tle działa wątek keep-alive (jak w aplikacji, tylko
+częściej) - ping nie może przeładowywać modelu z innym num_ctx niż wywołania.
+
+Uruchomienie (wymaga Ollama):
+    python -m benchmarks.num_ctx_latency --runs 5 [--ping-interval 2]
+"""
+
+import argparse
+import statistics
+import time
+from typing import List, Optional
+from langchain_core.messages import SystemMessage, HumanMessage
+from config import settings
+from services.llm_service import llm_service
+
+MESSAGES = [
+    SystemMessage(content="Jesteś zwięzłym asystentem."),
+    HumanMessage(content="Odpowiedz jednym słowem: czy Python jest językiem interpretowanym?"),
+]
+
+
+def measure(expected_output_tokens: Optional[int], runs: int) -> List[float]:
+    """
+    Mierzy czasy wywołań (pierwsze, ładujące model, jest pomijane).
+    
+    Args:
+        expected_output_tokens: None = stały settings.llm_num_ctx, liczba = dobór kubełka
+        runs: Liczba pomiarów
+    
+    Returns:
+        Lista czasów w sekundach
+    """
+    model = llm_service.get_chat_model(settings.model_reasoning, temperature=0.0)
+    
+    # Rozgrzewka - Ollama przeładowuje model przy zmianie num_ctx
+    llm_service.invoke(model, MESSAGES, expected_output_tokens=expected_output_tokens)
+    
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        llm_service.invoke(model, MESSAGES, expected_output_tokens=expected_output_tokens)
+        latencies.append(time.perf_counter() - started)
+    
+    return latencies
+
+
+def _report(label: str, latencies: List[float]) -> None:
+    print(
+        f"{label:<28} median={statistics.median(latencies):.2f}s "
+        f"mean={statistics.mean(latencies):.2f}s min={min(latencies):.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--expected-output", type=int, default=64)
+    parser.add_argument("--ping-interval", type=float, default=0.0, help="Wątek keep-alive co N s (0 = wyłączony)")
+    args = parser.parse_args()
+    
+    if args.ping_interval > 0:
+        settings.llm_keep_alive_interval = args.ping_interval
+        llm_service.start_keep_alive()
+    
+    bucket = llm_service.select_num_ctx(MESSAGES, args.expected_output)
+    
+    _report(f"przed (num_ctx={settings.llm_num_ctx})", measure(None, args.runs))
+    _report(f"po (num_ctx={bucket})", measure(args.expected_output, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/qa_iterations.py
+"""
+Benchmark: średnia liczba iteracji Dev-QA do przejścia analizy statycznej.
+
+Porównuje odrzucanie po pierwszym błędzie z raportem wszystkich problemów.
+Developer jest symulowany: naprawia dokładnie pliki wymienione w feedbacku
+(jak tryb poprawki przyrostowej), więc wynik nie zależy od LLM.
+
+Uruchomienie:
+    python -m benchmarks.qa_iterations
+"""
+
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+from agents.qa import QAAgent
+from utils.parsers import find_mentioned_files
+
+# (zepsuty projekt, poprawione wersje plików)
+Fixture = Tuple[Dict[str, str], Dict[str, str]]
+
+_HTML_OK = "<!DOCTYPE html>\n<html><body><script src=\"app.js\"></script></body></html>"
+_JS_OK = "const start = () => { console.log('ok'); };"
+_CSS_OK = "body { margin: 0; }"
+_PY_OK = "def main():\n    return 1\n"
+
+FIXTURES: List[Fixture] = [
+    # Jeden zepsuty plik
+    (
+        {"main.py": "def main(:\n    return 1\n"},
+        {"main.py": _PY_OK},
+    ),
+    # Dwa zepsute pliki webowe
+    (
+        {"index.html": "<html><body></body></html>", "app.js": "const a = () => {", "style.css": _CSS_OK},
+        {"index.html": _HTML_OK, "app.js": _JS_OK},
+    ),
+    # Trzy zepsute pliki + jeden poprawny
+    (
+        {
+            "index.html": "<body></body>",
+            "app.js": "var x = 1;",
+            "style.css": "body { margin: 0;",
+            "main.py": _PY_OK,
+        },
+        {"index.html": _HTML_OK, "app.js": _JS_OK, "style.css": _CSS_OK},
+    ),
+    # Pięć zepsutych plików
+    (
+        {
+            "main.py": "def main(:\n",
+            "game.py": "class Game\n    pass\n",
+            "index.html": "<p>brak struktury</p>",
+            "app.js": "function f() {",
+            "style.css": "}",
+        },
+        {
+            "main.py": _PY_OK,
+            "game.py": "class Game:\n    pass\n",
+            "index.html": _HTML_OK,
+            "app.js": _JS_OK,
+            "style.css": _CSS_OK,
+        },
+    ),
+]
+
+
+def first_error_feedback(qa: QAAgent, code: Dict[str, str]) -> Optional[str]:
+    """Poprzednie zachowanie: feedback tylko o pierwszym błędzie."""
+    for filename, content in code.items():
+        error = qa.quick_syntax_check(filename, content)
+        if error:
+            return error
+    return None
+
+
+def collect_all_feedback(qa: QAAgent, code: Dict[str, str]) -> Optional[str]:
+    """Nowe zachowanie: pełny raport z analizy statycznej."""
+    result = qa._static_check(code, iteration=0)
+    return result["qa_feedback"] if result else None
+
+
+def iterations_to_pass(
+    fixture: Fixture,
+    feedback_fn: Callable[[Dict[str, str]], Optional[str]],
+    max_iterations: int = 20
+) -> int:
+    """
+    Liczy przebiegi QA aż analiza statyczna przejdzie.
+    
+    Args:
+        fixture: (zepsuty projekt, poprawione pliki)
+        feedback_fn: Funkcja zwracająca feedback odrzucenia lub None
+        max_iterations: Bezpiecznik
+    
+    Returns:
+        Liczba przebiegów QA (łącznie z akceptującym)
+    """
+    code, fixed = dict(fixture[0]), fixture[1]
+    
+    for iteration in range(1, max_iterations + 1):
+        feedback = feedback_fn(code)
+        if feedback is None:
+            return iteration
+        
+        for filename in find_mentioned_files(feedback, list(code)):
+            code[filename] = fixed.get(filename, code[filename])
+    
+    return max_iterations
+
+
+def main() -> None:
+    qa = QAAgent()
+    modes = {
+        "pierwszy błąd": lambda code: first_error_feedback(qa, code),
+        "wszystkie problemy": lambda code: collect_all_feedback(qa, code),
+    }
+    
+    for label, feedback_fn in modes.items():
+        counts = [iterations_to_pass(fixture, feedback_fn) for fixture in FIXTURES]
+        print(f"{label:<20} iteracje={counts} średnio={statistics.mean(counts):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/quantization.py
+"""
+Benchmark: kwantyzacja int8 backendu NumPy vs indeks float32.
+
+Ten sam indeks na dysku jest otwierany bez kwantyzacji (wynik dokładny)
+i z kwantyzacją int8 dla kilku wartości rescore_factor. Dla każdego
+wariantu raportuje:
+    - pamięć: dane skanowane przy każdym zapytaniu (musi być w RAM)
+      i rozmiar pliku float32,
+    - recall@k względem dokładnego wyniku (factor 1 = sam int8, bez
+      poprawy kolejności kandydatów spoza top-k),
+    - czas otwarcia (przy int8 - liczenie kodów) i opóźnienie p50/p95.
+
+Korpusy:
+    - repo: chunki projektów z benchmarku wyszukiwania, embeddingi
+      z haszowania n-gramów (offline), zapytania z docstringów,
+    - synthetic: wektory 768-wymiarowe z mieszaniny klastrów
+      (jak embeddingi tekstu), zapytania to zaszumione wektory indeksu.
+
+Uruchomienie:
+    python -m benchmarks.quantization [--chunks 50000] [--k 10] [--factors 1,2,4,8]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from benchmarks.retrieval import HashingEmbeddings, load_projects, build_queries
+from config import settings
+from services.numpy_backend import NumpyBackend, QUANTIZATION_INT8
+from utils.chunkers import chunk_file
+
+DIMENSIONS = 768
+CLUSTERS = 200
+QUERIES = 200
+
+
+class MatrixEmbeddings(Embeddings):
+    """Gotowe wektory: tekst to numer wiersza macierzy."""
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.matrix[[int(text) for text in texts]].tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.matrix[int(text)].tolist()
+
+
+def repo_corpus() -> Tuple[Embeddings, List[str], List[List[float]]]:
+    """Chunki projektów repozytorium i wektory zapytań z docstringów."""
+    embeddings = HashingEmbeddings()
+    projects = load_projects()
+    texts = [
+        chunk.text
+        for files in projects.values()
+        for filename, content in files.items()
+        for chunk in chunk_file(filename, content, settings.rag_chunk_chars, settings.rag_chunk_overlap)
+    ]
+    queries = [text for text, _, _, _ in build_queries(projects)]
+    return embeddings, texts, embeddings.embed_documents(queries)
+
+
+def synthetic_corpus(chunks: int) -> Tuple[Embeddings, List[str], List[List[float]]]:
+    """Wektory jednostkowe skupione wokół CLUSTERS centrów i zaszumione zapytania."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((CLUSTERS, DIMENSIONS)).astype(np.float32)
+    matrix = centers[rng.integers(0, CLUSTERS, chunks)] + 0.8 * rng.standard_normal((chunks, DIMENSIONS)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    queries = matrix[rng.integers(0, chunks, QUERIES)] + 0.3 * rng.standard_normal((QUERIES, DIMENSIONS)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return MatrixEmbeddings(matrix), [str(i) for i in range(chunks)], queries.tolist()
+
+
+def run_variant(path: Path, embeddings: Embeddings, queries: List[List[float]], k: int, **options) -> Dict[str, object]:
+    """Otwiera indeks z podanymi opcjami i mierzy zapytania."""
+    started = time.perf_counter()
+    backend = NumpyBackend(path, embeddings, **options)
+    open_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    results = []
+    for vector in queries:
+        started = time.perf_counter()
+        results.append([chunk.id for chunk, _ in backend.search(vector, k)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    return {
+        "stats": backend.get_stats(),
+        "open_ms": open_ms,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "results": results,
+    }
+
+
+def report(name: str, corpus: Tuple[Embeddings, List[str], List[List[float]]], k: int, factors: List[int]) -> None:
+    """Buduje indeks korpusu i porównuje warianty."""
+    embeddings, texts, queries = corpus
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp)
+        builder = NumpyBackend(path, embeddings)
+        for start in range(0, len(texts), 1000):
+            batch = texts[start:start + 1000]
+            builder.add([f"chunk{start + i}" for i in range(len(batch))], batch, [{}] * len(batch))
+
+        exact = run_variant(path, embeddings, queries, k)
+        stats = exact["stats"]
+        print(f"--- {name}: {stats['chunks']} chunków, {stats['dim']} wymiarów, {len(queries)} zapytań, k={k}")
+        variants = [("float32", exact)] + [
+            (f"int8 x{factor}", run_variant(path, embeddings, queries, k, quantization=QUANTIZATION_INT8, rescore_factor=factor))
+            for factor in factors
+        ]
+
+        for label, m in variants:
+            recall = statistics.mean(
+                len(set(expected) & set(found)) / len(expected) if expected else 1.0
+                for expected, found in zip(exact["results"], m["results"])
+            )
+            print(
+                f"{label:<9} skan={m['stats']['scan_bytes'] / 2**20:.1f} MB "
+                f"(plik float32 {m['stats']['vector_bytes'] / 2**20:.1f} MB, x{m['stats']['compression']}) "
+                f"recall@{k}={recall:.3f} otwarcie={m['open_ms']:.0f} ms "
+                f"p50={m['p50_ms']:.2f} ms p95={m['p95_ms']:.2f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark kwantyzacji int8")
+    parser.add_argument("--chunks", type=int, default=50000, help="Rozmiar korpusu syntetycznego")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", default="1,2,4,8")
+    args = parser.parse_args()
+
+    factors = [int(value) for value in args.factors.split(",")]
+    report("repo", repo_corpus(), args.k, factors)
+    report("synthetic", synthetic_corpus(args.chunks), args.k, factors)
+
+
+if __name__ == "__main__":
+    main()
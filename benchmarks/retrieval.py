@@ -0,0 +1,182 @@
+# benchmarks/retrieval.py
+"""
+Benchmark: wyszukiwanie wektorowe vs BM25 vs hybrydowe z rerankingiem.
+
+Indeksuje projekty (archiwa .zip w katalogu głównym i źródła tego
+repozytorium jako osobny projekt) w tymczasowej bazie ChromaDB przez
+VectorStoreService.add_project. Zapytania to pierwsze linie docstringów
+funkcji i klas Pythona, a trafne są chunki zawierające daną definicję.
+Mierzy recall@1, recall@k, MRR, średnią liczbę zwróconych chunków
+(= ile trafia do promptu) i opóźnienie zapytania (p50/p95, bez cache).
+
+Domyślnie offline: embeddingi z haszowania n-gramów znaków (bez Ollamy).
+Zapytania z docstringów sprzyjają BM25 - z prawdziwym modelem
+embeddingów (--embeddings ollama) porównanie jest bardziej miarodajne.
+
+Uruchomienie:
+    python -m benchmarks.retrieval [--embeddings hashing|ollama] [--k 3]
+"""
+
+import argparse
+import ast
+import hashlib
+import math
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from langchain_core.embeddings import Embeddings
+from benchmarks.chunking import load_corpus
+from config import settings
+from utils.chunkers import chunk_file, detect_language, LANGUAGE_PYTHON
+
+ROOT = Path(__file__).resolve().parent.parent
+REPO_PROJECT = "agileflow"
+MODES = ("vector", "lexical", "hybrid")
+
+# Zapytanie: (tekst, projekt, plik, indeksy trafnych chunków)
+Query = Tuple[str, str, str, Set[int]]
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministyczne embeddingi offline: haszowane 3-gramy znaków, znormalizowane L2."""
+
+    model = "hashing-trigrams"
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        text = " ".join(text.lower().split())
+        for i in range(len(text) - 2):
+            digest = hashlib.md5(text[i:i + 3].encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def load_projects() -> Dict[str, Dict[str, str]]:
+    """Korpus benchmarku chunkowania pogrupowany w projekty {projekt: {plik: treść}}."""
+    archives = {archive.stem for archive in ROOT.glob("*.zip")}
+    projects: Dict[str, Dict[str, str]] = {}
+
+    for path, content in load_corpus().items():
+        project, _, filename = path.partition("/")
+        if project not in archives:
+            project, filename = REPO_PROJECT, path
+        projects.setdefault(project, {})[filename] = content
+    return projects
+
+
+def build_queries(projects: Dict[str, Dict[str, str]]) -> List[Query]:
+    """Zapytania z docstringów i chunki, które zawierają opisane definicje."""
+    queries = []
+
+    for project, files in projects.items():
+        for filename, content in files.items():
+            if detect_language(filename) != LANGUAGE_PYTHON:
+                continue
+            try:
+                tree = ast.parse(content)
+            except SyntaxError:
+                continue
+
+            chunks = chunk_file(filename, content, settings.rag_chunk_chars, settings.rag_chunk_overlap)
+            for node in ast.walk(tree):
+                if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    continue
+                docstring = ast.get_docstring(node)
+                if not docstring or len(docstring.split()) < 3:
+                    continue
+
+                relevant = {
+                    i for i, chunk in enumerate(chunks)
+                    if chunk.start_line <= node.lineno <= chunk.end_line
+                }
+                queries.append((docstring.splitlines()[0], project, filename, relevant))
+
+    return queries
+
+
+def evaluate(service, queries: List[Query], mode: str, k: int) -> Dict[str, float]:
+    """Metryki jakości i opóźnienia jednego trybu wyszukiwania."""
+    hits_at_1 = hits_at_k = 0
+    reciprocal_ranks = []
+    returned = []
+    latencies = []
+
+    for text, project, filename, relevant in queries:
+        started = time.perf_counter()
+        # Próg L2 wyłączony - porównujemy ranking, nie kalibrację progu
+        results = service.search_similar(text, k=k, score_threshold=float("inf"), mode=mode)
+        latencies.append((time.perf_counter() - started) * 1000)
+        returned.append(len(results))
+
+        rank = next(
+            (
+                position for position, item in enumerate(results, start=1)
+                if item["project"] == project and item["filename"] == filename
+                and item["chunk_index"] in relevant
+            ),
+            None
+        )
+        hits_at_1 += rank == 1
+        hits_at_k += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    latencies.sort()
+    return {
+        "recall_1": hits_at_1 / len(queries),
+        "recall_k": hits_at_k / len(queries),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "returned": statistics.mean(returned),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark wyszukiwania RAG")
+    parser.add_argument("--embeddings", choices=("hashing", "ollama"), default="hashing")
+    parser.add_argument("--k", type=int, default=settings.rag_prompt_chunks)
+    args = parser.parse_args()
+
+    projects = load_projects()
+    queries = build_queries(projects)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Osobna baza - benchmark nie dotyka indeksu aplikacji; bez cache wyników
+        settings.chroma_db_path = Path(tmp)
+        settings.rag_cache_enabled = False
+        from services.vector_store_service import VectorStoreService
+        from services.embedding_service import embedding_service
+
+        service = VectorStoreService(
+            embeddings=embedding_service if args.embeddings == "ollama" else HashingEmbeddings()
+        )
+        started = time.perf_counter()
+        chunks = sum(service.add_project(name, files).added for name, files in projects.items())
+        print(
+            f"Indeks: {len(projects)} projektów, {chunks} chunków w {time.perf_counter() - started:.1f}s; "
+            f"zapytań: {len(queries)}, embeddingi: {args.embeddings}, k={args.k}"
+        )
+
+        for mode in MODES:
+            m = evaluate(service, queries, mode, args.k)
+            print(
+                f"{mode:<8} recall@1={m['recall_1']:.3f} recall@{args.k}={m['recall_k']:.3f} "
+                f"MRR={m['mrr']:.3f} chunki={m['returned']:.2f} "
+                f"p50={m['p50_ms']:.1f} ms p95={m['p95_ms']:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
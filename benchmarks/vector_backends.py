@@ -0,0 +1,137 @@
+# benchmarks/vector_backends.py
+"""
+Benchmark: backend ChromaDB vs NumPy (memmap, brute-force).
+
+Dla kilku rozmiarów indeksu mierzy:
+    - ingest: dodanie chunków batchami po 500 (embeddingi są gotowe,
+      więc liczy się tylko koszt bazy),
+    - zimny start: nowy proces - import backendu, otwarcie zapisanego
+      indeksu i pierwsze zapytanie,
+    - zapytanie: p50/p95 dla k=20 na ciepłym backendzie,
+    - zgodność: ile z top-k Chromy (HNSW, przybliżone) zwraca NumPy (dokładne).
+
+Wektory są losowe (768 wymiarów jak nomic-embed-text), bez Ollamy.
+
+Uruchomienie:
+    python -m benchmarks.vector_backends [--chunks 2000,20000] [--queries 200]
+"""
+
+import argparse
+import hashlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+ROOT = Path(__file__).resolve().parent.parent
+DIMENSIONS = 768
+BATCH = 500
+K = 20
+BACKENDS = ("chroma", "numpy")
+
+
+class RandomEmbeddings(Embeddings):
+    """Losowe, ale deterministyczne (po hashu tekstu) wektory jednostkowe."""
+    
+    model = "random"
+    
+    def _embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(DIMENSIONS).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def open_backend(name: str, path: Path):
+    """Backend z services.vector_backends na podanym katalogu."""
+    from services.vector_backends import create_backend
+    return create_backend(name, path, RandomEmbeddings())
+
+
+def cold_start(name: str, path: Path) -> float:
+    """Zimny start w osobnym procesie (import + otwarcie indeksu + pierwsze zapytanie), w ms."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.vector_backends", "--cold", name, str(path)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run_cold(name: str, path: str) -> None:
+    """Tryb procesu potomnego dla cold_start()."""
+    started = time.perf_counter()
+    backend = open_backend(name, Path(path))
+    backend.search(RandomEmbeddings().embed_query("cold"), K)
+    print((time.perf_counter() - started) * 1000)
+
+
+def measure(name: str, path: Path, chunks: int, queries: List[List[float]]) -> Dict[str, float]:
+    """Ingest, zimny start i zapytania jednego backendu."""
+    backend = open_backend(name, path)
+    started = time.perf_counter()
+    for start in range(0, chunks, BATCH):
+        ids = [f"chunk{i}" for i in range(start, min(start + BATCH, chunks))]
+        backend.add(ids, ids, [{"project": f"p{i % 10}"} for i in range(len(ids))])
+    ingest = time.perf_counter() - started
+    
+    latencies = []
+    results = []
+    for vector in queries:
+        started = time.perf_counter()
+        results.append([chunk.id for chunk, _ in backend.search(vector, K)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    
+    return {
+        "ingest_s": ingest,
+        "cold_ms": cold_start(name, path),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark backendów wektorowych")
+    parser.add_argument("--chunks", default="2000,20000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cold", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.cold:
+        run_cold(*args.cold)
+        return
+    
+    embeddings = RandomEmbeddings()
+    queries = [embeddings.embed_query(f"query {i}") for i in range(args.queries)]
+    
+    for chunks in (int(value) for value in args.chunks.split(",")):
+        print(f"--- {chunks} chunków, {DIMENSIONS} wymiarów, k={K}")
+        measured = {}
+        for name in BACKENDS:
+            with tempfile.TemporaryDirectory() as tmp:
+                measured[name] = m = measure(name, Path(tmp), chunks, queries)
+            print(
+                f"{name:<7} ingest={m['ingest_s']:.2f}s ({chunks / m['ingest_s']:.0f} chunków/s) "
+                f"zimny start={m['cold_ms']:.0f} ms zapytanie p50={m['p50_ms']:.2f} ms p95={m['p95_ms']:.2f} ms"
+            )
+        
+        overlap = statistics.mean(
+            len(set(exact) & set(approximate)) / K
+            for exact, approximate in zip(measured["numpy"]["results"], measured["chroma"]["results"])
+        )
+        print(f"zgodność top-{K} (Chroma HNSW vs NumPy dokładne): {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Wszystkie ustawienia w jednym miejscu z walidacją typów.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -22,6 +22,14 @@ class Settings(BaseSettings):
         default="http://localhost:11434",
         description="URL serwera Ollama"
     )
+    ollama_base_urls: List[str] = Field(
+        default_factory=list,
+        description="Lista serwerów Ollama (JSON); pusta = tylko ollama_base_url"
+    )
+    ollama_eject_seconds: float = Field(
+        default=30.0,
+        description="Na ile wyłączyć endpoint po timeoucie / braku połączenia"
+    )
     ollama_verify_ssl: bool = Field(default=True)
     ollama_token: Optional[str] = Field(default=None)
     ollama_timeout: float = Field(default=600.0)
@@ -37,18 +45,145 @@ class Settings(BaseSettings):
     )
     
     # === Parametry LLM ===
-    llm_num_ctx: int = Field(default=8192, description="Rozmiar kontekstu")
+    llm_num_ctx: int = Field(default=8192, description="Rozmiar kontekstu (maksymalny)")
+    llm_dynamic_num_ctx: bool = Field(default=True, description="Dobieraj num_ctx per wywołanie")
+    llm_num_ctx_buckets: List[int] = Field(
+        default_factory=lambda: [2048, 4096, 8192, 16384],
+        description="Dozwolone rozmiary kontekstu (powyżej llm_num_ctx są pomijane)"
+    )
     llm_num_predict: int = Field(default=8192, description="Max tokenów w odpowiedzi")
     llm_temperature_default: float = Field(default=0.2)
+    llm_output_reserve: int = Field(
+        default=2048,
+        description="Min. rezerwa kontekstu na odpowiedź (więcej gdy agent spodziewa się dłuższej, max pół num_ctx)"
+    )
+    
+    # === Warm-up / keep-alive modeli ===
+    llm_warmup_on_startup: bool = Field(default=True, description="Ładuj modele przy starcie aplikacji")
+    llm_keep_alive: str = Field(default="30m", description="keep_alive modelu czatu w Ollama")
+    llm_keep_alive_embeddings: str = Field(default="30m", description="keep_alive modelu embeddingów")
+    llm_keep_alive_interval: float = Field(default=240.0, description="Co ile sekund pingować modele")
+    
+    # === Scheduler LLM ===
+    llm_max_concurrency_per_endpoint: int = Field(
+        default=1,
+        description="Ile równoczesnych generacji jednego modelu na endpoint"
+    )
+    llm_max_queue_depth: int = Field(
+        default=20,
+        description="Max żądań w kolejce - kolejne są odrzucane od razu"
+    )
+    
+    # === Cache odpowiedzi LLM ===
+    llm_cache_enabled: bool = Field(default=True, description="Globalny włącznik cache odpowiedzi")
+    llm_cache_path: Path = Field(default=Path("llm_cache/responses.sqlite"))
+    llm_cache_max_mb: float = Field(default=256.0, description="Limit rozmiaru cache (LRU)")
+    
+    # === Ochrona przed zdegenerowaną odpowiedzią (pętle) ===
+    llm_guard_enabled: bool = Field(default=True, description="Przerywaj generację, która wpadła w pętlę")
+    llm_guard_max_line_repeats: int = Field(default=30, description="Ile razy z rzędu ta sama linia")
+    llm_guard_max_block_repeats: int = Field(default=10, description="Ile razy z rzędu ten sam blok linii")
+    llm_guard_max_line_chars: int = Field(default=4000, description="Max długość pojedynczej linii")
+    llm_guard_max_fence_tokens: int = Field(
+        default=0,
+        description="Max długość niezamkniętego bloku ``` (0 = tylko gdy num_predict skończy się w bloku)"
+    )
+    llm_guard_repeat_penalty: float = Field(default=1.3, description="repeat_penalty przy ponowieniu")
+    llm_guard_retries: int = Field(default=1, description="Ile ponowień po przerwaniu generacji")
     
     # === Ścieżki ===
     output_dir: Path = Field(default=Path("output_projects"))
     chroma_db_path: Path = Field(default=Path("chroma_db"))
     
+    # === Baza wektorowa (RAG) ===
+    vector_backend: str = Field(default="chroma", description="chroma | numpy (macierz float32 mapowana z dysku)")
+    vector_numpy_metric: str = Field(default="l2", description="l2 (kwadrat odległości, jak Chroma) | cosine")
+    vector_numpy_compact_ratio: float = Field(
+        default=0.3,
+        description="Kompaktuj pliki NumPy, gdy usunięte wiersze przekroczą tę część"
+    )
+    vector_numpy_block_rows: int = Field(default=65536, description="Wierszy na blok przy wyszukiwaniu brute-force")
+    vector_quantization: str = Field(
+        default="none",
+        description="none | int8 (backend numpy: kody int8 w RAM, dokładny rescoring z float32 na dysku)"
+    )
+    vector_rescore_factor: int = Field(default=4, description="Ilu kandydatów na wynik przeliczać dokładnie przy int8")
+    
+    # === Embeddingi (RAG) ===
+    embedding_batch_size: int = Field(default=32, description="Ile chunków w jednym żądaniu embeddingów")
+    embedding_max_parallel: int = Field(default=4, description="Max równoległych batchy embeddingów")
+    embedding_cache_enabled: bool = Field(default=True, description="Cache wektorów po hashu treści chunka")
+    embedding_cache_path: Path = Field(default=Path("llm_cache/embeddings.sqlite"))
+    embedding_cache_max_mb: float = Field(default=512.0, description="Limit rozmiaru cache wektorów (LRU)")
+    
+    # === Developer ===
+    developer_parallel_files: bool = Field(
+        default=False,
+        description="Osobna generacja dla każdego pliku z listy Architekta"
+    )
+    developer_max_parallel: int = Field(default=3, description="Max równoległych generacji plików")
+    developer_incremental_fix: bool = Field(
+        default=True,
+        description="W iteracji fix regeneruj tylko pliki wskazane przez QA"
+    )
+    developer_abort_on_fatal: bool = Field(
+        default=True,
+        description="Przerwij streaming, gdy gotowy plik ma błąd krytyczny (od razu iteracja fix)"
+    )
+    
+    # === QA ===
+    qa_review_mode: str = Field(
+        default="auto",
+        description="single | map_reduce | auto (map-reduce gdy kod nie mieści się w num_ctx)"
+    )
+    qa_max_parallel: int = Field(default=3, description="Max równoległych review plików")
+    qa_chunk_tokens: int = Field(default=3000, description="Max rozmiar fragmentu pliku w review")
+    sandbox_enabled: bool = Field(default=True, description="Smoke-test importu modułów Pythona przed review AI")
+    sandbox_timeout: float = Field(default=10.0, description="Limit czasu uruchomienia w sandboxie (s)")
+    sandbox_cpu_seconds: int = Field(default=10, description="Limit CPU procesu w sandboxie (s)")
+    sandbox_memory_mb: int = Field(default=1024, description="Limit pamięci procesu w sandboxie (MB)")
+    sandbox_max_parallel: int = Field(default=4, description="Max równoległych procesów sandboxa")
+    static_check_workers: int = Field(default=0, description="Procesy analizy statycznej (0 = liczba CPU)")
+    static_check_parallel_min_bytes: int = Field(
+        default=200_000,
+        description="Od tylu bajtów kodu analiza statyczna idzie w puli procesów"
+    )
+    
     # === Limity ===
     max_iterations: int = Field(default=10, description="Max pętli dev-QA")
     rag_top_k: int = Field(default=6, description="Ile wyników z RAG")
     rag_score_threshold: float = Field(default=0.75, description="Próg podobieństwa")
+    rag_chunk_chars: int = Field(default=1800, description="Max rozmiar chunka w indeksie RAG (znaki)")
+    rag_chunk_overlap: int = Field(
+        default=200,
+        description="Overlap tylko przy podziale po rozmiarze (plik bez struktury lub za duża definicja)"
+    )
+    rag_search_mode: str = Field(default="hybrid", description="hybrid | vector | lexical (BM25)")
+    rag_hybrid_candidates: int = Field(default=20, description="Ile kandydatów z wektorów i z BM25 do fuzji")
+    rag_rrf_k: int = Field(default=60, description="Stała k w Reciprocal Rank Fusion")
+    rag_rerank_weight: float = Field(default=0.5, description="Waga pokrycia termów zapytania w rerankingu (reszta - RRF)")
+    rag_hybrid_min_coverage: float = Field(
+        default=0.3,
+        description="Chunk spoza progu odległości (lub bez wektorów) musi pokrywać tyle zapytania (termy ważone IDF)"
+    )
+    rag_rerank_min_ratio: float = Field(
+        default=0.7,
+        description="Odrzuć wyniki z wynikiem rerankingu poniżej tej części najlepszego"
+    )
+    rag_prompt_chunks: int = Field(default=3, description="Max chunków RAG w prompcie Architekta")
+    rag_cache_enabled: bool = Field(default=True, description="Cache wektorów zapytań i wyników wyszukiwania RAG")
+    rag_cache_max_entries: int = Field(default=256, description="Max wpisów w cache wyszukiwania (LRU)")
+    rag_query_cache_disk: bool = Field(
+        default=False,
+        description="Wektory zapytań także w trwałym cache embeddingów (między restartami)"
+    )
+    rag_ingest_background: bool = Field(
+        default=True,
+        description="Zapis projektu do RAG w tle (trwała kolejka) zamiast na końcu żądania"
+    )
+    rag_ingest_queue_path: Path = Field(default=Path("chroma_db/ingest_queue.sqlite"))
+    rag_ingest_max_attempts: int = Field(default=3, description="Ile prób zapisu projektu do RAG")
+    rag_ingest_retry_delay: float = Field(default=5.0, description="Opóźnienie ponowienia (s, rośnie z próbą)")
     
     class Config:
         env_file = ".env"
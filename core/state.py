@@ -4,7 +4,7 @@ Definicja stanu projektu dla LangGraph.
 """
 
 import operator
-from typing import Annotated, List, Dict
+from typing import Annotated, List, Dict, Any
 from typing_extensions import TypedDict
 
 
@@ -20,6 +20,11 @@ class ProjectState(TypedDict):
         qa_feedback: Feedback od QA (jeśli REJECTED)
         qa_status: Status QA - "APPROVED" lub "REJECTED"
         iteration_count: Licznik pętli developer-QA
+        changed_files: Pliki zmienione przez Developera w ostatniej iteracji
+        generation_aborted: Developer przerwał generację po błędzie krytycznym
+        iteration_changes: Historia zmian per iteracja (akumulowana):
+            {"iteration", "mode" ("full" / "fix"), "changed": [...]}
+        output_dir: Katalog plików projektu tej sesji ("" = settings.output_dir)
         logs: Lista logów z całego procesu (akumulowana)
     """
     user_request: str
@@ -29,15 +34,20 @@ class ProjectState(TypedDict):
     qa_feedback: str
     qa_status: str
     iteration_count: int
+    changed_files: List[str]
+    generation_aborted: bool
+    iteration_changes: Annotated[List[Dict[str, Any]], operator.add]
+    output_dir: str
     logs: Annotated[List[str], operator.add]
 
 
-def create_initial_state(user_request: str) -> ProjectState:
+def create_initial_state(user_request: str, output_dir: str = "") -> ProjectState:
     """
     Tworzy początkowy stan projektu.
     
     Args:
         user_request: Żądanie użytkownika
+        output_dir: Katalog plików projektu sesji ("" = settings.output_dir)
     
     Returns:
         Zainicjalizowany ProjectState
@@ -50,5 +60,9 @@ def create_initial_state(user_request: str) -> ProjectState:
         "qa_feedback": "",
         "qa_status": "",
         "iteration_count": 0,
+        "changed_files": [],
+        "generation_aborted": False,
+        "iteration_changes": [],
+        "output_dir": output_dir,
         "logs": []
     }
\ No newline at end of file
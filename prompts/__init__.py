@@ -5,12 +5,16 @@ from prompts.agent_prompts import (
     PRODUCT_OWNER_PROMPT,
     ARCHITECT_PROMPT,
     DEVELOPER_PROMPT,
-    QA_PROMPT
+    QA_PROMPT,
+    QA_FILE_REVIEW_PROMPT,
+    QA_REDUCE_PROMPT
 )
 
 __all__ = [
     "PRODUCT_OWNER_PROMPT",
     "ARCHITECT_PROMPT", 
     "DEVELOPER_PROMPT",
-    "QA_PROMPT"
+    "QA_PROMPT",
+    "QA_FILE_REVIEW_PROMPT",
+    "QA_REDUCE_PROMPT"
 ]
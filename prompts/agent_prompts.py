@@ -136,3 +136,37 @@ ODPOWIEDŹ:
 Przykład dobrego REJECTED:
 "REJECTED: W pliku main.py brakuje importu 'random'. W game.html niepoprawna ścieżka do game.js (jest 'game.js' a powinno być 'static/game.js')."
 """
+
+
+QA_FILE_REVIEW_PROMPT = """
+Jesteś Senior QA Engineerem (Polyglot).
+Audytujesz JEDEN plik (lub fragment pliku) większego projektu.
+Interfejsy pozostałych plików dostajesz tylko do sprawdzenia spójności.
+
+ZASADY OCENY:
+1. Czy kod jest kompletny? (Nie ma TODO, placeholder'ów)
+2. Czy importy/include są poprawne i zgodne z interfejsami innych plików?
+3. Czy logika ma sens?
+4. Zgłaszaj TYLKO realne problemy w ocenianym fragmencie.
+
+ODPOWIEDŹ - wyłącznie JSON:
+```json
+{"issues": [{"severity": "critical|major|minor", "line": 12, "problem": "konkretny opis"}]}
+```
+Brak problemów → {"issues": []}
+"""
+
+QA_REDUCE_PROMPT = """
+Jesteś Lead QA Engineerem.
+Dostajesz wyniki review poszczególnych plików projektu i interfejsy plików.
+Wydaj jeden werdykt dla całego projektu.
+
+ZASADY:
+1. Problemy "critical" i "major" → odrzucenie.
+2. Same drobne problemy ("minor") → akceptacja.
+3. Sprawdź spójność między plikami (importy, ścieżki, nazwy funkcji).
+
+ODPOWIEDŹ:
+- Jeśli OK → 'APPROVED'
+- Jeśli błędy → 'REJECTED: [lista konkretnych problemów w konkretnych plikach, od najpoważniejszych]'
+"""
\ No newline at end of file
@@ -7,5 +7,12 @@ Każdy serwis jest samodzielną jednostką z jasnym interfejsem.
 from services.llm_service import LLMService
 from services.vector_store_service import VectorStoreService
 from services.file_service import FileService
+from services.code_checker import CodeChecker
+from services.sandbox_service import SandboxService
+from services.embedding_service import EmbeddingService
+from services.ingest_queue import IngestQueue
 
-__all__ = ["LLMService", "VectorStoreService", "FileService"]
+__all__ = [
+    "LLMService", "VectorStoreService", "FileService", "CodeChecker", "SandboxService",
+    "EmbeddingService", "IngestQueue"
+]
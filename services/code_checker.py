@@ -0,0 +1,153 @@
+# services/code_checker.py
+"""
+Serwis analizy statycznej kodu.
+Uruchamia checkery z utils.code_checks w puli procesów i cache'uje
+wyniki po hashu treści - niezmienione pliki nie są sprawdzane ponownie.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+from config import settings
+from utils.code_checks import Diagnostic, SEVERITY_ORDER, get_checker, run_checks
+from utils.logger import get_service_logger
+
+logger = get_service_logger("code_checker")
+
+
+class CodeChecker:
+    """
+    Analiza statyczna plików projektu z cache po treści.
+    
+    Pula procesów startuje leniwie i jest używana tylko, gdy do sprawdzenia
+    jest dużo kodu - dla kilku małych plików narzut procesów jest większy
+    niż zysk.
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_min_bytes: Optional[int] = None,
+        cache_size: int = 2048
+    ):
+        self.max_workers = max_workers or settings.static_check_workers or None
+        self.parallel_min_bytes = (
+            settings.static_check_parallel_min_bytes if parallel_min_bytes is None else parallel_min_bytes
+        )
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], List[Diagnostic]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {"hits": 0, "misses": 0, "parallel_runs": 0}
+    
+    @staticmethod
+    def _key(filename: str, content: str) -> Tuple[str, str]:
+        """Klucz cache: nazwa pliku (komunikaty ją zawierają) + hash treści."""
+        return filename, hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Leniwie tworzona pula procesów."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+    
+    def _run(self, files: Dict[str, str]) -> Dict[str, List[Diagnostic]]:
+        """Sprawdza pliki - w puli procesów gdy jest ich dużo, inaczej w miejscu."""
+        total_bytes = sum(len(content) for content in files.values())
+        
+        if len(files) > 1 and total_bytes >= self.parallel_min_bytes:
+            try:
+                executor = self._get_executor()
+                names = list(files)
+                results = executor.map(run_checks, names, [files[name] for name in names])
+                self._stats["parallel_runs"] += 1
+                return dict(zip(names, results))
+            except Exception as e:
+                logger.warning(f"Pula procesów niedostępna, sprawdzam sekwencyjnie: {e}")
+        
+        return {filename: run_checks(filename, content) for filename, content in files.items()}
+    
+    def check_files(self, code_dict: Dict[str, str]) -> List[Diagnostic]:
+        """
+        Sprawdza wszystkie pliki projektu.
+        
+        Args:
+            code_dict: Słownik {filename: content}
+        
+        Returns:
+            Diagnostyki posortowane: błędy przed ostrzeżeniami, w kolejności plików
+        """
+        results: Dict[str, List[Diagnostic]] = {}
+        to_check: Dict[str, str] = {}
+        
+        with self._lock:
+            for filename, content in code_dict.items():
+                if get_checker(filename) is None:
+                    continue
+                
+                key = self._key(filename, content)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[filename] = self._cache[key]
+                    self._stats["hits"] += 1
+                else:
+                    to_check[filename] = content
+                    self._stats["misses"] += 1
+        
+        if to_check:
+            checked = self._run(to_check)
+            
+            with self._lock:
+                for filename, diagnostics in checked.items():
+                    self._cache[self._key(filename, to_check[filename])] = diagnostics
+                    results[filename] = diagnostics
+                
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        logger.debug(f"Sprawdzono {len(to_check)} plików, z cache {len(results) - len(to_check)}")
+        
+        diagnostics = [d for filename in code_dict for d in results.get(filename, [])]
+        return sorted(diagnostics, key=lambda d: SEVERITY_ORDER[d.severity])
+    
+    def check_file(self, filename: str, content: str) -> List[Diagnostic]:
+        """
+        Sprawdza pojedynczy plik (z cache).
+        
+        Args:
+            filename: Nazwa pliku
+            content: Zawartość pliku
+        
+        Returns:
+            Lista diagnostyk
+        """
+        return self.check_files({filename: content})
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki cache i puli.
+        
+        Returns:
+            Słownik z hits, misses, hit_rate, parallel_runs, entries
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._cache)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+    
+    def shutdown(self) -> None:
+        """Zamyka pulę procesów."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Singleton
+code_checker = CodeChecker()
@@ -0,0 +1,158 @@
+# services/embedding_cache.py
+"""
+Trwały cache embeddingów (SQLite).
+Klucz = (model embeddingów, hash treści chunka) - niezmieniony chunk
+nie jest liczony ponownie przy kolejnym dodaniu projektu.
+"""
+
+import hashlib
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List
+from utils.logger import get_service_logger
+from utils.sqlite import LRUTable, connect
+
+logger = get_service_logger("embedding_cache")
+
+# Limit zmiennych w jednym zapytaniu SQLite (bezpiecznie poniżej 999)
+_SQL_BATCH = 500
+
+_EMBEDDINGS = LRUTable("embeddings", keys=("model", "hash"), size_column="vector", length_of=True)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache wektorów z eviction LRU po rozmiarze.
+    
+    Wektory są zapisywane jako float32 - tyle i tak przechowuje Chroma,
+    a rozmiar bazy spada o połowę względem float64. Łączny rozmiar
+    wektorów jest utrzymywany przez triggery (utils.sqlite.LRUTable).
+    """
+    
+    def __init__(self, db_path: Path, max_size_mb: float = 512.0):
+        self.db_path = Path(db_path)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._init_db()
+    
+    def _init_db(self) -> None:
+        """Tworzy tabelę cache jeśli nie istnieje."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, hash)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_emb_last_access ON embeddings(last_access)")
+            _EMBEDDINGS.create(conn)
+    
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """
+        Hash treści chunka.
+        
+        Args:
+            text: Treść chunka
+        
+        Returns:
+            Hash SHA-256 (hex)
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        Zwraca wektory znalezione w cache i odświeża ich czas dostępu.
+        
+        Args:
+            model: Nazwa modelu embeddingów
+            hashes: Hashe z content_hash()
+        
+        Returns:
+            Słownik {hash: wektor} (tylko trafienia)
+        """
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        
+        with self._lock, connect(self.db_path) as conn:
+            for start in range(0, len(unique), _SQL_BATCH):
+                part = unique[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    (model, *part)
+                ).fetchall()
+                
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            
+            now = time.time()
+            conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE model = ? AND hash = ?",
+                [(now, model, key) for key in found]
+            )
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(unique) - len(found)
+        
+        return found
+    
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """
+        Zapisuje wektory i usuwa najdawniej używane wpisy ponad limit rozmiaru.
+        
+        Args:
+            model: Nazwa modelu embeddingów
+            vectors: Słownik {hash: wektor}
+        """
+        if not vectors:
+            return
+        
+        now = time.time()
+        rows = [(model, key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+        
+        with self._lock, connect(self.db_path) as conn:
+            # Upsert zamiast INSERT OR REPLACE - REPLACE nie uruchamia triggera DELETE
+            conn.executemany(
+                """
+                INSERT INTO embeddings VALUES (?, ?, ?, ?)
+                ON CONFLICT(model, hash) DO UPDATE SET
+                    vector = excluded.vector, last_access = excluded.last_access
+                """,
+                rows
+            )
+            self._stats["stores"] += len(rows)
+            evicted = _EMBEDDINGS.evict(conn, self.max_size_bytes)
+            if evicted:
+                self._stats["evictions"] += evicted
+                logger.debug(f"Eviction: usunięto {evicted} wektorów z cache")
+    
+    def clear(self) -> None:
+        """Czyści cały cache."""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("DELETE FROM embeddings")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki cache (liczniki procesu + stan bazy).
+        
+        Returns:
+            Słownik z hits, misses, stores, evictions, hit_rate, entries, size_bytes
+        """
+        with self._lock, connect(self.db_path) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            size = _EMBEDDINGS.total_size(conn)
+            stats = dict(self._stats)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        return stats
@@ -0,0 +1,190 @@
+# services/embedding_service.py
+"""
+Warstwa embeddingów dla RAG.
+Dzieli chunki na batche, liczy je równolegle na endpointach Ollama
+i cache'uje wektory po (model, hash treści chunka).
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from config import settings
+from services.embedding_cache import EmbeddingCache
+from services.llm_service import llm_service
+from utils.logger import get_service_logger
+
+logger = get_service_logger("embeddings")
+
+
+class EmbeddingService(Embeddings):
+    """
+    Embeddingi chunków z batchowaniem, współbieżnością i cache.
+    
+    Zgodne z interfejsem Embeddings, więc Chroma używa ich bezpośrednio.
+    Każdy batch to osobne żądanie do puli endpointów - przy kilku
+    serwerach Ollama batche liczą się równolegle na różnych maszynach.
+    Zapytania (embed_query) domyślnie idą bez cache na dysku - powtórzenia
+    w obrębie procesu łapie cache wyszukiwania w VectorStoreService.
+    """
+    
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_parallel: Optional[int] = None
+    ):
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.max_parallel = max_parallel or settings.embedding_max_parallel
+        self._cache: Optional[EmbeddingCache] = None
+        self._lock = threading.Lock()
+        self._stats = {"chunks": 0, "reused": 0, "embedded": 0, "batches": 0, "seconds": 0.0}
+    
+    @property
+    def cache(self) -> EmbeddingCache:
+        """Lazy-loaded cache wektorów (SQLite)."""
+        if self._cache is None:
+            self._cache = EmbeddingCache(
+                settings.embedding_cache_path,
+                max_size_mb=settings.embedding_cache_max_mb
+            )
+        return self._cache
+    
+    @property
+    def model(self) -> str:
+        """Model embeddingów - część klucza cache."""
+        return settings.model_embeddings
+    
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        """
+        Hashe chunków, wektory z cache i chunki do policzenia (bez duplikatów).
+        
+        Returns:
+            Krotka (hashes, cached {hash: wektor}, missing {hash: tekst})
+        """
+        hashes = [EmbeddingCache.content_hash(text) for text in texts]
+        cached: Dict[str, List[float]] = {}
+        
+        if settings.embedding_cache_enabled:
+            try:
+                cached = self.cache.get_many(self.model, hashes)
+            except Exception as e:
+                logger.warning(f"Cache embeddingów niedostępny: {e}")
+        
+        missing = {h: text for h, text in zip(hashes, texts) if h not in cached}
+        return hashes, cached, missing
+    
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        """Zapisuje nowe wektory (błędy cache nie przerywają ingestii)."""
+        if not settings.embedding_cache_enabled:
+            return
+        try:
+            self.cache.put_many(self.model, vectors)
+        except Exception as e:
+            logger.warning(f"Nie udało się zapisać embeddingów do cache: {e}")
+    
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        """Dzieli teksty na batche po batch_size."""
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+    
+    def _finish(
+        self,
+        hashes: List[str],
+        cached: Dict[str, List[float]],
+        missing: Dict[str, str],
+        results: List[List[List[float]]],
+        batches: int,
+        started: float
+    ) -> List[List[float]]:
+        """Składa wektory w kolejności wejścia, zapisuje nowe do cache, aktualizuje metryki."""
+        fresh = dict(zip(missing, (vector for batch in results for vector in batch)))
+        self._store(fresh)
+        vectors = {**cached, **fresh}
+        
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["chunks"] += len(hashes)
+            self._stats["reused"] += len(hashes) - len(missing)
+            self._stats["embedded"] += len(missing)
+            self._stats["batches"] += batches
+            self._stats["seconds"] += elapsed
+        
+        logger.info(
+            f"Embeddingi: {len(hashes)} chunków (ponownie użyte {len(hashes) - len(missing)}, "
+            f"{batches} batchy) w {elapsed:.2f}s - {len(hashes) / max(elapsed, 1e-6):.1f} chunków/s"
+        )
+        return [vectors[h] for h in hashes]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Wektory chunków - z cache lub liczone batchami równolegle.
+        
+        Args:
+            texts: Treści chunków
+        
+        Returns:
+            Wektory w kolejności texts
+        """
+        if not texts:
+            return []
+        
+        started = time.perf_counter()
+        hashes, cached, missing = self._lookup(texts)
+        batches = self._batches(list(missing.values()))
+        results: List[List[List[float]]] = []
+        
+        if batches:
+            embeddings = llm_service.get_embeddings()
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(batches))) as executor:
+                results = list(executor.map(embeddings.embed_documents, batches))
+        
+        return self._finish(hashes, cached, missing, results, len(batches), started)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchroniczna wersja embed_documents() (max_parallel batchy naraz)."""
+        if not texts:
+            return []
+        
+        started = time.perf_counter()
+        hashes, cached, missing = await asyncio.to_thread(self._lookup, texts)
+        batches = self._batches(list(missing.values()))
+        embeddings = llm_service.get_embeddings()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await embeddings.aembed_documents(batch)
+        
+        results = await asyncio.gather(*(embed(batch) for batch in batches))
+        return await asyncio.to_thread(
+            self._finish, hashes, cached, missing, list(results), len(batches), started
+        )
+    
+    def embed_query(self, text: str) -> List[float]:
+        # Opcjonalnie przez trwały cache - Ollama liczy zapytania i dokumenty tak samo
+        if settings.rag_query_cache_disk:
+            return self.embed_documents([text])[0]
+        return llm_service.get_embeddings().embed_query(text)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        return await llm_service.get_embeddings().aembed_query(text)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Metryki ingestii embeddingów (łącznie od startu procesu).
+        
+        Returns:
+            Słownik z chunks, reused, embedded, batches, seconds, chunks_per_s, reuse_rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        
+        stats["chunks_per_s"] = round(stats["chunks"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+        stats["reuse_rate"] = round(stats["reused"] / stats["chunks"], 3) if stats["chunks"] else 0.0
+        stats["seconds"] = round(stats["seconds"], 3)
+        return stats
+
+
+# Singleton
+embedding_service = EmbeddingService()
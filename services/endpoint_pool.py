@@ -0,0 +1,184 @@
+# services/endpoint_pool.py
+"""
+Pula endpointów Ollama z routingiem least-loaded.
+Śledzi zdrowie (czasowe wyłączanie po timeoutach) i statystyki latencji.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
+from utils.logger import get_service_logger
+
+logger = get_service_logger("endpoints")
+
+
+@dataclass
+class OllamaEndpoint:
+    """Stan pojedynczego serwera Ollama."""
+    url: str
+    in_flight: int = 0
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    total_latency: float = 0.0
+    last_latency: float = 0.0
+    ejected_until: float = 0.0
+    
+    @property
+    def avg_latency(self) -> float:
+        """Średni czas udanego wywołania (s) - trwające żądania się nie liczą."""
+        return self.total_latency / self.successes if self.successes else 0.0
+    
+    def is_healthy(self, now: float) -> bool:
+        """Czy endpoint nie jest czasowo wyłączony."""
+        return now >= self.ejected_until
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """
+    Czy błąd świadczy o problemie z serwerem (timeout / brak połączenia),
+    a nie o błędnym żądaniu. Nazwy klas httpx sprawdzamy bez importu.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "ConnectError" in name
+
+
+class EndpointPool:
+    """
+    Wybiera endpoint z najmniejszą liczbą trwających żądań.
+    
+    Endpoint, który przekroczył timeout lub odrzucił połączenie, jest
+    wyłączany na eject_seconds. Gdy wszystkie są wyłączone, wybierany jest
+    ten, który najwcześniej wraca - lepsze to niż natychmiastowy błąd.
+    """
+    
+    def __init__(self, urls: List[str], eject_seconds: float = 30.0):
+        if not urls:
+            raise ValueError("EndpointPool wymaga co najmniej jednego URL")
+        
+        self.endpoints = [OllamaEndpoint(url=url.rstrip("/")) for url in urls]
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+    
+    @property
+    def urls(self) -> List[str]:
+        """Adresy wszystkich endpointów."""
+        return [ep.url for ep in self.endpoints]
+    
+    def acquire(self) -> OllamaEndpoint:
+        """
+        Rezerwuje endpoint dla jednego żądania.
+        
+        Returns:
+            Wybrany endpoint (in_flight już zwiększony)
+        """
+        with self._lock:
+            now = time.monotonic()
+            healthy = [ep for ep in self.endpoints if ep.is_healthy(now)]
+            
+            if healthy:
+                endpoint = min(healthy, key=lambda ep: (ep.in_flight, ep.avg_latency))
+            else:
+                endpoint = min(self.endpoints, key=lambda ep: ep.ejected_until)
+                logger.warning(f"Wszystkie endpointy wyłączone, próbuję {endpoint.url}")
+            
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint
+    
+    def release(
+        self,
+        endpoint: OllamaEndpoint,
+        latency: float,
+        error: Optional[Exception] = None,
+        cancelled: bool = False
+    ) -> None:
+        """
+        Zwalnia endpoint i aktualizuje jego statystyki.
+        
+        Args:
+            endpoint: Endpoint z acquire()
+            latency: Czas trwania żądania (s)
+            error: Błąd żądania (None = sukces)
+            cancelled: Żądanie anulowane - bez wpływu na latencję i błędy
+        """
+        with self._lock:
+            endpoint.in_flight -= 1
+            
+            if cancelled:
+                return
+            
+            if error is None:
+                endpoint.successes += 1
+                endpoint.total_latency += latency
+                endpoint.last_latency = latency
+                return
+            
+            endpoint.failures += 1
+            if is_endpoint_failure(error):
+                endpoint.ejected_until = time.monotonic() + self.eject_seconds
+                logger.warning(
+                    f"Endpoint {endpoint.url} wyłączony na {self.eject_seconds:.0f}s: {error}"
+                )
+    
+    @contextmanager
+    def lease(self) -> Iterator[OllamaEndpoint]:
+        """Rezerwuje endpoint na czas bloku with."""
+        endpoint = self.acquire()
+        started = time.perf_counter()
+        
+        try:
+            yield endpoint
+        except Exception as e:
+            self.release(endpoint, time.perf_counter() - started, error=e)
+            raise
+        except BaseException:
+            # Anulowanie (np. zamknięta sesja, przerwany stream) nie jest winą serwera
+            self.release(endpoint, time.perf_counter() - started, cancelled=True)
+            raise
+        else:
+            self.release(endpoint, time.perf_counter() - started)
+    
+    @asynccontextmanager
+    async def alease(self) -> AsyncIterator[OllamaEndpoint]:
+        """Asynchroniczna wersja lease()."""
+        endpoint = self.acquire()
+        started = time.perf_counter()
+        
+        try:
+            yield endpoint
+        except Exception as e:
+            self.release(endpoint, time.perf_counter() - started, error=e)
+            raise
+        except BaseException:
+            self.release(endpoint, time.perf_counter() - started, cancelled=True)
+            raise
+        else:
+            self.release(endpoint, time.perf_counter() - started)
+    
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Statystyki per endpoint.
+        
+        Returns:
+            Lista słowników (url, healthy, in_flight, requests, successes, failures, latencje)
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "url": ep.url,
+                    "healthy": ep.is_healthy(now),
+                    "in_flight": ep.in_flight,
+                    "requests": ep.requests,
+                    "successes": ep.successes,
+                    "failures": ep.failures,
+                    "avg_latency": round(ep.avg_latency, 3),
+                    "last_latency": round(ep.last_latency, 3),
+                }
+                for ep in self.endpoints
+            ]
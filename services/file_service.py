@@ -156,3 +156,18 @@ class FileService:
 
 # Singleton
 file_service = FileService()
+
+
+def get_file_service(output_dir: Optional[str] = None) -> FileService:
+    """
+    Serwis plików dla katalogu sesji (równoległe sesje nie mogą dzielić katalogu).
+    
+    Args:
+        output_dir: Katalog projektu z ProjectState ("" / None = settings.output_dir)
+    
+    Returns:
+        Singleton file_service albo FileService dla wskazanego katalogu
+    """
+    if not output_dir or Path(output_dir) == file_service.output_dir:
+        return file_service
+    return FileService(Path(output_dir))
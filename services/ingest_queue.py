@@ -0,0 +1,309 @@
+# services/ingest_queue.py
+"""
+Trwała kolejka ingestii RAG (SQLite) z workerem w tle.
+Zatwierdzony projekt trafia do kolejki od razu po zakończeniu workflow,
+a chunkowanie i embeddingi liczą się poza ścieżką żądania. Zadania
+przetrwają restart procesu - przerwane w trakcie wracają do kolejki.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
+from config import settings
+from services.vector_store_service import vector_store_service
+from utils.logger import get_service_logger
+from utils.sqlite import connect
+
+logger = get_service_logger("ingest_queue")
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_FAILED = "failed"
+
+# Handler zadania: (nazwa projektu, {filename: content}) -> wynik (np. IngestResult)
+IngestHandler = Callable[[str, Dict[str, str]], Any]
+
+
+class IngestQueue:
+    """
+    Kolejka FIFO projektów do dodania do RAG.
+    
+    Nowsze zadanie tego samego projektu zastępuje oczekujące (add_project
+    przyjmuje pełny stan projektu, więc starszy snapshot nic nie wnosi).
+    Nieudane zadanie jest ponawiane z opóźnieniem, po max_attempts
+    zostaje w bazie jako failed do wglądu.
+    """
+    
+    def __init__(
+        self,
+        db_path: Path,
+        handler: IngestHandler,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0
+    ):
+        self.db_path = Path(db_path)
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        # Jeden wykonawca naraz (worker albo flush() w wątku wywołującym)
+        self._process_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "failed": 0,
+            "retries": 0,
+            "last_lag_s": 0.0,
+            "total_lag_s": 0.0,
+        }
+        self._init_db()
+    
+    def _init_db(self) -> None:
+        """Tworzy tabelę zadań i przywraca zadania przerwane restartem."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    enqueued_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)")
+            restored = conn.execute(
+                "UPDATE jobs SET status = ? WHERE status = ?",
+                (STATUS_PENDING, STATUS_RUNNING)
+            ).rowcount
+        
+        if restored:
+            logger.info(f"Przywrócono {restored} przerwanych zadań ingestii")
+    
+    def enqueue(self, project_name: str, code_dict: Dict[str, str]) -> int:
+        """
+        Dodaje projekt do kolejki (zastępuje oczekujące zadanie tego projektu).
+        
+        Args:
+            project_name: Nazwa projektu
+            code_dict: Słownik {filename: content}
+        
+        Returns:
+            Id zadania
+        """
+        now = time.time()
+        payload = json.dumps(code_dict, ensure_ascii=False)
+        
+        with self._lock, connect(self.db_path) as conn:
+            superseded = conn.execute(
+                "DELETE FROM jobs WHERE project = ? AND status = ?",
+                (project_name, STATUS_PENDING)
+            ).rowcount
+            job_id = conn.execute(
+                "INSERT INTO jobs (project, payload, status, enqueued_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (project_name, payload, STATUS_PENDING, now, now)
+            ).lastrowid
+            self._stats["enqueued"] += 1
+        
+        if superseded:
+            logger.debug(f"Zadanie '{project_name}' zastąpiło {superseded} oczekujących")
+        self._wakeup.set()
+        return job_id
+    
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Pobiera najstarsze gotowe zadanie i oznacza je jako running."""
+        with self._lock, connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id, project, payload, attempts, enqueued_at FROM jobs "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT 1",
+                (STATUS_PENDING, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (STATUS_RUNNING, row[0]))
+        
+        job_id, project, payload, attempts, enqueued_at = row
+        return {
+            "id": job_id,
+            "project": project,
+            "code_dict": json.loads(payload),
+            "attempts": attempts,
+            "enqueued_at": enqueued_at,
+        }
+    
+    def _complete(self, job: Dict[str, Any]) -> None:
+        """Usuwa wykonane zadanie i zapisuje opóźnienie (od dodania do końca)."""
+        lag = time.time() - job["enqueued_at"]
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job["id"],))
+            self._stats["processed"] += 1
+            self._stats["last_lag_s"] = lag
+            self._stats["total_lag_s"] += lag
+    
+    def _fail(self, job: Dict[str, Any], error: Exception) -> None:
+        """Ponowienie z opóźnieniem albo failed po max_attempts."""
+        attempts = job["attempts"] + 1
+        final = attempts >= self.max_attempts
+        
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (
+                    STATUS_FAILED if final else STATUS_PENDING,
+                    attempts,
+                    str(error),
+                    time.time() + self.retry_delay * attempts,
+                    job["id"]
+                )
+            )
+            self._stats["failed" if final else "retries"] += 1
+        
+        if final:
+            logger.error(f"Ingestia '{job['project']}' nieudana po {attempts} próbach: {error}")
+        else:
+            logger.warning(f"Ingestia '{job['project']}' nieudana (próba {attempts}), ponowienie: {error}")
+    
+    def process_next(self) -> bool:
+        """
+        Wykonuje jedno gotowe zadanie.
+        
+        Returns:
+            True jeśli jakieś zadanie było gotowe do wykonania
+        """
+        with self._process_lock:
+            job = self._claim()
+            if job is None:
+                return False
+            
+            try:
+                self.handler(job["project"], job["code_dict"])
+            except Exception as e:
+                self._fail(job, e)
+            else:
+                self._complete(job)
+            return True
+    
+    def _next_attempt_in(self) -> Optional[float]:
+        """Za ile sekund będzie gotowe najbliższe oczekujące zadanie (None gdy brak)."""
+        with self._lock, connect(self.db_path) as conn:
+            next_at = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM jobs WHERE status = ?",
+                (STATUS_PENDING,)
+            ).fetchone()[0]
+        return None if next_at is None else max(next_at - time.time(), 0.0)
+    
+    def _worker_loop(self) -> None:
+        """Pętla workera: wykonuje zadania, a gdy brak gotowych - czeka na enqueue lub retry."""
+        while not self._stop.is_set():
+            try:
+                if self.process_next():
+                    continue
+                wait = self._next_attempt_in()
+            except Exception as e:
+                logger.error(f"Błąd workera ingestii: {e}")
+                wait = self.retry_delay
+            
+            self._wakeup.wait(timeout=wait)
+            self._wakeup.clear()
+    
+    def start(self) -> None:
+        """Uruchamia (raz na proces) wątek workera. Zaległe zadania z bazy idą od razu."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._worker_loop, name="rag-ingest", daemon=True)
+        self._worker.start()
+        logger.info(f"Worker ingestii RAG uruchomiony (w kolejce: {self.depth()})")
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Zatrzymuje workera (bieżące zadanie jest dokończone)."""
+        if self._worker is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._worker.join(timeout)
+        self._worker = None
+    
+    def depth(self) -> int:
+        """Liczba zadań oczekujących i w trakcie wykonania."""
+        with self._lock, connect(self.db_path) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)",
+                (STATUS_PENDING, STATUS_RUNNING)
+            ).fetchone()[0]
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Czeka aż kolejka się opróżni (zadania, które ostatecznie zawiodły, się nie liczą).
+        Bez uruchomionego workera wykonuje zadania w wątku wywołującym
+        (np. w testach lub skryptach).
+        
+        Args:
+            timeout: Max czas oczekiwania w sekundach (None = bez limitu)
+        
+        Returns:
+            True jeśli kolejka jest pusta
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while self.depth():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            
+            if self._worker is not None and self._worker.is_alive():
+                time.sleep(0.05 if remaining is None else min(0.05, remaining))
+            elif not self.process_next():
+                # Zadanie czeka na ponowienie
+                wait = self._next_attempt_in() or 0.0
+                time.sleep(wait if remaining is None else min(wait, remaining))
+        
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Metryki kolejki.
+        
+        Returns:
+            Słownik z depth, failed_jobs, oldest_lag_s (wiek najstarszego
+            oczekującego zadania), enqueued, processed, failed, retries,
+            last_lag_s, avg_lag_s (od dodania do zapisu w RAG), worker_alive
+        """
+        with self._lock, connect(self.db_path) as conn:
+            depth, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(enqueued_at) FROM jobs WHERE status IN (?, ?)",
+                (STATUS_PENDING, STATUS_RUNNING)
+            ).fetchone()
+            failed_jobs = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (STATUS_FAILED,)
+            ).fetchone()[0]
+            stats = dict(self._stats)
+        
+        total_lag = stats.pop("total_lag_s")
+        stats["depth"] = depth
+        stats["failed_jobs"] = failed_jobs
+        stats["oldest_lag_s"] = round(time.time() - oldest, 3) if oldest else 0.0
+        stats["last_lag_s"] = round(stats["last_lag_s"], 3)
+        stats["avg_lag_s"] = round(total_lag / stats["processed"], 3) if stats["processed"] else 0.0
+        stats["worker_alive"] = self._worker is not None and self._worker.is_alive()
+        return stats
+
+
+# Singleton
+ingest_queue = IngestQueue(
+    settings.rag_ingest_queue_path,
+    handler=vector_store_service.add_project,
+    max_attempts=settings.rag_ingest_max_attempts,
+    retry_delay=settings.rag_ingest_retry_delay
+)
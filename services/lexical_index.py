@@ -0,0 +1,173 @@
+# services/lexical_index.py
+"""
+Indeks leksykalny BM25 dla RAG (w pamięci).
+Uzupełnia wyszukiwanie wektorowe o dopasowanie dokładnych nazw
+(identyfikatory, selektory, nazwy plików), które embeddingi rozmywają.
+Źródłem prawdy jest baza wektorowa - indeks jest budowany z niej przy starcie.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Tuple, Set
+
+WORD = re.compile(r"[0-9A-Za-zĄĆĘŁŃÓŚŹŻąćęłńóśźż_]+")
+CAMEL_PART = re.compile(r"[A-ZĄĆĘŁŃÓŚŹŻ]?[a-ząćęłńóśźż0-9]+|[A-ZĄĆĘŁŃÓŚŹŻ]+(?![a-ząćęłńóśźż])")
+
+# Tokeny krótsze niż to są pomijane (x, i, =...)
+MIN_TOKEN_CHARS = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokeny do BM25: słowa i identyfikatory w całości oraz ich części
+    (snake_case i camelCase), małymi literami.
+    
+    Args:
+        text: Kod lub zapytanie
+    
+    Returns:
+        Lista tokenów (z powtórzeniami)
+    """
+    tokens = []
+    for word in WORD.findall(text):
+        parts = [part for piece in word.split("_") for part in CAMEL_PART.findall(piece)]
+        if len(parts) > 1:
+            tokens.append(word.lower())
+        tokens.extend(part.lower() for part in parts)
+    return [token for token in tokens if len(token) >= MIN_TOKEN_CHARS]
+
+
+class LexicalIndex:
+    """
+    Indeks BM25 (Okapi) chunków RAG.
+    
+    Trzyma treść i metadane chunków, więc wyniki leksykalne nie wymagają
+    dodatkowego zapytania do bazy wektorowej.
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Tuple[str, Dict[str, Any], int]] = {}
+        self._terms: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    def _remove(self, doc_id: str) -> None:
+        """Usuwa dokument (wywoływane pod lockiem)."""
+        if doc_id not in self._docs:
+            return
+        _, _, length = self._docs.pop(doc_id)
+        self._total_length -= length
+        for term in self._terms.pop(doc_id):
+            posting = self._postings[term]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+    
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Dodaje (lub zastępuje) chunki.
+        
+        Args:
+            ids: Id chunków (jak w bazie wektorowej)
+            texts: Treści chunków
+            metadatas: Metadane chunków
+        """
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._remove(doc_id)
+                # Nazwa pliku i symbole też są przeszukiwane
+                counts = Counter(tokenize(f"{metadata.get('filename', '')} {metadata.get('symbols', '')} {text}"))
+                length = sum(counts.values())
+                self._docs[doc_id] = (text, dict(metadata), length)
+                self._terms[doc_id] = set(counts)
+                self._total_length += length
+                for term, count in counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+    
+    def remove(self, ids: List[str]) -> None:
+        """Usuwa chunki (nieznane id są pomijane)."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+    
+    def clear(self) -> None:
+        """Czyści indeks."""
+        with self._lock:
+            self._docs.clear()
+            self._terms.clear()
+            self._postings.clear()
+            self._total_length = 0
+    
+    def _idf(self, term: str) -> float:
+        """IDF termu (0 dla termu spoza indeksu; wywoływane pod lockiem)."""
+        df = len(self._postings.get(term, ()))
+        if not df:
+            return 0.0
+        n = len(self._docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+    
+    def coverage(self, query: str, texts: Dict[str, str]) -> Dict[str, float]:
+        """
+        Jaka część zapytania (termy ważone IDF) występuje w każdym chunku.
+        Rzadkie nazwy z zapytania ważą dużo, pospolite słowa prawie nic.
+        
+        Args:
+            query: Zapytanie tekstowe
+            texts: Słownik {id chunka: treść} - treść jest tokenizowana tylko
+                dla chunków spoza indeksu
+        
+        Returns:
+            Słownik {id chunka: pokrycie 0..1}
+        """
+        with self._lock:
+            weights = {term: self._idf(term) for term in set(tokenize(query))}
+            terms = {doc_id: self._terms.get(doc_id) for doc_id in texts}
+        
+        total = sum(weights.values())
+        if not total:
+            return {doc_id: 0.0 for doc_id in texts}
+        
+        coverage = {}
+        for doc_id, text in texts.items():
+            doc_terms = terms[doc_id] if terms[doc_id] is not None else set(tokenize(text))
+            coverage[doc_id] = sum(weight for term, weight in weights.items() if term in doc_terms) / total
+        return coverage
+    
+    def search(self, query: str, k: int) -> List[Tuple[str, float, str, Dict[str, Any]]]:
+        """
+        Najlepsze chunki wg BM25.
+        
+        Args:
+            query: Zapytanie tekstowe
+            k: Liczba wyników
+        
+        Returns:
+            Lista krotek (id, wynik BM25, treść, metadane) od najlepszego
+        """
+        with self._lock:
+            if not self._docs:
+                return []
+            
+            avg_length = self._total_length / len(self._docs)
+            scores: Dict[str, float] = {}
+            # Powtórzenia słów w długim zapytaniu nie zwiększają wagi termu
+            for term in set(tokenize(query)):
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = self._idf(term)
+                for doc_id, tf in posting.items():
+                    length = self._docs[doc_id][2]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+            
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(doc_id, score, self._docs[doc_id][0], self._docs[doc_id][1]) for doc_id, score in best]
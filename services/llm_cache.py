@@ -0,0 +1,162 @@
+# services/llm_cache.py
+"""
+Trwały cache odpowiedzi LLM (SQLite).
+Klucz = hash treści (model, temperatura, num_ctx, prompt systemowy, wiadomości).
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+from langchain_core.messages import BaseMessage
+from utils.logger import get_service_logger
+from utils.sqlite import LRUTable, connect
+
+logger = get_service_logger("llm_cache")
+
+_RESPONSES = LRUTable("responses", keys=("key",), size_column="size", size_table="cache_size")
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache odpowiedzi LLM z eviction LRU po rozmiarze.
+    
+    Bezpieczny dla wielu sesji: operacje w obrębie procesu są serializowane
+    lockiem, a między procesami chroni blokada SQLite (tryb WAL).
+    Łączny rozmiar wpisów jest utrzymywany przez triggery w tabeli
+    cache_size, więc zapis nie sumuje całej tabeli.
+    """
+    
+    def __init__(self, db_path: Path, max_size_mb: float = 256.0):
+        self.db_path = Path(db_path)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._init_db()
+    
+    def _init_db(self) -> None:
+        """Tworzy tabelę cache jeśli nie istnieje."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+            _RESPONSES.create(conn)
+    
+    @staticmethod
+    def make_key(
+        model_name: str,
+        temperature: Optional[float],
+        num_ctx: Optional[int],
+        messages: List[BaseMessage]
+    ) -> str:
+        """
+        Buduje klucz cache z parametrów modelu i treści wiadomości.
+        
+        Args:
+            model_name: Nazwa modelu
+            temperature: Temperatura generowania
+            num_ctx: Rozmiar kontekstu
+            messages: Wiadomości (prompt systemowy + wiadomość użytkownika)
+        
+        Returns:
+            Hash SHA-256 (hex)
+        """
+        payload = json.dumps({
+            "model": model_name,
+            "temperature": temperature,
+            "num_ctx": num_ctx,
+            "messages": [(m.type, m.content) for m in messages]
+        }, ensure_ascii=False, sort_keys=True)
+        
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Zwraca (content, metadata) z cache i odświeża czas dostępu.
+        
+        Args:
+            key: Klucz z make_key()
+        
+        Returns:
+            Krotka (content, metadata) lub None
+        """
+        with self._lock, connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT content, metadata FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            
+            conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._stats["hits"] += 1
+        
+        return row[0], json.loads(row[1])
+    
+    def put(self, key: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Zapisuje odpowiedź i usuwa najdawniej używane wpisy ponad limit rozmiaru.
+        
+        Args:
+            key: Klucz z make_key()
+            content: Treść odpowiedzi
+            metadata: response_metadata (musi dać się zserializować do JSON)
+        """
+        metadata_json = json.dumps(metadata or {}, default=str)
+        size = len(content.encode("utf-8")) + len(metadata_json)
+        now = time.time()
+        
+        with self._lock, connect(self.db_path) as conn:
+            # Upsert zamiast INSERT OR REPLACE - REPLACE nie uruchamia triggera DELETE
+            conn.execute(
+                """
+                INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    content = excluded.content, metadata = excluded.metadata, size = excluded.size,
+                    created_at = excluded.created_at, last_access = excluded.last_access
+                """,
+                (key, content, metadata_json, size, now, now)
+            )
+            self._stats["stores"] += 1
+            evicted = _RESPONSES.evict(conn, self.max_size_bytes)
+            if evicted:
+                self._stats["evictions"] += evicted
+                logger.debug(f"Eviction: usunięto {evicted} wpisów z cache")
+    
+    def clear(self) -> None:
+        """Czyści cały cache."""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("DELETE FROM responses")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki cache (liczniki procesu + stan bazy).
+        
+        Returns:
+            Słownik z hits, misses, stores, evictions, hit_rate, entries, size_bytes
+        """
+        with self._lock, connect(self.db_path) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            size = _RESPONSES.total_size(conn)
+            stats = dict(self._stats)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        return stats
@@ -1,27 +1,301 @@
 # services/llm_service.py
 """
 Serwis LLM - ujednolicony dostęp do modeli Ollama.
-Obsługuje błędy, retry, timeout i logowanie.
+Obsługuje błędy, retry, timeout i logowanie (ścieżka sync i async).
 """
 
-from typing import Optional, Dict, Any
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, List, Callable, Tuple
+from ollama import Client
 from langchain_ollama import ChatOllama, OllamaEmbeddings
-from langchain_core.messages import BaseMessage
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
 from config import settings
+from services.endpoint_pool import EndpointPool
+from services.llm_cache import LLMResponseCache
 from utils.logger import get_service_logger
+from utils.stream_guard import StreamGuard
+from utils.token_budget import estimate_tokens
 
 logger = get_service_logger("llm")
 
 
+# Priorytety kolejki schedulera (mniejsza wartość = wcześniej)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Granulacja num_predict dopasowanego do promptu - jeden klient ChatOllama
+# obsługuje wiele długości promptu, a cache modeli nie rośnie bez końca
+NUM_PREDICT_STEP = 256
+
+
+def _with_tag(model_name: str) -> str:
+    """Nazwa modelu z tagiem (Ollama raportuje "nomic-embed-text:latest")."""
+    return model_name if ":" in model_name else f"{model_name}:latest"
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """Kolejka schedulera pełna - żądanie odrzucone od razu zamiast czekać na timeout."""
+
+
+class DegenerateOutputError(RuntimeError):
+    """
+    Stream przerwany przez StreamGuard (model wpadł w pętlę).
+    
+    Atrybuty:
+        reason: Powód przerwania (REASON_* z utils.stream_guard)
+        text: Tekst wygenerowany do momentu przerwania
+        tokens_saved: Szacowana liczba tokenów, których nie trzeba było generować
+    """
+    
+    def __init__(self, reason: str, text: str, tokens_saved: int):
+        super().__init__(f"Zdegenerowana odpowiedź ({reason}) - generacja przerwana")
+        self.reason = reason
+        self.text = text
+        self.tokens_saved = tokens_saved
+
+
+@dataclass
+class _Waiter:
+    """Żądanie czekające na slot w schedulerze."""
+    grant: Callable[[], None]
+    granted: bool = False
+    cancelled: bool = False
+
+
+class LLMScheduler:
+    """
+    Globalny scheduler wywołań LLM.
+    
+    - max_concurrency równoczesnych generacji na klucz (model),
+    - kolejka priorytetowa (krótkie wywołania PO/QA przed Developerem),
+    - max_queue_depth: pełna kolejka odrzuca żądanie natychmiast,
+    - metryki czasu oczekiwania w kolejce.
+    
+    Ten sam stan obsługuje ścieżkę sync (slot) i async (aslot).
+    """
+    
+    def __init__(self, max_concurrency: int, max_queue_depth: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_depth = max_queue_depth
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, list] = defaultdict(list)
+        self._queued = 0
+        self._seq = itertools.count()
+        self._stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "queued_total": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+    
+    def _admit(self, key: str, priority: int, waiter: _Waiter) -> bool:
+        """
+        Przyjmuje żądanie: True = slot od razu, False = w kolejce.
+        
+        Raises:
+            SchedulerQueueFullError: Gdy kolejka jest pełna
+        """
+        with self._lock:
+            if self._active[key] < self.max_concurrency and not self._waiting[key]:
+                self._active[key] += 1
+                waiter.granted = True
+                return True
+            
+            if self._queued >= self.max_queue_depth:
+                self._stats["rejected"] += 1
+                raise SchedulerQueueFullError(
+                    f"Kolejka LLM pełna ({self._queued}/{self.max_queue_depth}), spróbuj ponownie później"
+                )
+            
+            heapq.heappush(self._waiting[key], (priority, next(self._seq), waiter))
+            self._queued += 1
+            self._stats["queued_total"] += 1
+            return False
+    
+    def _release(self, key: str) -> None:
+        """Zwalnia slot - przekazuje go pierwszemu czekającemu (wg priorytetu)."""
+        next_waiter = None
+        
+        with self._lock:
+            queue = self._waiting[key]
+            while queue:
+                _, _, waiter = heapq.heappop(queue)
+                if waiter.cancelled:
+                    continue
+                self._queued -= 1
+                waiter.granted = True
+                next_waiter = waiter
+                break
+            
+            if next_waiter is None:
+                self._active[key] -= 1
+        
+        if next_waiter is not None:
+            next_waiter.grant()
+    
+    def _cancel(self, key: str, waiter: _Waiter) -> None:
+        """Wycofuje czekające żądanie (np. anulowany task)."""
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                self._queued -= 1
+                return
+        
+        # Slot został przydzielony w międzyczasie - oddaj go dalej
+        self._release(key)
+    
+    def _record_wait(self, waited: float) -> None:
+        """Aktualizuje metryki czasu w kolejce."""
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["wait_total"] += waited
+            self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+    
+    @contextmanager
+    def slot(self, key: str, priority: int = PRIORITY_NORMAL) -> Iterator[None]:
+        """
+        Blokująco czeka na slot dla klucza (model) na czas bloku with.
+        
+        Args:
+            key: Klucz limitu współbieżności (nazwa modelu)
+            priority: PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW
+        """
+        event = threading.Event()
+        waiter = _Waiter(grant=event.set)
+        started = time.perf_counter()
+        
+        if not self._admit(key, priority, waiter):
+            event.wait()
+        
+        waited = time.perf_counter() - started
+        self._record_wait(waited)
+        if waited > 1.0:
+            logger.info(f"Żądanie {key} czekało w kolejce {waited:.1f}s")
+        
+        try:
+            yield
+        finally:
+            self._release(key)
+    
+    @asynccontextmanager
+    async def aslot(self, key: str, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        """Asynchroniczna wersja slot() - czekanie nie blokuje event loopa."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def grant() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        
+        waiter = _Waiter(grant=grant)
+        started = time.perf_counter()
+        
+        if not self._admit(key, priority, waiter):
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._cancel(key, waiter)
+                raise
+        
+        waited = time.perf_counter() - started
+        self._record_wait(waited)
+        if waited > 1.0:
+            logger.info(f"Żądanie {key} czekało w kolejce {waited:.1f}s")
+        
+        try:
+            yield
+        finally:
+            self._release(key)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Metryki schedulera.
+        
+        Returns:
+            Słownik z active, queued, admitted, rejected, wait_avg, wait_max
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active"] = sum(self._active.values())
+            stats["queued"] = self._queued
+        
+        admitted = stats["admitted"]
+        stats["wait_avg"] = round(stats.pop("wait_total") / admitted, 3) if admitted else 0.0
+        stats["wait_max"] = round(stats["wait_max"], 3)
+        return stats
+
+
+class PooledEmbeddings(Embeddings):
+    """
+    Embeddingi routowane przez pulę endpointów Ollama.
+    Każde wywołanie trafia do najmniej obciążonego serwera.
+    """
+    
+    def __init__(self, service: "LLMService"):
+        self._service = service
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._service.pool.lease() as endpoint:
+            return self._service.get_embeddings_for(endpoint.url).embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        with self._service.pool.lease() as endpoint:
+            return self._service.get_embeddings_for(endpoint.url).embed_query(text)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with self._service.pool.alease() as endpoint:
+            return await self._service.get_embeddings_for(endpoint.url).aembed_documents(texts)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        async with self._service.pool.alease() as endpoint:
+            return await self._service.get_embeddings_for(endpoint.url).aembed_query(text)
+
+
 class LLMService:
     """
     Centralny serwis do zarządzania modelami LLM.
     Zapewnia spójną konfigurację i obsługę błędów.
+    
+    Wywołania invoke/ainvoke/astream przechodzą przez scheduler (limit
+    współbieżności, priorytety) i są routowane do najmniej obciążonego
+    endpointu z puli (settings.ollama_base_urls lub pojedynczy ollama_base_url).
     """
     
     def __init__(self):
         self._models_cache: Dict[str, ChatOllama] = {}
-        self._embeddings: Optional[OllamaEmbeddings] = None
+        self._embeddings: Optional[PooledEmbeddings] = None
+        self._embeddings_cache: Dict[str, OllamaEmbeddings] = {}
+        self._cache: Optional[LLMResponseCache] = None
+        self.pool = EndpointPool(
+            settings.ollama_base_urls or [settings.ollama_base_url],
+            eject_seconds=settings.ollama_eject_seconds
+        )
+        self.scheduler = LLMScheduler(
+            max_concurrency=settings.llm_max_concurrency_per_endpoint * len(self.pool.endpoints),
+            max_queue_depth=settings.llm_max_queue_depth
+        )
+        self._warm_status: Dict[str, Dict[str, Any]] = {}
+        self._num_ctx_usage: Dict[int, int] = defaultdict(int)
+        # "url|model" -> num_ctx ostatniego wywołania (ping nie może go zmienić)
+        self._last_num_ctx: Dict[str, int] = {}
+        self._keep_alive_thread: Optional[threading.Thread] = None
+        self._guard_lock = threading.Lock()
+        self._guard_stats: Dict[str, Any] = {
+            "early_stops": 0,
+            "tokens_saved": 0,
+            "retries": 0,
+            "reasons": defaultdict(int),
+        }
     
     def _get_client_kwargs(self) -> Dict[str, Any]:
         """Konfiguracja klienta HTTP dla Ollama."""
@@ -35,7 +309,11 @@ class LLMService:
     def get_chat_model(
         self,
         model_name: Optional[str] = None,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        base_url: Optional[str] = None,
+        num_ctx: Optional[int] = None,
+        repeat_penalty: Optional[float] = None,
+        num_predict: Optional[int] = None
     ) -> ChatOllama:
         """
         Zwraca model ChatOllama z cache'owaniem.
@@ -43,49 +321,592 @@ class LLMService:
         Args:
             model_name: Nazwa modelu (domyślnie z config)
             temperature: Temperatura generowania (domyślnie z config)
+            base_url: Endpoint Ollama (domyślnie pierwszy z puli)
+            num_ctx: Rozmiar kontekstu (domyślnie z config)
+            repeat_penalty: Kara za powtórzenia (None = domyślna Ollama)
+            num_predict: Max tokenów odpowiedzi (domyślnie z config, nie więcej niż num_ctx)
         
         Returns:
             Skonfigurowana instancja ChatOllama
         """
         model_name = model_name or settings.model_reasoning
         temperature = temperature if temperature is not None else settings.llm_temperature_default
+        base_url = base_url or self.pool.urls[0]
+        num_ctx = num_ctx or settings.llm_num_ctx
+        num_predict = num_predict or min(settings.llm_num_predict, num_ctx)
         
-        cache_key = f"{model_name}_{temperature}"
+        cache_key = f"{model_name}_{temperature}_{base_url}_{num_ctx}_{repeat_penalty}_{num_predict}"
         
         if cache_key not in self._models_cache:
-            logger.info(f"Inicjalizuję model: {model_name} (temp={temperature})")
-            logger.debug(f"URL: {settings.ollama_base_url}")
+            logger.info(f"Inicjalizuję model: {model_name} (temp={temperature}, num_ctx={num_ctx})")
+            logger.debug(f"URL: {base_url}")
             
             self._models_cache[cache_key] = ChatOllama(
-                base_url=settings.ollama_base_url,
+                base_url=base_url,
                 model=model_name,
                 temperature=temperature,
-                timeout=settings.ollama_timeout,
-                num_ctx=settings.llm_num_ctx,
-                num_predict=settings.llm_num_predict,
-                client_kwargs=self._get_client_kwargs()
+                num_ctx=num_ctx,
+                num_predict=num_predict,
+                repeat_penalty=repeat_penalty,
+                keep_alive=settings.llm_keep_alive,
+                # Timeout klienta HTTP - ChatOllama nie ma własnego pola timeout
+                client_kwargs={**self._get_client_kwargs(), "timeout": settings.ollama_timeout}
             )
         
         return self._models_cache[cache_key]
     
-    def get_embeddings(self) -> OllamaEmbeddings:
+    def _on_endpoint(self, model: ChatOllama, base_url: str) -> ChatOllama:
+        """Ten sam model (nazwa, temperatura, num_ctx, num_predict, repeat_penalty) na wskazanym endpoincie."""
+        self._last_num_ctx[f"{base_url}|{model.model}"] = model.num_ctx
+        if model.base_url == base_url:
+            return model
+        return self.get_chat_model(
+            model.model, model.temperature, base_url=base_url,
+            num_ctx=model.num_ctx, repeat_penalty=model.repeat_penalty, num_predict=model.num_predict
+        )
+    
+    def _penalized(self, model: ChatOllama, repeat_penalty: Optional[float]) -> ChatOllama:
+        """Wariant modelu z karą za powtórzenia (None = bez zmian)."""
+        if repeat_penalty is None or model.repeat_penalty == repeat_penalty:
+            return model
+        return self.get_chat_model(
+            model.model, model.temperature, base_url=model.base_url,
+            num_ctx=model.num_ctx, repeat_penalty=repeat_penalty, num_predict=model.num_predict
+        )
+    
+    def select_num_ctx(self, messages: list, expected_output_tokens: int) -> int:
         """
-        Zwraca model embeddingów (singleton).
+        Wybiera najmniejszy kubełek num_ctx mieszczący prompt i odpowiedź.
+        
+        Mniejszy kontekst = mniejszy KV cache i szybsze wywołanie na CPU.
+        Kubełki są zgrubne celowo: zmiana num_ctx wymusza w Ollama
+        przeładowanie modelu, więc nie warto dobierać go co do tokena.
+        
+        Args:
+            messages: Wiadomości do modelu
+            expected_output_tokens: Spodziewana długość odpowiedzi
         
         Returns:
-            Skonfigurowana instancja OllamaEmbeddings
+            Rozmiar kontekstu (nie większy niż settings.llm_num_ctx)
         """
-        if self._embeddings is None:
-            logger.info(f"Inicjalizuję embeddings: {settings.model_embeddings}")
+        needed = self._prompt_tokens(messages) + expected_output_tokens
+        buckets = sorted(b for b in settings.llm_num_ctx_buckets if b <= settings.llm_num_ctx)
+        
+        for bucket in buckets:
+            if bucket >= needed:
+                return bucket
+        
+        return settings.llm_num_ctx
+    
+    @staticmethod
+    def _prompt_tokens(messages: list) -> int:
+        """Szacowana liczba tokenów promptu."""
+        return sum(estimate_tokens(m.content) for m in messages)
+    
+    def fit_num_predict(self, num_ctx: int, messages: list) -> int:
+        """
+        Limit odpowiedzi, który mieści się w num_ctx obok promptu.
+        
+        Odpowiedź dłuższa niż num_ctx - prompt nie mieści się w kontekście
+        i Ollama po cichu przesuwa lub ucina okno - stąd limit per wywołanie,
+        a nie sztywne llm_num_predict.
+        
+        Args:
+            num_ctx: Rozmiar kontekstu wywołania
+            messages: Wiadomości do modelu
+        
+        Returns:
+            num_predict (wielokrotność NUM_PREDICT_STEP, nie więcej niż llm_num_predict)
+        """
+        remaining = (num_ctx - self._prompt_tokens(messages)) // NUM_PREDICT_STEP * NUM_PREDICT_STEP
+        # Prompt przepełniony mimo budżetu - minimalny limit zamiast 0/-1 (w Ollama: bez limitu)
+        return min(settings.llm_num_predict, max(NUM_PREDICT_STEP, remaining))
+    
+    def _sized(self, model: ChatOllama, messages: list, expected_output_tokens: Optional[int]) -> ChatOllama:
+        """
+        Wariant modelu z num_predict mieszczącym się w kontekście obok promptu
+        i (przy llm_dynamic_num_ctx) num_ctx dobranym do wywołania.
+        expected_output_tokens=None - model bez zmian.
+        """
+        if expected_output_tokens is None:
+            return model
+        
+        num_ctx = model.num_ctx
+        if settings.llm_dynamic_num_ctx:
+            num_ctx = self.select_num_ctx(messages, expected_output_tokens)
+            self._num_ctx_usage[num_ctx] += 1
+        num_predict = self.fit_num_predict(num_ctx, messages)
+        
+        if num_ctx == model.num_ctx and num_predict == model.num_predict:
+            return model
+        return self.get_chat_model(
+            model.model, model.temperature, base_url=model.base_url,
+            num_ctx=num_ctx, repeat_penalty=model.repeat_penalty, num_predict=num_predict
+        )
+    
+    def get_num_ctx_stats(self) -> Dict[int, int]:
+        """Ile wywołań trafiło do każdego kubełka num_ctx."""
+        return dict(sorted(self._num_ctx_usage.items()))
+    
+    def get_embeddings_for(self, base_url: str) -> OllamaEmbeddings:
+        """Klient embeddingów dla konkretnego endpointu."""
+        if base_url not in self._embeddings_cache:
+            logger.info(f"Inicjalizuję embeddings: {settings.model_embeddings} ({base_url})")
             
-            self._embeddings = OllamaEmbeddings(
-                base_url=settings.ollama_base_url,
+            self._embeddings_cache[base_url] = OllamaEmbeddings(
+                base_url=base_url,
                 model=settings.model_embeddings,
-                client_kwargs=self._get_client_kwargs()
+                client_kwargs={**self._get_client_kwargs(), "timeout": settings.ollama_timeout}
             )
         
+        return self._embeddings_cache[base_url]
+    
+    def get_embeddings(self) -> Embeddings:
+        """
+        Zwraca model embeddingów (singleton) routowany przez pulę endpointów.
+        
+        Returns:
+            Instancja Embeddings zgodna z OllamaEmbeddings
+        """
+        if self._embeddings is None:
+            self._embeddings = PooledEmbeddings(self)
+        
         return self._embeddings
     
+    def get_endpoint_stats(self) -> List[Dict[str, Any]]:
+        """Statystyki endpointów (in-flight, błędy, latencje, zdrowie)."""
+        return self.pool.get_stats()
+    
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Metryki kolejki LLM (aktywne, czekające, odrzucone, czas oczekiwania)."""
+        return self.scheduler.get_stats()
+    
+    # === Warm-up i keep-alive modeli ===
+    
+    def _managed_models(self) -> List[Tuple[str, str, str]]:
+        """Modele utrzymywane w pamięci: (nazwa, rodzaj, keep_alive)."""
+        return [
+            (settings.model_reasoning, "chat", settings.llm_keep_alive),
+            (settings.model_embeddings, "embed", settings.llm_keep_alive_embeddings),
+        ]
+    
+    def _ping_num_ctx(self, base_url: str, model_name: str) -> int:
+        """
+        num_ctx pingu: ostatnio użyty na endpoincie. Ollama przeładowuje model
+        przy każdej zmianie num_ctx, więc ping z innym rozmiarem niż wywołania
+        agentów wyrzucałby z pamięci model w kubełku, którego faktycznie używają.
+        Przed pierwszym wywołaniem - najmniejszy kubełek (krótkie prompty PO).
+        """
+        last = self._last_num_ctx.get(f"{base_url}|{model_name}")
+        if last is not None:
+            return last
+        if settings.llm_dynamic_num_ctx:
+            buckets = [b for b in settings.llm_num_ctx_buckets if b <= settings.llm_num_ctx]
+            if buckets:
+                return min(buckets)
+        return settings.llm_num_ctx
+    
+    def _ping_model(self, base_url: str, model_name: str, kind: str, keep_alive: str) -> float:
+        """
+        Ładuje model na endpoincie (lub odświeża keep_alive) i zwraca czas wywołania.
+        Pusty prompt w Ollama tylko ładuje model, bez generowania.
+        """
+        client = Client(host=base_url, timeout=settings.ollama_timeout, **self._get_client_kwargs())
+        started = time.perf_counter()
+        
+        if kind == "chat":
+            client.generate(
+                model=model_name,
+                prompt="",
+                keep_alive=keep_alive,
+                options={"num_ctx": self._ping_num_ctx(base_url, model_name)}
+            )
+        else:
+            client.embed(model=model_name, input="warmup", keep_alive=keep_alive)
+        
+        return time.perf_counter() - started
+    
+    def _loaded_models(self, base_url: str) -> List[str]:
+        """Modele aktualnie załadowane na endpoincie (/api/ps)."""
+        client = Client(host=base_url, timeout=10, **self._get_client_kwargs())
+        return [m.model for m in client.ps().models]
+    
+    def warm_up(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Ładuje skonfigurowane modele (chat + embeddings) na wszystkich endpointach
+        i mierzy czas zimnego startu. Błędy nie przerywają pracy aplikacji.
+        
+        Returns:
+            Status modeli (jak get_warm_status)
+        """
+        for base_url in self.pool.urls:
+            for model_name, kind, keep_alive in self._managed_models():
+                key = f"{base_url}|{model_name}"
+                try:
+                    elapsed = self._ping_model(base_url, model_name, kind, keep_alive)
+                    self._warm_status[key] = {
+                        "warm": True,
+                        "cold_start_s": round(elapsed, 2),
+                        "last_ping": time.time()
+                    }
+                    logger.info(f"Warm-up {model_name} @ {base_url}: {elapsed:.1f}s")
+                except Exception as e:
+                    self._warm_status[key] = {"warm": False, "error": str(e), "last_ping": time.time()}
+                    logger.warning(f"Warm-up {model_name} @ {base_url} nieudany: {e}")
+        
+        return self.get_warm_status()
+    
+    def _keep_alive_loop(self) -> None:
+        """Wątek w tle: warm-up, potem okresowy ping utrzymujący modele w pamięci."""
+        self.warm_up()
+        
+        while True:
+            time.sleep(settings.llm_keep_alive_interval)
+            
+            for base_url in self.pool.urls:
+                try:
+                    loaded = self._loaded_models(base_url)
+                except Exception as e:
+                    logger.debug(f"Nie można pobrać /api/ps z {base_url}: {e}")
+                    loaded = []
+                
+                for model_name, kind, keep_alive in self._managed_models():
+                    key = f"{base_url}|{model_name}"
+                    status = self._warm_status.setdefault(key, {})
+                    status["warm"] = _with_tag(model_name) in {_with_tag(m) for m in loaded}
+                    
+                    try:
+                        elapsed = self._ping_model(base_url, model_name, kind, keep_alive)
+                        if not status["warm"]:
+                            logger.info(f"Ponownie załadowano {model_name} @ {base_url}: {elapsed:.1f}s")
+                        status.update(warm=True, last_ping=time.time())
+                        status.pop("error", None)
+                    except Exception as e:
+                        status.update(warm=False, error=str(e))
+                        logger.warning(f"Keep-alive {model_name} @ {base_url} nieudany: {e}")
+    
+    def start_keep_alive(self) -> None:
+        """
+        Uruchamia (raz na proces) wątek warm-up + keep-alive.
+        Nie blokuje - pierwsze żądanie nie czeka na załadowanie modeli.
+        """
+        if self._keep_alive_thread is not None:
+            return
+        
+        self._keep_alive_thread = threading.Thread(
+            target=self._keep_alive_loop,
+            name="ollama-keep-alive",
+            daemon=True
+        )
+        self._keep_alive_thread.start()
+    
+    def get_warm_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Czy modele są załadowane ("url|model" -> warm, cold_start_s, last_ping).
+        """
+        return {key: dict(status) for key, status in self._warm_status.items()}
+    
+    @property
+    def cache(self) -> LLMResponseCache:
+        """Lazy-loaded cache odpowiedzi (SQLite)."""
+        if self._cache is None:
+            self._cache = LLMResponseCache(
+                settings.llm_cache_path,
+                max_size_mb=settings.llm_cache_max_mb
+            )
+        return self._cache
+    
+    def _cache_key(self, model: ChatOllama, messages: list) -> str:
+        """Klucz cache z parametrów modelu i treści wiadomości."""
+        return LLMResponseCache.make_key(
+            model_name=model.model,
+            temperature=model.temperature,
+            num_ctx=model.num_ctx,
+            messages=messages
+        )
+    
+    def _cache_lookup(self, model: ChatOllama, messages: list, use_cache: bool) -> Optional[AIMessage]:
+        """Zwraca odpowiedź z cache jeśli cache jest aktywny dla wywołania."""
+        if not (use_cache and settings.llm_cache_enabled):
+            return None
+        
+        cached = self.cache.get(self._cache_key(model, messages))
+        if cached is None:
+            return None
+        
+        content, metadata = cached
+        logger.info(f"Cache hit ({model.model})")
+        return AIMessage(content=content, response_metadata={**metadata, "cache_hit": True})
+    
+    def _cache_store(self, model: ChatOllama, messages: list, response: BaseMessage, use_cache: bool) -> None:
+        """Zapisuje odpowiedź do cache (błędy cache nie przerywają pracy)."""
+        if not (use_cache and settings.llm_cache_enabled) or not response.content:
+            return
+        if response.response_metadata.get("early_stop"):
+            return
+        
+        try:
+            self.cache.put(
+                self._cache_key(model, messages),
+                response.content,
+                getattr(response, "response_metadata", {})
+            )
+        except Exception as e:
+            logger.warning(f"Nie udało się zapisać odpowiedzi do cache: {e}")
+    
+    async def _acache_lookup(self, model: ChatOllama, messages: list, use_cache: bool) -> Optional[AIMessage]:
+        """_cache_lookup() w wątku - SQLite (z timeoutem blokady) nie może wstrzymać event loopa."""
+        if not (use_cache and settings.llm_cache_enabled):
+            return None
+        return await asyncio.to_thread(self._cache_lookup, model, messages, use_cache)
+    
+    async def _acache_store(self, model: ChatOllama, messages: list, response: BaseMessage, use_cache: bool) -> None:
+        """_cache_store() w wątku."""
+        if use_cache and settings.llm_cache_enabled:
+            await asyncio.to_thread(self._cache_store, model, messages, response, use_cache)
+    
+    # === Ochrona przed zdegenerowaną odpowiedzią ===
+    
+    def _new_guard(self) -> Optional[StreamGuard]:
+        """Nowy guard dla wywołania (None gdy ochrona wyłączona)."""
+        if not settings.llm_guard_enabled:
+            return None
+        return StreamGuard(
+            max_line_repeats=settings.llm_guard_max_line_repeats,
+            max_block_repeats=settings.llm_guard_max_block_repeats,
+            max_line_chars=settings.llm_guard_max_line_chars,
+            max_fence_tokens=settings.llm_guard_max_fence_tokens
+        )
+    
+    def _record_early_stop(self, model: ChatOllama, guard: StreamGuard, will_retry: bool) -> int:
+        """
+        Zlicza i loguje przerwaną generację.
+        
+        Zapętlony model generowałby do limitu num_predict, więc oszczędność
+        to różnica między limitem a tym, co zdążył wygenerować.
+        
+        Returns:
+            Szacowana liczba zaoszczędzonych tokenów
+        """
+        generated = guard.tokens
+        tokens_saved = max(0, (model.num_predict or settings.llm_num_predict) - generated)
+        
+        with self._guard_lock:
+            self._guard_stats["early_stops"] += 1
+            self._guard_stats["tokens_saved"] += tokens_saved
+            self._guard_stats["reasons"][guard.reason] += 1
+            if will_retry:
+                self._guard_stats["retries"] += 1
+        
+        logger.warning(
+            f"Przerwano zdegenerowaną generację {model.model} ({guard.reason}) po ~{generated} "
+            f"tokenach, zaoszczędzono ~{tokens_saved}"
+            + (f" - ponawiam z repeat_penalty={settings.llm_guard_repeat_penalty}" if will_retry else "")
+        )
+        return tokens_saved
+    
+    def _collect(self, model: ChatOllama, messages: list, guard: StreamGuard) -> BaseMessage:
+        """Odpowiedź zebrana ze streamu pod kontrolą guarda (przerwana gdy guard.reason)."""
+        full: Optional[BaseMessage] = None
+        stream = model.stream(messages)
+        try:
+            for chunk in stream:
+                full = chunk if full is None else full + chunk
+                if guard.feed(chunk.content):
+                    break
+            else:
+                guard.finish(self._done_reason(full))
+        finally:
+            stream.close()
+        return full if full is not None else AIMessage(content="")
+    
+    async def _acollect(self, model: ChatOllama, messages: list, guard: StreamGuard) -> BaseMessage:
+        """Asynchroniczna wersja _collect()."""
+        full: Optional[BaseMessage] = None
+        stream = model.astream(messages)
+        try:
+            async for chunk in stream:
+                full = chunk if full is None else full + chunk
+                if guard.feed(chunk.content):
+                    break
+            else:
+                guard.finish(self._done_reason(full))
+        finally:
+            await stream.aclose()
+        return full if full is not None else AIMessage(content="")
+    
+    @staticmethod
+    def _done_reason(response: Optional[BaseMessage]) -> Optional[str]:
+        """Powód zakończenia generacji z metadanych Ollama ("length" = limit num_predict)."""
+        return response.response_metadata.get("done_reason") if response is not None else None
+    
+    def _attempts(self) -> int:
+        """Liczba prób generacji (pierwsza + ponowienia po przerwaniu)."""
+        return settings.llm_guard_retries + 1 if settings.llm_guard_enabled else 1
+    
+    def _mark_early_stop(self, response: BaseMessage, reason: str) -> BaseMessage:
+        """Oznacza odpowiedź przerwaną także w ostatniej próbie (nie trafia do cache)."""
+        response.response_metadata = {**response.response_metadata, "early_stop": reason}
+        return response
+    
+    def get_guard_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki przerwanych generacji.
+        
+        Returns:
+            Słownik z early_stops, tokens_saved, retries, reasons (liczba przerwań wg powodu)
+        """
+        with self._guard_lock:
+            stats = dict(self._guard_stats)
+            stats["reasons"] = dict(stats["reasons"])
+        return stats
+    
+    def invoke(
+        self,
+        model: ChatOllama,
+        messages: list,
+        use_cache: bool = False,
+        priority: int = PRIORITY_NORMAL,
+        expected_output_tokens: Optional[int] = None
+    ) -> BaseMessage:
+        """
+        Wywołuje model z opcjonalnym cache odpowiedzi.
+        
+        Args:
+            model: Model ChatOllama
+            messages: Lista wiadomości
+            use_cache: Czy korzystać z cache (opt-in per agent / per wywołanie)
+            priority: Priorytet w kolejce schedulera
+            expected_output_tokens: Spodziewana długość odpowiedzi - włącza
+                dobór num_ctx per wywołanie (None = num_ctx modelu)
+        
+        Returns:
+            Odpowiedź modelu (z cache: response_metadata["cache_hit"] = True,
+            przerwana przez guard we wszystkich próbach: response_metadata["early_stop"])
+        """
+        model = self._sized(model, messages, expected_output_tokens)
+        cached = self._cache_lookup(model, messages, use_cache)
+        if cached is not None:
+            return cached
+        
+        attempts = self._attempts()
+        target = model
+        for attempt in range(attempts):
+            guard = self._new_guard()
+            with self.scheduler.slot(model.model, priority), self.pool.lease() as endpoint:
+                if guard is None:
+                    response = self._on_endpoint(target, endpoint.url).invoke(messages)
+                else:
+                    response = self._collect(self._on_endpoint(target, endpoint.url), messages, guard)
+            
+            if guard is None or guard.reason is None:
+                break
+            
+            self._record_early_stop(target, guard, will_retry=attempt + 1 < attempts)
+            if attempt + 1 == attempts:
+                return self._mark_early_stop(response, guard.reason)
+            target = self._penalized(target, settings.llm_guard_repeat_penalty)
+        
+        self._cache_store(model, messages, response, use_cache)
+        return response
+    
+    async def ainvoke(
+        self,
+        model: ChatOllama,
+        messages: list,
+        use_cache: bool = False,
+        priority: int = PRIORITY_NORMAL,
+        expected_output_tokens: Optional[int] = None
+    ) -> BaseMessage:
+        """Asynchroniczna wersja invoke()."""
+        model = self._sized(model, messages, expected_output_tokens)
+        cached = await self._acache_lookup(model, messages, use_cache)
+        if cached is not None:
+            return cached
+        
+        attempts = self._attempts()
+        target = model
+        for attempt in range(attempts):
+            guard = self._new_guard()
+            async with self.scheduler.aslot(model.model, priority), self.pool.alease() as endpoint:
+                if guard is None:
+                    response = await self._on_endpoint(target, endpoint.url).ainvoke(messages)
+                else:
+                    response = await self._acollect(self._on_endpoint(target, endpoint.url), messages, guard)
+            
+            if guard is None or guard.reason is None:
+                break
+            
+            self._record_early_stop(target, guard, will_retry=attempt + 1 < attempts)
+            if attempt + 1 == attempts:
+                return self._mark_early_stop(response, guard.reason)
+            target = self._penalized(target, settings.llm_guard_repeat_penalty)
+        
+        await self._acache_store(model, messages, response, use_cache)
+        return response
+    
+    async def astream(
+        self,
+        model: ChatOllama,
+        messages: list,
+        use_cache: bool = False,
+        priority: int = PRIORITY_NORMAL,
+        expected_output_tokens: Optional[int] = None,
+        repeat_penalty: Optional[float] = None
+    ) -> AsyncIterator[BaseMessage]:
+        """
+        Streamuje odpowiedź modelu. Trafienie w cache zwraca całość jednym fragmentem,
+        pełna odpowiedź trafia do cache tylko gdy stream dobiegł końca.
+        aclose() na generatorze anuluje trwające żądanie do Ollama.
+        
+        Fragmenty są już u konsumenta, więc po przerwaniu przez guard stream
+        nie jest ponawiany po cichu - decyzja należy do wywołującego.
+        
+        Args:
+            model: Model ChatOllama
+            messages: Lista wiadomości
+            use_cache: Czy korzystać z cache
+            priority: Priorytet w kolejce schedulera
+            expected_output_tokens: Spodziewana długość odpowiedzi (dobór num_ctx)
+            repeat_penalty: Kara za powtórzenia (np. przy ponowieniu po przerwaniu)
+        
+        Yields:
+            Kolejne fragmenty odpowiedzi
+        
+        Raises:
+            DegenerateOutputError: Gdy guard przerwał zapętloną generację
+        """
+        model = self._sized(model, messages, expected_output_tokens)
+        cached = await self._acache_lookup(model, messages, use_cache)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content, response_metadata=cached.response_metadata)
+            return
+        
+        target = self._penalized(model, repeat_penalty)
+        guard = self._new_guard()
+        full: Optional[BaseMessage] = None
+        async with self.scheduler.aslot(model.model, priority), self.pool.alease() as endpoint:
+            stream = self._on_endpoint(target, endpoint.url).astream(messages)
+            try:
+                async for chunk in stream:
+                    if guard is not None and guard.feed(chunk.content):
+                        break
+                    full = chunk if full is None else full + chunk
+                    yield chunk
+            finally:
+                # Przerwany stream (aclose) zrywa połączenie - Ollama kończy generację
+                await stream.aclose()
+        
+        if guard is not None and not guard.reason:
+            guard.finish(self._done_reason(full))
+        
+        if guard is not None and guard.reason:
+            tokens_saved = self._record_early_stop(target, guard, will_retry=False)
+            raise DegenerateOutputError(guard.reason, guard.text, tokens_saved)
+        
+        if full is not None:
+            await self._acache_store(model, messages, full, use_cache)
+    
     def invoke_with_retry(
         self,
         model: ChatOllama,
@@ -105,7 +926,36 @@ class LLMService:
         """
         for attempt in range(max_retries + 1):
             try:
-                return model.invoke(messages)
+                return self.invoke(model, messages)
+            except Exception as e:
+                if attempt < max_retries:
+                    logger.warning(f"Błąd LLM (próba {attempt + 1}/{max_retries + 1}): {e}")
+                else:
+                    logger.error(f"LLM zwrócił błąd po {max_retries + 1} próbach: {e}")
+                    raise
+        
+        return None
+    
+    async def ainvoke_with_retry(
+        self,
+        model: ChatOllama,
+        messages: list,
+        max_retries: int = 2
+    ) -> Optional[BaseMessage]:
+        """
+        Asynchroniczna wersja invoke_with_retry (nie blokuje event loopa).
+        
+        Args:
+            model: Model ChatOllama
+            messages: Lista wiadomości
+            max_retries: Maksymalna liczba prób
+        
+        Returns:
+            Odpowiedź modelu lub None przy błędzie
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.ainvoke(model, messages)
             except Exception as e:
                 if attempt < max_retries:
                     logger.warning(f"Błąd LLM (próba {attempt + 1}/{max_retries + 1}): {e}")
@@ -0,0 +1,481 @@
+# services/numpy_backend.py
+"""
+Backend wektorowy w procesie: macierz float32 mapowana z dysku (memmap)
+i metadane chunków w pliku JSONL obok. Wyszukiwanie to brute-force
+w blokach wierszy - dla małych i średnich indeksów szybsze niż ChromaDB
+i bez kosztu jej inicjalizacji.
+
+Pliki w katalogu backendu:
+    index.json            - wymiar, metryka i bieżąca generacja (punkt zatwierdzenia)
+    vectors.<gen>.f32     - wiersze float32, tylko dopisywane
+    chunks.<gen>.jsonl    - jeden wiersz na chunk ({"id","text","metadata"})
+                            i znaczniki usunięcia ({"deleted": [id...]})
+
+Usunięte wiersze zostają w pliku do kompaktowania, które przepisuje żywe
+wiersze do nowej generacji i dopiero wtedy podmienia index.json.
+
+Opcjonalna kwantyzacja int8: w pamięci są tylko kody int8 (4x mniej niż
+float32) ze skalą na wiersz, przeszukiwane w całości. Najlepsi kandydaci
+są potem dokładnie przeliczani na wektorach float32 z pliku - czytane są
+tylko ich wiersze. Kody są liczone z pliku wektorów przy otwarciu.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from services.vector_backends import VectorBackend, StoredChunk
+from utils.logger import get_service_logger
+
+logger = get_service_logger("numpy_backend")
+
+METRIC_L2 = "l2"
+METRIC_COSINE = "cosine"
+
+QUANTIZATION_NONE = "none"
+QUANTIZATION_INT8 = "int8"
+
+# Wierszy na blok przy skanowaniu kodów int8 (blok jest zamieniany na float32)
+QUANTIZED_BLOCK_ROWS = 8192
+
+# Kompaktowanie dopiero od tylu usuniętych wierszy (małe indeksy nie są przepisywane co chwilę)
+COMPACT_MIN_DEAD_ROWS = 256
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Wektory w macierzy float32 (np.memmap), wyszukiwanie brute-force.
+    
+    Metryka "l2" zwraca kwadrat odległości euklidesowej - tak jak Chroma,
+    więc rag_score_threshold znaczy to samo w obu backendach. "cosine"
+    zwraca 1 - podobieństwo kosinusowe.
+    
+    Przy quantization="int8" skanowane są kody int8, a rescore_factor * k
+    najlepszych kandydatów dostaje dokładną odległość z wektorów float32.
+    Zwracane odległości są zawsze dokładne, przybliżony jest tylko wybór
+    kandydatów.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        embeddings: Embeddings,
+        metric: str = METRIC_L2,
+        compact_ratio: float = 0.3,
+        block_rows: int = 65536,
+        quantization: str = QUANTIZATION_NONE,
+        rescore_factor: int = 4
+    ):
+        if metric not in (METRIC_L2, METRIC_COSINE):
+            raise ValueError(f"Nieznana metryka: {metric}")
+        if quantization not in (QUANTIZATION_NONE, QUANTIZATION_INT8):
+            raise ValueError(f"Nieznana kwantyzacja: {quantization}")
+        
+        self.path = Path(path)
+        self.embeddings = embeddings
+        self.metric = metric
+        self.compact_ratio = compact_ratio
+        self.block_rows = block_rows
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._dim: Optional[int] = None
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._matrix: Optional[np.memmap] = None
+        # Kody int8 i skale wierszy (tylko przy kwantyzacji)
+        self._codes: Optional[np.ndarray] = None
+        self._scales = np.zeros(0, dtype=np.float32)
+        
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._load()
+    
+    # === Pliki ===
+    
+    def _vectors_path(self, generation: int) -> Path:
+        return self.path / f"vectors.{generation}.f32"
+    
+    def _chunks_path(self, generation: int) -> Path:
+        return self.path / f"chunks.{generation}.jsonl"
+    
+    def _write_index(self) -> None:
+        """Atomowy zapis index.json (podmiana pliku)."""
+        tmp = self.path / "index.json.tmp"
+        tmp.write_text(json.dumps({"dim": self._dim, "metric": self.metric, "generation": self._generation}))
+        os.replace(tmp, self.path / "index.json")
+    
+    def _load(self) -> None:
+        """Wczytuje bieżącą generację i naprawia niedokończony ostatni zapis."""
+        index_path = self.path / "index.json"
+        if not index_path.exists():
+            return
+        
+        index = json.loads(index_path.read_text())
+        self._generation = index["generation"]
+        self._dim = index["dim"]
+        if index.get("metric") != self.metric:
+            logger.warning(f"Indeks zapisany z metryką {index.get('metric')}, używam {self.metric}")
+        
+        deleted = set()
+        chunks_path = self._chunks_path(self._generation)
+        if chunks_path.exists():
+            good_bytes = 0
+            with open(chunks_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    good_bytes += len(line)
+                    if "deleted" in record:
+                        deleted.update(self._rows[chunk_id] for chunk_id in record["deleted"] if chunk_id in self._rows)
+                        for chunk_id in record["deleted"]:
+                            self._rows.pop(chunk_id, None)
+                    else:
+                        # Upsert - wcześniejszy wiersz z tym id jest nieaktualny
+                        if record["id"] in self._rows:
+                            deleted.add(self._rows[record["id"]])
+                        self._rows[record["id"]] = len(self._ids)
+                        self._ids.append(record["id"])
+                        self._texts.append(record["text"])
+                        self._metadatas.append(record["metadata"])
+            
+            if good_bytes < chunks_path.stat().st_size:
+                logger.warning("Obcięto niedokończony zapis metadanych")
+                with open(chunks_path, "r+b") as f:
+                    f.truncate(good_bytes)
+        
+        # Wektory są dopisywane przed metadanymi - nadmiarowe wiersze bez metadanych są odcinane
+        # (także przy pustym indeksie - inaczej następny add dopisałby się za nimi)
+        rows = len(self._ids)
+        vectors_path = self._vectors_path(self._generation)
+        if self._dim:
+            row_bytes = 4 * self._dim
+            size = vectors_path.stat().st_size if vectors_path.exists() else 0
+            if size != rows * row_bytes:
+                available = size // row_bytes
+                if available < rows:
+                    raise RuntimeError(f"Uszkodzony indeks NumPy: {available} wektorów, {rows} chunków")
+                logger.warning(f"Obcięto {size - rows * row_bytes} bajtów wektorów bez metadanych")
+                with open(vectors_path, "r+b") as f:
+                    f.truncate(rows * row_bytes)
+        
+        self._alive = np.ones(rows, dtype=bool)
+        if deleted:
+            self._alive[list(deleted)] = False
+        self._open_matrix()
+        self._norms = self._compute_norms()
+        if self.quantization == QUANTIZATION_INT8:
+            self._codes, self._scales = self._compute_codes()
+        logger.info(
+            f"Indeks NumPy: {int(self._alive.sum())} chunków ({rows} wierszy), wymiar {self._dim}, "
+            f"kwantyzacja {self.quantization}"
+        )
+    
+    def _open_matrix(self) -> None:
+        """(Ponowne) mapowanie pliku wektorów po zmianie liczby wierszy."""
+        rows = len(self._ids)
+        self._matrix = (
+            np.memmap(self._vectors_path(self._generation), dtype=np.float32, mode="r", shape=(rows, self._dim))
+            if rows else None
+        )
+    
+    def _compute_norms(self, start: int = 0) -> np.ndarray:
+        """Kwadraty norm wierszy od start (blokami - memmap nie jest wczytywany w całości)."""
+        if self._matrix is None:
+            return np.zeros(0, dtype=np.float32)
+        parts = [
+            np.einsum("ij,ij->i", self._matrix[i:i + self.block_rows], self._matrix[i:i + self.block_rows])
+            for i in range(start, len(self._ids), self.block_rows)
+        ]
+        return np.concatenate(parts).astype(np.float32) if parts else np.zeros(0, dtype=np.float32)
+    
+    @staticmethod
+    def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Symetryczna kwantyzacja int8 ze skalą na wiersz: wektor ≈ kody * skala."""
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    
+    def _compute_codes(self, start: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Kody int8 i skale wierszy od start (blokami z memmap)."""
+        parts = [
+            self._quantize(np.asarray(self._matrix[i:i + QUANTIZED_BLOCK_ROWS]))
+            for i in range(start, len(self._ids), QUANTIZED_BLOCK_ROWS)
+        ] if self._matrix is not None else []
+        if not parts:
+            return np.zeros((0, self._dim or 0), dtype=np.int8), np.zeros(0, dtype=np.float32)
+        return np.concatenate([codes for codes, _ in parts]), np.concatenate([scales for _, scales in parts])
+    
+    def _append_records(self, records: List[Dict[str, Any]]) -> None:
+        """Dopisuje linie do pliku metadanych bieżącej generacji."""
+        with open(self._chunks_path(self._generation), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    # === VectorBackend ===
+    
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        if not ids:
+            return
+        
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+                self._write_index()
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Wymiar embeddingów {vectors.shape[1]} zamiast {self._dim}")
+            
+            # Upsert - poprzednie wiersze tych id przestają być widoczne
+            replaced = [self._rows[chunk_id] for chunk_id in ids if chunk_id in self._rows]
+            
+            with open(self._vectors_path(self._generation), "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._append_records([
+                {"id": chunk_id, "text": text, "metadata": metadata}
+                for chunk_id, text, metadata in zip(ids, texts, metadatas)
+            ])
+            
+            start = len(self._ids)
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                self._rows[chunk_id] = len(self._ids)
+                self._ids.append(chunk_id)
+                self._texts.append(text)
+                self._metadatas.append(dict(metadata))
+            
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            self._alive[replaced] = False
+            self._open_matrix()
+            self._norms = np.concatenate([self._norms, self._compute_norms(start)])
+            if self._codes is not None:
+                codes, scales = self._quantize(vectors)
+                self._codes = np.concatenate([self._codes, codes])
+                self._scales = np.concatenate([self._scales, scales])
+            elif self.quantization == QUANTIZATION_INT8:
+                self._codes, self._scales = self._compute_codes()
+            self._maybe_compact()
+    
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            known = [chunk_id for chunk_id in ids if chunk_id in self._rows]
+            if not known:
+                return
+            self._append_records([{"deleted": known}])
+            self._alive[[self._rows.pop(chunk_id) for chunk_id in known]] = False
+            self._maybe_compact()
+    
+    def get(self, where: Optional[Dict[str, Any]] = None) -> List[StoredChunk]:
+        with self._lock:
+            return [
+                StoredChunk(chunk_id, self._texts[row], dict(self._metadatas[row]))
+                for chunk_id, row in self._rows.items()
+                if not where or all(self._metadatas[row].get(key) == value for key, value in where.items())
+            ]
+    
+    def search(self, vector: List[float], k: int) -> List[Tuple[StoredChunk, float]]:
+        return self.search_many([vector], k)[0]
+    
+    def search_many(self, vectors: List[List[float]], k: int) -> List[List[Tuple[StoredChunk, float]]]:
+        """
+        Wyszukiwanie dla wielu zapytań naraz (jedno mnożenie macierzy na blok wierszy).
+        
+        Args:
+            vectors: Wektory zapytań
+            k: Liczba wyników na zapytanie
+        
+        Returns:
+            Dla każdego zapytania lista (chunk, odległość) od najbliższego
+        """
+        with self._lock:
+            if self._matrix is None or not self._alive.any():
+                return [[] for _ in vectors]
+            
+            queries = np.asarray(vectors, dtype=np.float32)
+            query_norms = np.einsum("ij,ij->i", queries, queries)
+            if self._codes is None:
+                best_rows, best_distances = self._scan(queries, query_norms, k)
+            else:
+                candidates, candidate_distances = self._scan(queries, query_norms, k * self.rescore_factor)
+                best_rows, best_distances = self._rescore(queries, query_norms, candidates, candidate_distances, k)
+            
+            results = []
+            for rows, row_distances in zip(best_rows, best_distances):
+                results.append([
+                    (StoredChunk(self._ids[row], self._texts[row], dict(self._metadatas[row])), float(max(distance, 0.0)))
+                    for row, distance in zip(rows, row_distances)
+                    if np.isfinite(distance)
+                ])
+            return results
+    
+    def _distances(self, dots: np.ndarray, row_norms: np.ndarray, query_norms: np.ndarray) -> np.ndarray:
+        """Odległości wg metryki z iloczynów skalarnych i kwadratów norm."""
+        if self.metric == METRIC_L2:
+            return row_norms[None, :] - 2 * dots + query_norms[:, None]
+        denominator = np.sqrt(row_norms)[None, :] * np.sqrt(query_norms)[:, None]
+        return 1 - dots / np.maximum(denominator, 1e-12)
+    
+    def _scan(self, queries: np.ndarray, query_norms: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Brute-force po wszystkich wierszach - float32 z memmap albo kody int8
+        (wtedy odległości są przybliżone, normy wierszy są dokładne).
+        
+        Returns:
+            (wiersze, odległości) - po k na zapytanie, od najbliższego;
+            usunięte wiersze mają odległość inf
+        """
+        quantized = self._codes is not None
+        source = self._codes if quantized else self._matrix
+        block_rows = min(self.block_rows, QUANTIZED_BLOCK_ROWS) if quantized else self.block_rows
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_distances = np.empty((len(queries), 0), dtype=np.float32)
+        
+        for start in range(0, source.shape[0], block_rows):
+            stop = min(start + block_rows, source.shape[0])
+            if quantized:
+                dots = (queries @ source[start:stop].T.astype(np.float32)) * self._scales[start:stop][None, :]
+            else:
+                dots = queries @ source[start:stop].T
+            distances = self._distances(dots, self._norms[start:stop], query_norms)
+            distances[:, ~self._alive[start:stop]] = np.inf
+            
+            # Najlepsze k z bloku dołączone do dotychczasowych najlepszych
+            take = min(k, distances.shape[1])
+            part = np.argpartition(distances, take - 1, axis=1)[:, :take]
+            best_rows = np.concatenate([best_rows, part + start], axis=1)
+            best_distances = np.concatenate([best_distances, np.take_along_axis(distances, part, axis=1)], axis=1)
+        
+        order = np.argsort(best_distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_distances, order, axis=1)
+    
+    def _rescore(
+        self,
+        queries: np.ndarray,
+        query_norms: np.ndarray,
+        candidates: np.ndarray,
+        candidate_distances: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dokładne odległości kandydatów z wektorów float32 - z pliku czytane
+        są tylko ich wiersze (wspólne dla wszystkich zapytań).
+        
+        Returns:
+            (wiersze, odległości) - po k na zapytanie, od najbliższego
+        """
+        valid = np.isfinite(candidate_distances)
+        unique_rows = np.unique(candidates[valid])
+        dots = queries @ np.asarray(self._matrix[unique_rows]).T
+        exact = self._distances(dots, self._norms[unique_rows], query_norms)
+        
+        columns = np.minimum(np.searchsorted(unique_rows, candidates), len(unique_rows) - 1)
+        distances = np.where(valid, np.take_along_axis(exact, columns, axis=1), np.inf)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(distances, order, axis=1)
+    
+    def count(self) -> int:
+        with self._lock:
+            return len(self._rows)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Rozmiar indeksu i pamięć wektorów.
+        vector_bytes to plik float32 (przy kwantyzacji czytany tylko przy
+        rescoringu), scan_bytes - dane przeszukiwane przy każdym zapytaniu,
+        czyli to, co musi być w RAM (lub cache stron) dla szybkiego wyszukiwania.
+        
+        Returns:
+            Słownik z backend, metric, quantization, chunks, rows, dim,
+            vector_bytes, quantized_bytes, scan_bytes, compression
+        """
+        with self._lock:
+            rows, dim = len(self._ids), self._dim or 0
+            vector_bytes = rows * dim * 4
+            quantized_bytes = self._codes.nbytes + self._scales.nbytes if self._codes is not None else 0
+            # Normy są potrzebne w obu wariantach
+            scan_bytes = (quantized_bytes or vector_bytes) + self._norms.nbytes
+            return {
+                "backend": "numpy",
+                "metric": self.metric,
+                "quantization": self.quantization,
+                "chunks": len(self._rows),
+                "rows": rows,
+                "dim": dim,
+                "vector_bytes": vector_bytes,
+                "quantized_bytes": quantized_bytes,
+                "scan_bytes": scan_bytes,
+                "compression": round((vector_bytes + self._norms.nbytes) / scan_bytes, 2) if scan_bytes else 1.0,
+            }
+    
+    # === Kompaktowanie ===
+    
+    def _maybe_compact(self) -> None:
+        """Kompaktuje, gdy usunięte wiersze przekroczą compact_ratio pliku."""
+        dead = len(self._ids) - len(self._rows)
+        if dead >= COMPACT_MIN_DEAD_ROWS and dead > self.compact_ratio * len(self._ids):
+            self.compact()
+    
+    def compact(self) -> None:
+        """
+        Przepisuje żywe wiersze do nowej generacji plików.
+        Zatwierdzeniem jest podmiana index.json - przerwanie wcześniej
+        zostawia starą generację nienaruszoną.
+        """
+        with self._lock:
+            live_rows = np.flatnonzero(self._alive)
+            old_generation = self._generation
+            new_generation = old_generation + 1
+            
+            with open(self._vectors_path(new_generation), "wb") as f:
+                for i in range(0, len(live_rows), self.block_rows):
+                    f.write(np.ascontiguousarray(self._matrix[live_rows[i:i + self.block_rows]]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            
+            with open(self._chunks_path(new_generation), "w", encoding="utf-8") as f:
+                f.writelines(
+                    json.dumps(
+                        {"id": self._ids[row], "text": self._texts[row], "metadata": self._metadatas[row]},
+                        ensure_ascii=False
+                    ) + "\n"
+                    for row in live_rows
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            
+            self._generation = new_generation
+            self._write_index()
+            
+            dead = len(self._ids) - len(live_rows)
+            self._norms = self._norms[live_rows]
+            if self._codes is not None:
+                self._codes = self._codes[live_rows]
+                self._scales = self._scales[live_rows]
+            self._ids = [self._ids[row] for row in live_rows]
+            self._texts = [self._texts[row] for row in live_rows]
+            self._metadatas = [self._metadatas[row] for row in live_rows]
+            self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+            self._alive = np.ones(len(self._ids), dtype=bool)
+            # Stare mapowanie musi być zamknięte przed usunięciem pliku (Windows)
+            self._matrix = None
+            self._open_matrix()
+            
+            for stale in (self._vectors_path(old_generation), self._chunks_path(old_generation)):
+                stale.unlink(missing_ok=True)
+            
+            logger.info(f"Kompaktowanie indeksu NumPy: usunięto {dead} wierszy, zostało {len(self._ids)}")
@@ -0,0 +1,196 @@
+# services/rag_manifest.py
+"""
+Manifest i katalog indeksu RAG (SQLite).
+Dla każdego pliku projektu: hash treści, id jego chunków w ChromaDB,
+rozmiar i czas zapisu - pozwala przy ponownym dodaniu projektu pominąć
+niezmienione pliki, usunąć osierocone chunki oraz listować projekty
+bez zapytań do bazy wektorowej.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+from utils.logger import get_service_logger
+from utils.sqlite import connect
+
+logger = get_service_logger("rag_manifest")
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Stan jednego pliku w indeksie.
+    
+    Atrybuty:
+        content_hash: Hash treści pliku (file_hash())
+        chunk_ids: Id chunków pliku w ChromaDB (w kolejności pliku)
+        size_bytes: Rozmiar treści pliku (UTF-8)
+        updated_at: Czas ostatniego zapisu pliku do indeksu (ustawiany przy zapisie)
+    """
+    content_hash: str
+    chunk_ids: List[str] = field(default_factory=list)
+    size_bytes: int = 0
+    updated_at: float = 0.0
+
+
+@dataclass
+class ProjectStats:
+    """
+    Projekt w katalogu RAG.
+    
+    Atrybuty:
+        name: Nazwa projektu
+        files: Słownik {filename: ManifestEntry}
+    """
+    name: str
+    files: Dict[str, ManifestEntry] = field(default_factory=dict)
+    
+    @property
+    def chunks(self) -> int:
+        """Liczba chunków projektu w ChromaDB."""
+        return sum(len(entry.chunk_ids) for entry in self.files.values())
+    
+    @property
+    def size_bytes(self) -> int:
+        """Łączny rozmiar plików."""
+        return sum(entry.size_bytes for entry in self.files.values())
+    
+    @property
+    def updated_at(self) -> float:
+        """Czas ostatniej zmiany projektu w indeksie."""
+        return max((entry.updated_at for entry in self.files.values()), default=0.0)
+
+
+class RagManifest:
+    """
+    Manifest plik -> hash treści -> id chunków (i katalog projektów).
+    
+    Trzymany w katalogu bazy ChromaDB, więc usunięcie bazy usuwa też
+    manifest i oba pozostają spójne.
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._init_db()
+    
+    def _init_db(self) -> None:
+        """Tworzy tabelę manifestu jeśli nie istnieje."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    project TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (project, filename)
+                )
+            """)
+            # Manifest sprzed katalogu nie miał rozmiaru pliku
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+            if "size_bytes" not in columns:
+                conn.execute("ALTER TABLE files ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0")
+    
+    @staticmethod
+    def file_hash(content: str) -> str:
+        """
+        Hash treści pliku.
+        
+        Args:
+            content: Treść pliku
+        
+        Returns:
+            Hash SHA-256 (hex)
+        """
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def get_project(self, project: str) -> Dict[str, ManifestEntry]:
+        """
+        Stan plików projektu w indeksie.
+        
+        Args:
+            project: Nazwa projektu
+        
+        Returns:
+            Słownik {filename: ManifestEntry} (pusty dla nieznanego projektu)
+        """
+        with self._lock, connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT filename, content_hash, chunk_ids, size_bytes, updated_at "
+                "FROM files WHERE project = ? ORDER BY filename",
+                (project,)
+            ).fetchall()
+        
+        return {
+            filename: ManifestEntry(content_hash, json.loads(chunk_ids), size_bytes, updated_at)
+            for filename, content_hash, chunk_ids, size_bytes, updated_at in rows
+        }
+    
+    def list_projects(self) -> List[ProjectStats]:
+        """
+        Wszystkie projekty w katalogu (jedno zapytanie, bez ChromaDB).
+        
+        Returns:
+            Lista ProjectStats posortowana po nazwie
+        """
+        with self._lock, connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT project, filename, content_hash, chunk_ids, size_bytes, updated_at "
+                "FROM files ORDER BY project, filename"
+            ).fetchall()
+        
+        projects: Dict[str, ProjectStats] = {}
+        for project, filename, content_hash, chunk_ids, size_bytes, updated_at in rows:
+            projects.setdefault(project, ProjectStats(project)).files[filename] = ManifestEntry(
+                content_hash, json.loads(chunk_ids), size_bytes, updated_at
+            )
+        return list(projects.values())
+    
+    def update_project(
+        self,
+        project: str,
+        changed: Dict[str, ManifestEntry],
+        removed: List[str]
+    ) -> None:
+        """
+        Zapisuje zmienione pliki i usuwa wpisy plików, których już nie ma
+        (jedna transakcja).
+        
+        Args:
+            project: Nazwa projektu
+            changed: Słownik {filename: ManifestEntry} nowych lub zmienionych plików
+            removed: Nazwy usuniętych plików
+        """
+        if not changed and not removed:
+            return
+        
+        now = time.time()
+        with self._lock, connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO files "
+                "(project, filename, content_hash, chunk_ids, updated_at, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (project, filename, entry.content_hash, json.dumps(entry.chunk_ids), now, entry.size_bytes)
+                    for filename, entry in changed.items()
+                ]
+            )
+            conn.executemany(
+                "DELETE FROM files WHERE project = ? AND filename = ?",
+                [(project, filename) for filename in removed]
+            )
+        
+        logger.debug(f"Manifest '{project}': zapisano {len(changed)}, usunięto {len(removed)} plików")
+    
+    def clear(self) -> None:
+        """Czyści cały manifest."""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("DELETE FROM files")
@@ -0,0 +1,150 @@
+# services/retrieval_cache.py
+"""
+Cache wyszukiwania RAG (w pamięci, LRU).
+Osobno wektory zapytań (zależą tylko od modelu embeddingów) i wyniki
+wyszukiwania (zależą od stanu indeksu - czyszczone przy każdej jego zmianie).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class RetrievalCache:
+    """
+    Dwa ograniczone cache LRU dla search_similar().
+    
+    Wyniki są kluczowane dodatkowo wersją indeksu - invalidate() podbija
+    wersję i czyści wyniki, a wektory zapytań zostają (indeks ich nie zmienia).
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._vectors: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._results: "OrderedDict[Tuple[str, int, float], List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._stats = {
+            "vector_hits": 0,
+            "vector_misses": 0,
+            "result_hits": 0,
+            "result_misses": 0,
+            "invalidations": 0,
+        }
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Zapytanie bez nadmiarowych białych znaków (te same słowa = ten sam klucz)."""
+        return " ".join(query.split())
+    
+    @property
+    def version(self) -> int:
+        """Wersja indeksu - zmienia się przy każdym invalidate()."""
+        return self._version
+    
+    def _put(self, cache: OrderedDict, key: Tuple, value: Any) -> None:
+        """Zapis z usunięciem najdawniej używanych wpisów ponad limit."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+    
+    def get_vector(self, model: str, query: str) -> Optional[List[float]]:
+        """
+        Wektor zapytania z cache.
+        
+        Args:
+            model: Model embeddingów
+            query: Znormalizowane zapytanie
+        
+        Returns:
+            Wektor lub None
+        """
+        with self._lock:
+            vector = self._vectors.get((model, query))
+            if vector is None:
+                self._stats["vector_misses"] += 1
+                return None
+            self._vectors.move_to_end((model, query))
+            self._stats["vector_hits"] += 1
+            return vector
+    
+    def put_vector(self, model: str, query: str, vector: List[float]) -> None:
+        """Zapisuje wektor zapytania."""
+        with self._lock:
+            self._put(self._vectors, (model, query), vector)
+    
+    def get_results(self, query: str, k: int, threshold: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wyniki wyszukiwania z cache (kopie - wywołujący może je modyfikować).
+        
+        Args:
+            query: Znormalizowane zapytanie
+            k: Liczba wyników
+            threshold: Próg podobieństwa
+        
+        Returns:
+            Lista wyników lub None
+        """
+        key = (query, k, threshold)
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                self._stats["result_misses"] += 1
+                return None
+            self._results.move_to_end(key)
+            self._stats["result_hits"] += 1
+            return [dict(item) for item in results]
+    
+    def put_results(
+        self,
+        query: str,
+        k: int,
+        threshold: float,
+        results: List[Dict[str, Any]],
+        version: int
+    ) -> None:
+        """
+        Zapisuje wyniki, o ile indeks nie zmienił się w trakcie wyszukiwania.
+        
+        Args:
+            query: Znormalizowane zapytanie
+            k: Liczba wyników
+            threshold: Próg podobieństwa
+            results: Wyniki search_similar()
+            version: Wersja indeksu odczytana przed wyszukiwaniem
+        """
+        with self._lock:
+            if version == self._version:
+                self._put(self._results, (query, k, threshold), [dict(item) for item in results])
+    
+    def invalidate(self) -> None:
+        """Indeks się zmienił - wyniki są nieaktualne."""
+        with self._lock:
+            self._version += 1
+            self._results.clear()
+            self._stats["invalidations"] += 1
+    
+    def clear(self) -> None:
+        """Czyści oba cache."""
+        with self._lock:
+            self._vectors.clear()
+            self._results.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki cache.
+        
+        Returns:
+            Słownik z licznikami trafień/chybień, vector_hit_rate,
+            result_hit_rate, invalidations, vectors, results (liczba wpisów)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["vectors"] = len(self._vectors)
+            stats["results"] = len(self._results)
+        
+        for kind in ("vector", "result"):
+            lookups = stats[f"{kind}_hits"] + stats[f"{kind}_misses"]
+            stats[f"{kind}_hit_rate"] = round(stats[f"{kind}_hits"] / lookups, 3) if lookups else 0.0
+        return stats
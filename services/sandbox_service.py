@@ -0,0 +1,271 @@
+# services/sandbox_service.py
+"""
+Smoke-test wygenerowanego kodu Pythona w izolowanych podprocesach.
+Import każdego modułu i uruchomienie wygenerowanych testów z limitami
+CPU/pamięci/czasu i w środowisku bez ekranu (pygame, matplotlib, Qt).
+
+Uwaga: to ochrona przed zawieszeniem i zjedzeniem zasobów, a nie
+granica bezpieczeństwa - kod ma dostęp do sieci i systemu plików użytkownika.
+"""
+
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+from config import settings
+from utils.logger import get_service_logger
+
+try:
+    import resource
+except ImportError:  # Windows - bez limitów rlimit
+    resource = None
+
+logger = get_service_logger("sandbox")
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_WARNING = "warning"
+
+# Ile ostatnich linii tracebacku trafia do feedbacku
+TRACEBACK_LINES = 15
+
+MISSING_MODULE = re.compile(r"ModuleNotFoundError: No module named '([\w.]+)'")
+
+# Brak ekranu (tkinter, Qt bez offscreen) - aplikacja GUI, nie błąd w kodzie
+NO_DISPLAY = re.compile(
+    r"TclError: no display|couldn't connect to display|could not connect to display",
+    re.IGNORECASE
+)
+
+# Max rozmiar pliku zapisanego przez kod (bajty)
+FILE_SIZE_LIMIT = 50 * 1024 * 1024
+
+# Ustawia limity CPU/pamięci/plików i zastępuje się właściwą komendą
+_BOOTSTRAP = (
+    "import os, resource, sys\n"
+    "cpu, memory, fsize = (int(v) for v in sys.argv[1:4])\n"
+    "resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))\n"
+    "resource.setrlimit(resource.RLIMIT_AS, (memory, memory))\n"
+    "resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))\n"
+    "os.execv(sys.argv[4], sys.argv[4:])\n"
+)
+
+
+@dataclass
+class SandboxResult:
+    """
+    Wynik jednego uruchomienia w sandboxie.
+    
+    Atrybuty:
+        file: Plik, którego dotyczy uruchomienie
+        kind: "import" lub "test"
+        status: STATUS_OK / STATUS_ERROR / STATUS_WARNING
+        duration: Czas uruchomienia (s)
+        output: Końcówka stderr/stdout (traceback) dla błędów i ostrzeżeń
+    """
+    file: str
+    kind: str
+    status: str
+    duration: float
+    output: str = ""
+
+
+def _module_name(filename: str) -> Optional[str]:
+    """Nazwa modułu do importu ("pkg/mod.py" -> "pkg.mod") lub None gdy nieimportowalny."""
+    parts = Path(filename).with_suffix("").parts
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None
+    return ".".join(parts)
+
+
+def _is_test_file(filename: str) -> bool:
+    """Czy plik wygląda na test (test_*.py / *_test.py)."""
+    name = Path(filename).name
+    return name.startswith("test_") or name.endswith("_test.py")
+
+
+class SandboxService:
+    """
+    Uruchamia moduły projektu w osobnych podprocesach, równolegle.
+    
+    Brak zewnętrznej biblioteki (np. pygame niezainstalowane lokalnie),
+    brak ekranu (okno tkinter tworzone przy imporcie) i przekroczenie
+    czasu (pętla gry na poziomie modułu) to ostrzeżenia - nie świadczą
+    o błędzie w kodzie. Wyjątek przy imporcie to błąd.
+    """
+    
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        cpu_seconds: Optional[int] = None,
+        memory_mb: Optional[int] = None,
+        max_parallel: Optional[int] = None
+    ):
+        self.timeout = timeout or settings.sandbox_timeout
+        self.cpu_seconds = cpu_seconds or settings.sandbox_cpu_seconds
+        self.memory_mb = memory_mb or settings.sandbox_memory_mb
+        self.max_parallel = max_parallel or settings.sandbox_max_parallel
+        self._has_pytest = importlib.util.find_spec("pytest") is not None
+    
+    def _with_limits(self, command: List[str]) -> List[str]:
+        """
+        Opakowuje komendę bootstrapem ustawiającym rlimity przed exec
+        (preexec_fn nie jest bezpieczne przy wielu wątkach).
+        """
+        if resource is None:
+            return command
+        
+        memory = self.memory_mb * 1024 * 1024
+        return [
+            sys.executable, "-c", _BOOTSTRAP,
+            str(self.cpu_seconds), str(memory), str(FILE_SIZE_LIMIT), *command
+        ]
+    
+    def _environment(self, workdir: Path) -> Dict[str, str]:
+        """Minimalne, headless środowisko podprocesu."""
+        return {
+            "PATH": os.environ.get("PATH", ""),
+            "SYSTEMROOT": os.environ.get("SYSTEMROOT", ""),
+            "HOME": str(workdir),
+            "PYTHONPATH": str(workdir),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "PYTHONIOENCODING": "utf-8",
+            "SDL_VIDEODRIVER": "dummy",
+            "SDL_AUDIODRIVER": "dummy",
+            "PYGAME_HIDE_SUPPORT_PROMPT": "1",
+            "MPLBACKEND": "Agg",
+            "QT_QPA_PLATFORM": "offscreen",
+        }
+    
+    def _command(self, filename: str, kind: str) -> List[str]:
+        """Komenda dla importu modułu lub uruchomienia testów."""
+        if kind == "test":
+            if self._has_pytest:
+                return [sys.executable, "-m", "pytest", "-q", "-x", "-p", "no:cacheprovider", filename]
+            return [sys.executable, "-m", "unittest", _module_name(filename) or filename]
+        
+        module = _module_name(filename)
+        if module is None:
+            return [sys.executable, "-m", "py_compile", filename]
+        return [sys.executable, "-c", f"import importlib; importlib.import_module({module!r})"]
+    
+    def _classify(self, output: str, project_modules: set) -> str:
+        """Błąd czy ostrzeżenie - brak zewnętrznej biblioteki lub ekranu to ostrzeżenie."""
+        missing = MISSING_MODULE.findall(output)
+        if missing and missing[-1].split(".")[0] not in project_modules:
+            return STATUS_WARNING
+        if NO_DISPLAY.search(output):
+            return STATUS_WARNING
+        return STATUS_ERROR
+    
+    def _run_one(
+        self,
+        workdir: Path,
+        filename: str,
+        kind: str,
+        project_modules: set
+    ) -> SandboxResult:
+        """Jedno uruchomienie w podprocesie."""
+        started = time.perf_counter()
+        
+        try:
+            completed = subprocess.run(
+                self._with_limits(self._command(filename, kind)),
+                cwd=workdir,
+                env=self._environment(workdir),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=self.timeout,
+                start_new_session=True
+            )
+        except subprocess.TimeoutExpired:
+            return SandboxResult(
+                filename, kind, STATUS_WARNING, time.perf_counter() - started,
+                f"Przekroczono limit czasu {self.timeout:.0f}s (np. pętla główna przy imporcie)"
+            )
+        
+        duration = time.perf_counter() - started
+        if completed.returncode == 0:
+            return SandboxResult(filename, kind, STATUS_OK, duration)
+        
+        output = (completed.stderr or completed.stdout).replace(f"{workdir}{os.sep}", "")
+        # Ramki importlib nic nie mówią o błędzie w projekcie
+        lines = [line for line in output.strip().splitlines() if "<frozen " not in line]
+        tail = "\n".join(lines[-TRACEBACK_LINES:])
+        
+        if completed.returncode < 0:
+            # Zabity sygnałem (limit CPU) - jak timeout, nie dowód błędu w kodzie
+            tail = f"{tail}\nProces zabity sygnałem {-completed.returncode} (limit CPU)".strip()
+            return SandboxResult(filename, kind, STATUS_WARNING, duration, tail)
+        
+        return SandboxResult(filename, kind, self._classify(output, project_modules), duration, tail)
+    
+    def run_project(self, code_dict: Dict[str, str]) -> List[SandboxResult]:
+        """
+        Importuje każdy moduł Pythona projektu i uruchamia wygenerowane testy.
+        
+        Args:
+            code_dict: Słownik {filename: content}
+        
+        Returns:
+            Wyniki w kolejności plików (puste gdy brak plików .py)
+        """
+        python_files = [f for f in code_dict if f.endswith(".py")]
+        if not python_files:
+            return []
+        
+        with tempfile.TemporaryDirectory(prefix="agileflow_sandbox_") as tmp:
+            workdir = Path(tmp)
+            written = []
+            
+            for filename, content in code_dict.items():
+                path = (workdir / filename).resolve()
+                if not path.is_relative_to(workdir.resolve()):
+                    logger.warning(f"Pominięto plik spoza projektu: {filename}")
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content, encoding="utf-8")
+                written.append(filename)
+            
+            python_files = [f for f in python_files if f in written]
+            project_modules = {Path(f).with_suffix("").parts[0] for f in python_files}
+            jobs = [(f, "test" if _is_test_file(f) else "import") for f in python_files]
+            
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+                results = list(executor.map(
+                    lambda job: self._run_one(workdir, job[0], job[1], project_modules), jobs
+                ))
+        
+        errors = sum(r.status == STATUS_ERROR for r in results)
+        logger.info(
+            f"Sandbox: {len(results)} uruchomień, błędy: {errors}, "
+            f"czas {time.perf_counter() - started:.1f}s"
+        )
+        return results
+    
+    def get_config(self) -> Dict[str, Any]:
+        """Aktualne limity sandboxa."""
+        return {
+            "timeout": self.timeout,
+            "cpu_seconds": self.cpu_seconds,
+            "memory_mb": self.memory_mb,
+            "max_parallel": self.max_parallel,
+            "rlimits": resource is not None,
+        }
+
+
+# Singleton
+sandbox_service = SandboxService()
@@ -0,0 +1,160 @@
+# services/vector_backends.py
+"""
+Backendy bazy wektorowej RAG.
+VectorStoreService korzysta tylko z interfejsu VectorBackend - domyślnie
+ChromaDB, opcjonalnie macierz NumPy mapowana z dysku (services.numpy_backend).
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+from utils.logger import get_service_logger
+
+logger = get_service_logger("vector_backend")
+
+BACKEND_CHROMA = "chroma"
+BACKEND_NUMPY = "numpy"
+
+
+@dataclass
+class StoredChunk:
+    """
+    Chunk zapisany w backendzie.
+    
+    Atrybuty:
+        id: Id chunka
+        text: Treść
+        metadata: Metadane (wartości skalarne)
+    """
+    id: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class VectorBackend(ABC):
+    """
+    Minimalny interfejs bazy wektorowej używany przez VectorStoreService.
+    Odległości w search() są jak w ChromaDB - mniejsze = bliższe.
+    """
+    
+    # Katalog danych backendu (manifest indeksu leży obok)
+    path: Path
+    
+    @abstractmethod
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Dodaje chunki (istniejące id są nadpisywane), embeddingi liczy sam backend."""
+    
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Usuwa chunki (nieznane id są pomijane)."""
+    
+    @abstractmethod
+    def get(self, where: Optional[Dict[str, Any]] = None) -> List[StoredChunk]:
+        """Chunki, których metadane mają podane wartości (wszystkie dla where=None)."""
+    
+    @abstractmethod
+    def search(self, vector: List[float], k: int) -> List[Tuple[StoredChunk, float]]:
+        """k najbliższych chunków jako (chunk, odległość) od najbliższego."""
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Liczba chunków w bazie."""
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Rozmiar indeksu (backendy mogą dodać zużycie pamięci)."""
+        return {"backend": type(self).__name__, "chunks": self.count()}
+
+
+class ChromaBackend(VectorBackend):
+    """ChromaDB przez langchain_community - inicjalizowana przy pierwszym użyciu."""
+    
+    def __init__(self, path: Path, embeddings: Embeddings):
+        self.path = Path(path)
+        self.embeddings = embeddings
+        self._vectorstore: Optional[Chroma] = None
+    
+    @property
+    def vectorstore(self) -> Chroma:
+        """Instancja Chroma (lazy)."""
+        if self._vectorstore is None:
+            logger.info("Inicjalizuję ChromaDB...")
+            self._vectorstore = Chroma(
+                persist_directory=str(self.path),
+                embedding_function=self.embeddings
+            )
+            logger.info("ChromaDB gotowe")
+        return self._vectorstore
+    
+    @staticmethod
+    def _where(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Filtr równości w składni Chroma (kilka warunków przez $and)."""
+        if not where or len(where) == 1:
+            return where or None
+        return {"$and": [{key: value} for key, value in where.items()]}
+    
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        self.vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+    
+    def delete(self, ids: List[str]) -> None:
+        self.vectorstore.delete(ids=ids)
+    
+    def get(self, where: Optional[Dict[str, Any]] = None) -> List[StoredChunk]:
+        data = self.vectorstore.get(where=self._where(where), include=["documents", "metadatas"])
+        return [
+            StoredChunk(chunk_id, text, metadata or {})
+            for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        ]
+    
+    def search(self, vector: List[float], k: int) -> List[Tuple[StoredChunk, float]]:
+        # Bezpośrednio kolekcja - wrapper langchain nie zwraca id dokumentów
+        results = self.vectorstore._collection.query(
+            query_embeddings=[vector],
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            (StoredChunk(chunk_id, text, metadata or {}), distance)
+            for chunk_id, text, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+    
+    def count(self) -> int:
+        return self.vectorstore._collection.count()
+
+
+def create_backend(name: str, path: Path, embeddings: Embeddings) -> VectorBackend:
+    """
+    Tworzy backend po nazwie z config.
+    
+    Args:
+        name: BACKEND_CHROMA lub BACKEND_NUMPY
+        path: Katalog bazy RAG
+        embeddings: Model embeddingów chunków
+    
+    Returns:
+        Instancja VectorBackend
+    """
+    from config import settings
+    
+    if name == BACKEND_NUMPY:
+        # NumPy ładowany tylko gdy wybrany
+        from services.numpy_backend import NumpyBackend
+        return NumpyBackend(
+            Path(path) / BACKEND_NUMPY,
+            embeddings,
+            metric=settings.vector_numpy_metric,
+            compact_ratio=settings.vector_numpy_compact_ratio,
+            block_rows=settings.vector_numpy_block_rows,
+            quantization=settings.vector_quantization,
+            rescore_factor=settings.vector_rescore_factor
+        )
+    if name != BACKEND_CHROMA:
+        raise ValueError(f"Nieznany backend wektorowy: {name}")
+    
+    if settings.vector_quantization != "none":
+        logger.warning("Kwantyzacja wektorów działa tylko z backendem numpy - ChromaDB trzyma float32")
+    return ChromaBackend(path, embeddings)
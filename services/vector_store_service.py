@@ -1,27 +1,75 @@
 # services/vector_store_service.py
 """
-Serwis RAG - zarządzanie bazą wektorową ChromaDB.
-Ulepszone chunkowanie, wyszukiwanie i filtrowanie.
+Serwis RAG - zarządzanie bazą wektorową (ChromaDB lub NumPy).
+Ulepszone chunkowanie, wyszukiwanie hybrydowe (wektory + BM25) i filtrowanie.
 """
 
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
 from config import settings
-from services.llm_service import llm_service
+from services.embedding_service import embedding_service
+from services.lexical_index import LexicalIndex
+from services.rag_manifest import RagManifest, ManifestEntry, ProjectStats
+from services.retrieval_cache import RetrievalCache
+from services.vector_backends import VectorBackend, ChromaBackend, create_backend
+from utils.chunkers import chunk_file
 from utils.logger import get_service_logger
 
 logger = get_service_logger("vectorstore")
 
+SEARCH_VECTOR = "vector"
+SEARCH_LEXICAL = "lexical"
+SEARCH_HYBRID = "hybrid"
+
+
+@dataclass
+class IngestResult:
+    """
+    Wynik dodania projektu do RAG.
+    
+    Atrybuty:
+        added: Nowe chunki zapisane w bazie wektorowej
+        kept: Chunki pozostawione bez zmian
+        deleted: Usunięte chunki (zmienione fragmenty, usunięte pliki)
+        files_changed: Pliki nowe lub ze zmienioną treścią
+        files_removed: Pliki, których nie ma już w projekcie
+        seconds: Czas operacji
+    """
+    added: int = 0
+    kept: int = 0
+    deleted: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    seconds: float = 0.0
+    
+    @property
+    def unchanged(self) -> bool:
+        """Czy indeks nie został zmieniony (ta sama treść co poprzednio)."""
+        return not (self.added or self.deleted or self.files_changed or self.files_removed)
+
 
 class VectorStoreService:
     """
-    Serwis do zarządzania bazą wektorową ChromaDB.
+    Serwis do zarządzania bazą wektorową RAG (backend z settings.vector_backend).
     Obsługuje dodawanie projektów i wyszukiwanie podobieństw.
+    Obok bazy wektorowej utrzymuje indeks BM25 tych samych chunków.
     """
     
-    def __init__(self):
-        self._vectorstore: Optional[Chroma] = None
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        # Domyślnie batchowane, równoległe i cache'owane embeddingi chunków
+        self.embeddings = embeddings or embedding_service
+        self._backend: Optional[VectorBackend] = None
+        self._backend_lock = threading.Lock()
+        self._lexical: Optional[LexicalIndex] = None
+        self._manifest: Optional[RagManifest] = None
+        self._ingest_lock = threading.Lock()
+        self.retrieval_cache = RetrievalCache(max_entries=settings.rag_cache_max_entries)
         self._ensure_db_path()
     
     def _ensure_db_path(self) -> None:
@@ -30,168 +78,462 @@ class VectorStoreService:
             settings.chroma_db_path.mkdir(parents=True)
             logger.info(f"Utworzono folder bazy: {settings.chroma_db_path}")
     
+    def get_backend(self) -> VectorBackend:
+        """
+        Zwraca backend bazy wektorowej (singleton, wybierany przez vector_backend).
+        
+        Returns:
+            Instancja VectorBackend (Chroma inicjalizuje się dopiero przy pierwszym zapytaniu)
+        """
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = create_backend(settings.vector_backend, settings.chroma_db_path, self.embeddings)
+        return self._backend
+    
     def get_vectorstore(self) -> Chroma:
         """
-        Zwraca instancję ChromaDB (singleton).
+        Zwraca instancję ChromaDB (kompatybilność wsteczna - tylko backend "chroma").
         
         Returns:
             Skonfigurowana instancja Chroma
         """
-        if self._vectorstore is None:
-            logger.info("Inicjalizuję ChromaDB...")
-            embeddings = llm_service.get_embeddings()
-            
-            self._vectorstore = Chroma(
-                persist_directory=str(settings.chroma_db_path),
-                embedding_function=embeddings
-            )
-            logger.info("ChromaDB gotowe")
+        backend = self.get_backend()
+        if not isinstance(backend, ChromaBackend):
+            raise RuntimeError(f"Backend '{settings.vector_backend}' nie używa ChromaDB")
+        return backend.vectorstore
+    
+    @property
+    def manifest(self) -> RagManifest:
+        """Lazy-loaded manifest indeksu (plik -> hash treści -> id chunków)."""
+        if self._manifest is None:
+            # Manifest obok danych backendu - zmiana backendu nie myli stanu indeksu
+            self._manifest = RagManifest(self.get_backend().path / "manifest.sqlite")
+        return self._manifest
+    
+    @staticmethod
+    def _chunk_id(project_name: str, filename: str, text: str, metadata: Dict[str, Any]) -> str:
+        """
+        Id chunka z jego treści i metadanych - ten sam chunk w tym samym
+        miejscu pliku dostaje to samo id, więc przy ponownym dodaniu zostaje.
+        """
+        payload = json.dumps([text, metadata], sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return f"{project_name}__{filename}__{digest}"
+    
+    def _build_chunks(
+        self,
+        project_name: str,
+        filename: str,
+        content: str
+    ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Chunkuje plik wzdłuż granic składniowych (def/class, bloki JS/CSS,
+        sekcje HTML) - nazwy symboli trafiają do metadanych chunka.
+        
+        Returns:
+            Lista krotek (id, treść, metadane)
+        """
+        chunks = chunk_file(
+            filename, content,
+            max_chars=settings.rag_chunk_chars,
+            overlap=settings.rag_chunk_overlap
+        )
         
-        return self._vectorstore
+        built = []
+        for i, chunk in enumerate(chunks):
+            metadata = {
+                "project": project_name,
+                "filename": filename,
+                "source": f"{project_name}/{filename}",
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                "language": chunk.language,
+                "start_line": chunk.start_line,
+                "end_line": chunk.end_line,
+                # Chroma przyjmuje w metadanych tylko wartości skalarne (NumPy trzyma to samo)
+                "symbols": ", ".join(chunk.symbols)
+            }
+            built.append((self._chunk_id(project_name, filename, chunk.text, metadata), chunk.text, metadata))
+        return built
     
-    def _chunk_code(self, content: str, chunk_size: int = 1500, overlap: int = 200) -> List[str]:
+    def _indexed_ids(self, project_name: str) -> List[str]:
+        """Id wszystkich chunków projektu w bazie (także sprzed manifestu)."""
+        try:
+            return [chunk.id for chunk in self.get_backend().get(where={"project": project_name})]
+        except Exception as e:
+            logger.warning(f"Nie można pobrać chunków projektu '{project_name}': {e}")
+            return []
+    
+    def add_project(self, project_name: str, code_dict: Dict[str, str]) -> IngestResult:
         """
-        Dzieli kod na chunki dla lepszego wyszukiwania.
+        Dodaje projekt do bazy RAG idempotentnie i przyrostowo.
+        
+        Niezmienione pliki (ten sam hash treści w manifeście) są pomijane,
+        w zmienionych dodawane są tylko nowe chunki, a chunki usuniętych
+        plików i nieaktualne fragmenty są kasowane. Ponowne dodanie tej
+        samej treści nic nie zmienia w indeksie.
         
         Args:
-            content: Treść pliku
-            chunk_size: Rozmiar chunka w znakach
-            overlap: Nakładanie się chunków
+            project_name: Nazwa projektu
+            code_dict: Słownik {filename: content} - pełny stan projektu
         
         Returns:
-            Lista chunków
+            IngestResult z liczbą dodanych, zachowanych i usuniętych chunków
         """
-        if len(content) <= chunk_size:
-            return [content]
+        started = time.perf_counter()
+        result = IngestResult()
         
-        chunks = []
-        start = 0
-        
-        while start < len(content):
-            end = start + chunk_size
+        with self._ingest_lock:
+            previous = self.manifest.get_project(project_name)
+            # Projekt spoza manifestu mógł być zindeksowany starszą wersją (id chunk{i})
+            known_ids = (
+                {chunk_id for entry in previous.values() for chunk_id in entry.chunk_ids}
+                if previous else set(self._indexed_ids(project_name))
+            )
+            
+            changed: Dict[str, ManifestEntry] = {}
+            texts, metadatas, ids = [], [], []
+            wanted = set()
+            
+            for filename, content in code_dict.items():
+                content_hash = RagManifest.file_hash(content)
+                entry = previous.get(filename)
+                
+                if entry is not None and entry.content_hash == content_hash:
+                    wanted.update(entry.chunk_ids)
+                    result.kept += len(entry.chunk_ids)
+                    continue
+                
+                built = self._build_chunks(project_name, filename, content)
+                changed[filename] = ManifestEntry(
+                    content_hash,
+                    [chunk_id for chunk_id, _, _ in built],
+                    size_bytes=len(content.encode("utf-8"))
+                )
+                for chunk_id, text, metadata in built:
+                    wanted.add(chunk_id)
+                    if chunk_id in known_ids:
+                        result.kept += 1
+                    else:
+                        texts.append(text)
+                        metadatas.append(metadata)
+                        ids.append(chunk_id)
             
-            # Szukamy końca linii żeby nie ciąć w środku
-            if end < len(content):
-                newline_pos = content.rfind('\n', start, end)
-                if newline_pos > start:
-                    end = newline_pos + 1
+            removed = [filename for filename in previous if filename not in code_dict]
+            stale = sorted(known_ids - wanted)
             
-            chunks.append(content[start:end])
-            start = end - overlap
+            # Kolejność: dodanie, usunięcie, manifest - przerwanie w połowie
+            # zostawia plik jako "zmieniony" i kolejne dodanie dokończy pracę
+            if ids:
+                self.get_backend().add(ids, texts, metadatas)
+            if stale:
+                self.get_backend().delete(stale)
+            # Niezaładowany indeks BM25 i tak zbuduje się z aktualnej bazy
+            if self._lexical is not None:
+                self._lexical.add(ids, texts, metadatas)
+                self._lexical.remove(stale)
+            self.manifest.update_project(project_name, changed, removed)
+            
+            # Indeks się zmienił - wyniki wyszukiwań z cache są nieaktualne
+            if ids or stale:
+                self.retrieval_cache.invalidate()
+        
+        result.added = len(ids)
+        result.deleted = len(stale)
+        result.files_changed = len(changed)
+        result.files_removed = len(removed)
+        result.seconds = time.perf_counter() - started
         
-        return chunks
+        logger.info(
+            f"Projekt '{project_name}': {len(code_dict)} plików (zmienione {result.files_changed}, "
+            f"usunięte {result.files_removed}), chunki dodane {result.added}, "
+            f"zachowane {result.kept}, usunięte {result.deleted} w {result.seconds:.2f}s"
+        )
+        return result
+    
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        """Lazy-loaded indeks BM25 - budowany z chunków zapisanych w bazie wektorowej."""
+        if self._lexical is None:
+            # Lock ingestii - add_project nie może zmienić bazy w trakcie budowy
+            with self._ingest_lock:
+                if self._lexical is None:
+                    index = LexicalIndex()
+                    try:
+                        chunks = self.get_backend().get()
+                        index.add(
+                            [chunk.id for chunk in chunks],
+                            [chunk.text for chunk in chunks],
+                            [chunk.metadata for chunk in chunks]
+                        )
+                    except Exception as e:
+                        logger.warning(f"Nie można zbudować indeksu BM25 z bazy wektorowej: {e}")
+                    logger.info(f"Indeks BM25: {len(index)} chunków")
+                    self._lexical = index
+        return self._lexical
     
-    def add_project(self, project_name: str, code_dict: Dict[str, str]) -> int:
+    def _query_vector(self, query: str) -> List[float]:
+        """Wektor zapytania - z cache albo z modelu embeddingów."""
+        model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        vector = self.retrieval_cache.get_vector(model, query) if settings.rag_cache_enabled else None
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            if settings.rag_cache_enabled:
+                self.retrieval_cache.put_vector(model, query, vector)
+        return vector
+    
+    def _vector_search(self, query: str, k: int) -> List[Tuple[str, str, Dict[str, Any], float]]:
         """
-        Dodaje cały projekt do bazy RAG z chunkowaniem.
+        Najbliższe chunki wg embeddingów.
         
-        Args:
-            project_name: Nazwa projektu
-            code_dict: Słownik {filename: content}
+        Returns:
+            Lista krotek (id, treść, metadane, odległość L2) od najbliższego
+        """
+        return [
+            (chunk.id, chunk.text, chunk.metadata, distance)
+            for chunk, distance in self.get_backend().search(self._query_vector(query), k)
+        ]
+    
+    @staticmethod
+    def _format_result(
+        content: str,
+        metadata: Dict[str, Any],
+        distance: Optional[float],
+        relevance: Optional[float]
+    ) -> Dict[str, Any]:
+        """Wynik wyszukiwania w formacie search_similar()."""
+        return {
+            "content": content,
+            "filename": metadata.get("filename", "unknown"),
+            "project": metadata.get("project", "unknown"),
+            # Odległość z bazy wektorowej (None dla trafień tylko z BM25)
+            "score": None if distance is None else round(distance, 3),
+            "relevance": None if relevance is None else round(relevance, 3),
+            "chunk_index": metadata.get("chunk_index", 0),
+            "symbols": metadata.get("symbols", "")
+        }
+    
+    def _search_vector(self, query: str, k: int, score_threshold: float) -> List[Dict[str, Any]]:
+        """Samo wyszukiwanie wektorowe z progiem odległości."""
+        # Odległość L2 (Chroma i NumPy "l2") - mniejsze = lepsze
+        # Filtrujemy wyniki powyżej progu
+        return [
+            self._format_result(content, metadata, distance, None)
+            for _, content, metadata, distance in self._vector_search(query, k)
+            if distance < score_threshold
+        ]
+    
+    def _search_lexical(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """Samo BM25 (relevance = wynik względem najlepszego)."""
+        hits = self.lexical_index.search(query, k)
+        best = hits[0][1] if hits else 1.0
+        return [self._format_result(text, metadata, None, score / best) for _, score, text, metadata in hits]
+    
+    def _search_hybrid(self, query: str, k: int, score_threshold: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Wektory + BM25 połączone przez Reciprocal Rank Fusion, potem tani
+        rerank: RRF ważone z pokryciem rzadkich termów zapytania w chunku.
+        
+        Chunk musi przejść próg bezwzględny - odległość L2 poniżej
+        score_threshold albo pokrycie zapytania co najmniej
+        rag_hybrid_min_coverage - inaczej niepowiązany kod trafiałby do
+        promptu zawsze, gdy cokolwiek jest w indeksie. Z pozostałych
+        zostają wyniki bliskie najlepszemu (rag_rerank_min_ratio).
         
         Returns:
-            Liczba dodanych chunków
+            Krotka (wyniki, degraded) - degraded gdy wyszukiwanie wektorowe
+            zawiodło i wyniki pochodzą z samego BM25
         """
-        texts = []
-        metadatas = []
-        ids = []
+        candidates = max(k, settings.rag_hybrid_candidates)
+        rrf_k = settings.rag_rrf_k
+        fused: Dict[str, Dict[str, Any]] = {}
+        degraded = False
         
-        for filename, content in code_dict.items():
-            chunks = self._chunk_code(content)
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{project_name}__{filename}__chunk{i}"
-                
-                texts.append(chunk)
-                metadatas.append({
-                    "project": project_name,
-                    "filename": filename,
-                    "source": f"{project_name}/{filename}",
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
-                })
-                ids.append(chunk_id)
-        
-        if texts:
-            vectorstore = self.get_vectorstore()
-            vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
-            logger.info(f"Dodano projekt '{project_name}': {len(code_dict)} plików, {len(texts)} chunków")
-        
-        return len(texts)
+        try:
+            vector_hits = self._vector_search(query, candidates)
+        except Exception as e:
+            # Bez embeddingów (np. Ollama niedostępna) zostaje BM25
+            logger.warning(f"Wyszukiwanie wektorowe niedostępne, tylko BM25: {e}")
+            vector_hits = []
+            degraded = True
+        lexical_hits = [
+            (chunk_id, text, metadata, None)
+            for chunk_id, _, text, metadata in self.lexical_index.search(query, candidates)
+        ]
+        
+        for hits in (vector_hits, lexical_hits):
+            for rank, (chunk_id, content, metadata, distance) in enumerate(hits, start=1):
+                entry = fused.setdefault(
+                    chunk_id, {"content": content, "metadata": metadata, "distance": None, "rrf": 0.0}
+                )
+                entry["rrf"] += 1.0 / (rrf_k + rank)
+                if distance is not None:
+                    entry["distance"] = distance
+        
+        if not fused:
+            return [], degraded
+        
+        coverage = self.lexical_index.coverage(query, {
+            chunk_id: f"{entry['metadata'].get('filename', '')} {entry['metadata'].get('symbols', '')} {entry['content']}"
+            for chunk_id, entry in fused.items()
+        })
+        # Max RRF = pierwsze miejsce w obu listach
+        max_rrf = 2.0 / (rrf_k + 1)
+        weight = settings.rag_rerank_weight
+        relevant = []
+        for chunk_id, entry in fused.items():
+            close = entry["distance"] is not None and entry["distance"] < score_threshold
+            if not close and coverage[chunk_id] < settings.rag_hybrid_min_coverage:
+                continue
+            entry["relevance"] = (1 - weight) * entry["rrf"] / max_rrf + weight * coverage[chunk_id]
+            relevant.append(entry)
+        
+        if not relevant:
+            return [], degraded
+        
+        ranked = sorted(relevant, key=lambda entry: entry["relevance"], reverse=True)
+        cutoff = ranked[0]["relevance"] * settings.rag_rerank_min_ratio
+        return [
+            self._format_result(entry["content"], entry["metadata"], entry["distance"], entry["relevance"])
+            for entry in ranked[:k]
+            if entry["relevance"] >= cutoff
+        ], degraded
     
     def search_similar(
         self,
         query: str,
         k: Optional[int] = None,
-        score_threshold: Optional[float] = None
+        score_threshold: Optional[float] = None,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Wyszukuje podobne fragmenty kodu.
         
+        Domyślnie hybrydowo (wektory + BM25 + rerank), więc zwraca mniej,
+        ale trafniejszych chunków niż sam próg odległości L2.
+        Wektor zapytania i wyniki są cache'owane po znormalizowanym
+        zapytaniu, k, progu i trybie - wyniki do najbliższej zmiany indeksu.
+        Wyniki hybrydowe zdegradowane do samego BM25 (błąd embeddingów)
+        nie trafiają do cache, więc kolejne zapytanie znów próbuje wektorów.
+        
         Args:
             query: Zapytanie tekstowe
-            k: Liczba wyników (domyślnie z config)
-            score_threshold: Próg podobieństwa (domyślnie z config)
+            k: Max liczba wyników (domyślnie z config)
+            score_threshold: Próg odległości L2 - tryby "vector" i "hybrid" (domyślnie z config)
+            mode: "hybrid", "vector" lub "lexical" (domyślnie rag_search_mode)
         
         Returns:
-            Lista wyników z metadanymi
+            Lista wyników z metadanymi (score = odległość L2, relevance = wynik rerankingu)
         """
         k = k or settings.rag_top_k
         score_threshold = score_threshold or settings.rag_score_threshold
+        mode = mode or settings.rag_search_mode
+        query = RetrievalCache.normalize(query)
+        cache_query = f"{mode}:{query}"
         
-        vectorstore = self.get_vectorstore()
+        if settings.rag_cache_enabled:
+            cached = self.retrieval_cache.get_results(cache_query, k, score_threshold)
+            if cached is not None:
+                logger.debug(f"Wyniki RAG z cache ({len(cached)})")
+                return cached
+        
+        version = self.retrieval_cache.version
+        degraded = False
         
         try:
-            results = vectorstore.similarity_search_with_score(query, k=k)
+            if mode == SEARCH_VECTOR:
+                formatted = self._search_vector(query, k, score_threshold)
+            elif mode == SEARCH_LEXICAL:
+                formatted = self._search_lexical(query, k)
+            else:
+                formatted, degraded = self._search_hybrid(query, k, score_threshold)
         except Exception as e:
-            logger.error(f"Błąd wyszukiwania w ChromaDB: {e}")
+            logger.error(f"Błąd wyszukiwania w bazie wektorowej: {e}")
             return []
         
-        formatted = []
-        for doc, score in results:
-            # ChromaDB używa L2 distance - mniejsze = lepsze
-            # Filtrujemy wyniki powyżej progu
-            if score < score_threshold:
-                formatted.append({
-                    "content": doc.page_content,
-                    "filename": doc.metadata.get("filename", "unknown"),
-                    "project": doc.metadata.get("project", "unknown"),
-                    "score": round(score, 3),
-                    "chunk_index": doc.metadata.get("chunk_index", 0)
-                })
-        
-        logger.debug(f"Znaleziono {len(formatted)} wyników dla zapytania")
+        if degraded:
+            logger.warning(f"Wyniki RAG tylko z BM25 ({len(formatted)}) - pominięto cache")
+        elif settings.rag_cache_enabled:
+            self.retrieval_cache.put_results(cache_query, k, score_threshold, formatted, version)
+        
+        logger.debug(f"Znaleziono {len(formatted)} wyników dla zapytania ({mode})")
         return formatted
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki cache wyszukiwania.
+        
+        Returns:
+            Słownik z RetrievalCache.get_stats() (hit rate wektorów zapytań i wyników)
+        """
+        return self.retrieval_cache.get_stats()
+    
+    def get_backend_stats(self) -> Dict[str, Any]:
+        """
+        Statystyki bazy wektorowej.
+        
+        Returns:
+            Słownik z VectorBackend.get_stats() (dla numpy także pamięć wektorów i kwantyzacja)
+        """
+        return self.get_backend().get_stats()
+    
     def get_project_files(self, project_name: str) -> List[str]:
         """
-        Zwraca listę plików dla danego projektu.
+        Zwraca listę plików dla danego projektu (z katalogu, bez embeddingów).
         
         Args:
             project_name: Nazwa projektu
         
         Returns:
-            Lista nazw plików
+            Lista nazw plików (posortowana)
         """
-        vectorstore = self.get_vectorstore()
+        files = self.manifest.get_project(project_name)
+        if files:
+            return list(files)
         
+        # Projekt zindeksowany przed katalogiem - odczyt samych metadanych z bazy
         try:
-            # Pobierz wszystkie dokumenty z metadanymi
-            results = vectorstore.similarity_search(
-                f"project:{project_name}",
-                k=100,
-                filter={"project": project_name}
-            )
-            
-            filenames = set()
-            for doc in results:
-                if "filename" in doc.metadata:
-                    filenames.add(doc.metadata["filename"])
-            
-            return list(filenames)
+            chunks = self.get_backend().get(where={"project": project_name})
+            return sorted({chunk.metadata["filename"] for chunk in chunks if "filename" in chunk.metadata})
         except Exception as e:
             logger.warning(f"Nie można pobrać plików projektu: {e}")
             return []
+    
+    def list_projects(self) -> List[ProjectStats]:
+        """
+        Projekty w indeksie RAG z liczbą plików, chunków, rozmiarem i czasem zapisu.
+        
+        Returns:
+            Lista ProjectStats posortowana po nazwie
+        """
+        return self.manifest.list_projects()
+    
+    def get_project_stats(self, project_name: str) -> Optional[ProjectStats]:
+        """
+        Statystyki jednego projektu (pliki -> chunki, rozmiar, czas zapisu).
+        
+        Args:
+            project_name: Nazwa projektu
+        
+        Returns:
+            ProjectStats lub None dla projektu spoza katalogu
+        """
+        files = self.manifest.get_project(project_name)
+        return ProjectStats(project_name, files) if files else None
+    
+    def delete_project(self, project_name: str) -> IngestResult:
+        """
+        Usuwa projekt z indeksu RAG (chunki, wpisy katalogu, indeks BM25).
+        
+        Args:
+            project_name: Nazwa projektu
+        
+        Returns:
+            IngestResult z liczbą usuniętych chunków i plików
+        """
+        # Pusty stan projektu - add_project usuwa wszystkie pliki i chunki
+        return self.add_project(project_name, {})
 
 
 # Singleton
@@ -200,7 +542,7 @@ vector_store_service = VectorStoreService()
 
 # === Funkcje pomocnicze dla kompatybilności wstecznej ===
 
-def add_project_to_rag(project_name: str, code_dict: Dict[str, str]) -> int:
+def add_project_to_rag(project_name: str, code_dict: Dict[str, str]) -> IngestResult:
     """Wrapper dla kompatybilności z istniejącym kodem."""
     return vector_store_service.add_project(project_name, code_dict)
 
@@ -0,0 +1,22 @@
+# tests/conftest.py
+"""
+Wspólna konfiguracja testów.
+Ścieżki danych (RAG, cache, output) trafiają do katalogu tymczasowego,
+a start aplikacji nie łączy się z Ollamą - ustawione przed importem config.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="agileflow-tests-"))
+
+os.environ.update({
+    "CHROMA_DB_PATH": str(_DATA_DIR / "chroma_db"),
+    "RAG_INGEST_QUEUE_PATH": str(_DATA_DIR / "chroma_db" / "ingest_queue.sqlite"),
+    "LLM_CACHE_PATH": str(_DATA_DIR / "llm_cache" / "responses.sqlite"),
+    "EMBEDDING_CACHE_PATH": str(_DATA_DIR / "llm_cache" / "embeddings.sqlite"),
+    "OUTPUT_DIR": str(_DATA_DIR / "output_projects"),
+    "LLM_WARMUP_ON_STARTUP": "false",
+    "RAG_INGEST_BACKGROUND": "false",
+})
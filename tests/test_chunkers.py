@@ -0,0 +1,191 @@
+# tests/test_chunkers.py
+"""
+Chunker świadomy składni: każda linia pliku trafia do jakiegoś chunka,
+funkcje mieszczące się w max_chars nie są cięte, symbole bez duplikatów.
+"""
+
+import ast
+from typing import List, Tuple
+
+import pytest
+
+from utils.chunkers import chunk_file
+
+PYTHON = '''"""Gra w węża."""
+
+import random
+
+WIDTH = 20
+
+
+def spawn_food(snake):
+    """Losuje pole poza wężem."""
+    while True:
+        food = (random.randrange(WIDTH), random.randrange(WIDTH))
+        if food not in snake:
+            return food
+
+
+class Snake:
+    """Wąż: lista pól od głowy."""
+    
+    def __init__(self):
+        self.body = [(5, 5), (4, 5), (3, 5)]
+        self.direction = (1, 0)
+    
+    def turn(self, direction):
+        if (direction[0] + self.direction[0], direction[1] + self.direction[1]) != (0, 0):
+            self.direction = direction
+    
+    def move(self, grow=False):
+        head = self.body[0]
+        new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
+        self.body.insert(0, new_head)
+        if not grow:
+            self.body.pop()
+    
+    # Kolizja ze sobą lub ścianą
+    @property
+    def dead(self):
+        head = self.body[0]
+        return head in self.body[1:] or not (0 <= head[0] < WIDTH and 0 <= head[1] < WIDTH)
+
+
+def score_table(scores):
+    rows = []
+''' + "".join(f"    rows.append('gracz {i}: ' + str(scores.get({i}, 0)))\n" for i in range(40)) + '''    return rows
+
+
+if __name__ == "__main__":
+    print(spawn_food(Snake().body))
+'''
+
+JAVASCRIPT = '''// Licznik punktów
+const board = document.getElementById("board");
+let score = 0;
+
+function addPoint(points) {
+  score += points;
+  board.textContent = String(score);
+}
+
+async function loadScores(url) {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error("HTTP " + response.status);
+  }
+  return response.json();
+}
+
+class Timer {
+  constructor(seconds) {
+    this.seconds = seconds;
+  }
+  
+  tick() {
+    this.seconds -= 1;
+    return this.seconds <= 0;
+  }
+}
+
+function reset() {
+  score = 0;
+  board.textContent = "0";
+}
+'''
+
+CSS = '''/* Plansza */
+.board {
+  display: grid;
+  grid-template-columns: repeat(20, 1fr);
+}
+
+.cell {
+  width: 16px;
+  height: 16px;
+}
+
+@media (max-width: 600px) {
+  .board {
+    grid-template-columns: repeat(10, 1fr);
+  }
+  .cell {
+    width: 8px;
+  }
+  .board {
+    gap: 0;
+  }
+}
+
+.btn:hover {
+  color: red;
+}
+'''
+
+
+def _python_blocks(content: str) -> List[Tuple[int, int]]:
+    """Zakresy linii (z dekoratorami) wszystkich funkcji i klas."""
+    return [
+        (min([node.lineno] + [d.lineno for d in node.decorator_list]), node.end_lineno)
+        for node in ast.walk(ast.parse(content))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    ]
+
+
+def _braced_blocks(content: str) -> List[Tuple[int, int]]:
+    """Zakresy bloków najwyższego poziomu: od linii otwierającej '{' do '}' w kolumnie 0."""
+    blocks = []
+    start = None
+    for number, line in enumerate(content.splitlines(), start=1):
+        if start is None and line.rstrip().endswith("{") and not line[0].isspace():
+            start = number
+        elif start is not None and line.startswith("}"):
+            blocks.append((start, number))
+            start = None
+    return blocks
+
+
+FILES = [
+    ("snake.py", PYTHON, _python_blocks),
+    ("score.js", JAVASCRIPT, _braced_blocks),
+    ("style.css", CSS, _braced_blocks),
+]
+
+
+def _size(content: str, start: int, end: int) -> int:
+    return sum(len(line) for line in content.splitlines(keepends=True)[start - 1:end])
+
+
+@pytest.mark.parametrize("max_chars", [120, 300, 800, 5000])
+@pytest.mark.parametrize("filename,content,blocks", FILES)
+def test_every_line_is_covered(filename, content, blocks, max_chars):
+    chunks = chunk_file(filename, content, max_chars=max_chars, overlap=50)
+    
+    for number, line in enumerate(content.splitlines(), start=1):
+        if line.strip():
+            assert any(
+                chunk.start_line <= number <= chunk.end_line and line in chunk.text for chunk in chunks
+            ), f"linia {number} poza chunkami: {line!r}"
+
+
+@pytest.mark.parametrize("max_chars", [120, 300, 800, 5000])
+@pytest.mark.parametrize("filename,content,blocks", FILES)
+def test_blocks_that_fit_are_not_split(filename, content, blocks, max_chars):
+    chunks = chunk_file(filename, content, max_chars=max_chars, overlap=50)
+    
+    fitting = [(start, end) for start, end in blocks(content) if _size(content, start, end) <= max_chars]
+    assert fitting
+    for start, end in fitting:
+        assert any(chunk.start_line <= start and end <= chunk.end_line for chunk in chunks), (
+            f"blok {start}-{end} pocięty przy max_chars={max_chars}"
+        )
+
+
+def test_symbols_are_unique_and_in_file_order():
+    chunks = chunk_file("style.css", CSS, max_chars=5000)
+    
+    assert len(chunks) == 1
+    assert chunks[0].symbols == [".board", ".cell", "@media (max-width: 600px)", ".btn:hover"]
+    
+    javascript = "var total = 0;\nif (window.debug) {\n  total = 1;\n}\nvar total = 2;\n"
+    assert chunk_file("app.js", javascript)[0].symbols == ["total"]
@@ -0,0 +1,40 @@
+# tests/test_code_checks.py
+"""Checkery statyczne i auto-reject QA."""
+
+from collections import OrderedDict
+
+from agents.qa import QAAgent
+from services.code_checker import code_checker
+from utils import code_checks
+from utils.code_checks import SEVERITY_ERROR, run_checks
+
+
+def _crashing_checker(filename, content):
+    raise RuntimeError("checker bug")
+
+
+def test_crashing_checker_does_not_reject_valid_code(monkeypatch):
+    monkeypatch.setitem(code_checks._REGISTRY, ".py", _crashing_checker)
+    monkeypatch.setattr(code_checker, "_cache", OrderedDict())
+    
+    assert run_checks("main.py", "print('ok')\n") == []
+    assert QAAgent()._static_check({"main.py": "print('ok')\n"}, iteration=0) is None
+
+
+def test_syntax_error_is_still_rejected(monkeypatch):
+    monkeypatch.setattr(code_checker, "_cache", OrderedDict())
+    
+    diagnostics = run_checks("main.py", "def broken(:\n")
+    assert [d.severity for d in diagnostics] == [SEVERITY_ERROR]
+    
+    rejection = QAAgent()._static_check({"main.py": "def broken(:\n"}, iteration=0)
+    assert rejection["qa_status"] == "REJECTED"
+    assert "main.py:1" in rejection["qa_feedback"]
+
+
+def test_css_escapes_outside_strings_are_not_rejected():
+    css = '.w-1\\/2 {\n  width: 50%;\n}\n.quote\\"d {\n  color: red;\n}\n.brace\\{ {\n  margin: 0;\n}\n'
+    
+    assert code_checks.check_css("style.css", css) == []
+    assert code_checks.top_level_block_ends(css, javascript=False) == [3, 6, 9]
+    assert [d.line for d in code_checks.check_css("style.css", ".ok\\\"d {\n  color: red;\n")] == [1]
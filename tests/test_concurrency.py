@@ -0,0 +1,163 @@
+# tests/test_concurrency.py
+"""
+Wiele sesji w jednym procesie: async graf nie może blokować event loopa,
+więc N równoległych przebiegów trwa mniej więcej tyle co jeden.
+Model to stub z asyncio.sleep zamiast Ollamy.
+"""
+
+import asyncio
+import re
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, ClassVar, Dict, List, Optional, Tuple, Union
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+import app
+from agents import architect, developer, product_owner, qa
+from config import settings
+from core.state import create_initial_state
+from services import llm_service as llm_module
+from services.file_service import FileService, file_service
+from services.vector_store_service import vector_store_service
+
+SESSIONS = 5
+DELAY = 0.2
+
+
+class StubChatModel(BaseChatModel):
+    """Zamiennik ChatOllama: odpowiedź wg promptu systemowego po DELAY sekundach."""
+    
+    # Prompt systemowy agenta -> odpowiedź (tekst lub funkcja wiadomości)
+    replies: ClassVar[Dict[str, Union[str, Callable[[List[BaseMessage]], str]]]] = {}
+    
+    model: str = "stub"
+    base_url: str = ""
+    temperature: Optional[float] = None
+    num_ctx: Optional[int] = None
+    num_predict: Optional[int] = None
+    repeat_penalty: Optional[float] = None
+    keep_alive: Any = None
+    client_kwargs: Dict[str, Any] = {}
+    
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+    
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        reply = self.replies.get(messages[0].content, "APPROVED")
+        return reply(messages) if callable(reply) else reply
+    
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        raise AssertionError("Synchroniczne wywołanie modelu w async grafie")
+    
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(DELAY)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+    
+    async def _astream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(DELAY)
+        for line in self._reply(messages).splitlines(keepends=True):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=line))
+
+
+@pytest.fixture
+def stub_llm(monkeypatch, tmp_path):
+    """Wszystkie agenty na StubChatModel, bez RAG, cache i sandboxa."""
+    StubChatModel.replies = {
+        product_owner._agent.system_prompt: "Gra w zgadywanie liczb w Pythonie.",
+        architect._agent.system_prompt: 'Jeden plik.\n```json\n["main.py"]\n```',
+        developer._agent.system_prompt: "--- main.py ---\n```python\nprint('ok')\n```\n",
+        qa._agent.system_prompt: "APPROVED",
+    }
+    monkeypatch.setattr(llm_module, "ChatOllama", StubChatModel)
+    monkeypatch.setattr(llm_module.llm_service, "_models_cache", {})
+    # Ollama z OLLAMA_NUM_PARALLEL - limit schedulera nie jest tu testowany
+    monkeypatch.setattr(llm_module.llm_service, "scheduler", llm_module.LLMScheduler(SESSIONS, 100))
+    for agent_module in (product_owner, architect, developer, qa):
+        monkeypatch.setattr(agent_module._agent, "_llm", None)
+    
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "sandbox_enabled", False)
+    monkeypatch.setattr(settings, "developer_parallel_files", False)
+    monkeypatch.setattr(settings, "qa_review_mode", "single")
+    monkeypatch.setattr(vector_store_service, "search_similar", lambda *args, **kwargs: [])
+    monkeypatch.setattr(file_service, "output_dir", tmp_path)
+
+
+async def _run_sessions(
+    count: int,
+    output_dirs: Optional[List[Path]] = None
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Przebiegi grafu i najdłuższa przerwa w pracy event loopa (s)."""
+    graph = app.build_graph()
+    lag = 0.0
+    
+    async def session(i: int) -> Dict[str, Any]:
+        output_dir = ""
+        if output_dirs:
+            # Jak app.main: każda sesja czyści tylko swój katalog
+            FileService(output_dirs[i]).clear_output()
+            output_dir = str(output_dirs[i])
+        return await graph.ainvoke(create_initial_state(f"Zgadywanie liczb #{i}", output_dir=output_dir))
+    
+    async def heartbeat() -> None:
+        nonlocal lag
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - before - 0.01)
+    
+    ticker = asyncio.create_task(heartbeat())
+    try:
+        results = await asyncio.gather(*(session(i) for i in range(count)))
+    finally:
+        ticker.cancel()
+    return results, lag
+
+
+def test_sessions_run_in_parallel(stub_llm):
+    started = time.perf_counter()
+    (single,), _ = asyncio.run(_run_sessions(1))
+    one_session = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    results, lag = asyncio.run(_run_sessions(SESSIONS))
+    all_sessions = time.perf_counter() - started
+    
+    assert single["qa_status"] == "APPROVED"
+    assert all(result["qa_status"] == "APPROVED" for result in results)
+    assert all(result["generated_code"] == {"main.py": "print('ok')"} for result in results)
+    # 4 wywołania modelu na sesję: sekwencyjnie ~SESSIONS razy dłużej
+    assert one_session >= 4 * DELAY
+    assert all_sessions < 2 * one_session
+    # Sesje nie blokują się nawzajem na event loopie
+    assert lag < DELAY
+
+
+def _session_tag(messages: List[BaseMessage]) -> str:
+    return re.search(r"#\d+", messages[-1].content).group(0)
+
+
+def test_sessions_write_to_own_directories(stub_llm, tmp_path):
+    StubChatModel.replies[product_owner._agent.system_prompt] = (
+        lambda messages: f"Gra w zgadywanie liczb {_session_tag(messages)}."
+    )
+    StubChatModel.replies[developer._agent.system_prompt] = (
+        lambda messages: f"--- main.py ---\n```python\nprint('{_session_tag(messages)}')\n```\n"
+    )
+    output_dirs = [tmp_path / f"session{i}" for i in range(SESSIONS)]
+    
+    results, _ = asyncio.run(_run_sessions(SESSIONS, output_dirs))
+    
+    for i, (result, output_dir) in enumerate(zip(results, output_dirs)):
+        assert result["generated_code"] == {"main.py": f"print('#{i}')"}
+        assert [path.name for path in output_dir.iterdir()] == ["main.py"]
+        assert (output_dir / "main.py").read_text(encoding="utf-8") == f"print('#{i}')"
+    # Nic nie trafia do wspólnego katalogu
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"session{i}" for i in range(SESSIONS)]
@@ -0,0 +1,38 @@
+# tests/test_developer.py
+"""Streaming Developera: plik z błędem krytycznym nie jest publikowany."""
+
+import asyncio
+
+from agents.developer import DeveloperAgent
+from config import settings
+from services.file_service import FileService
+
+RESPONSE = (
+    "--- main.py ---\n```python\nprint('ok')\n```\n"
+    "--- broken.py ---\n```python\ndef broken(:\n```\n"
+    "--- later.py ---\n```python\nprint('later')\n```\n"
+)
+
+
+def test_fatal_file_is_not_saved_or_emitted(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "developer_abort_on_fatal", True)
+    agent = DeveloperAgent()
+    
+    async def astream(*args, **kwargs):
+        for line in RESPONSE.splitlines(keepends=True):
+            yield line
+    
+    monkeypatch.setattr(agent, "astream", astream)
+    emitted = []
+    
+    result = asyncio.run(agent._astream_attempt(
+        [], lambda filename, content: emitted.append(filename), {},
+        ["main.py", "broken.py", "later.py"], None, None, None, FileService(tmp_path)
+    ))
+    
+    assert result.aborted_on == "broken.py"
+    assert emitted == ["main.py"]
+    assert list(result.save_results) == ["main.py"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["main.py"]
+    # Treść zostaje w stanie - iteracja fix poprawia ją na podstawie diagnostyk
+    assert "broken.py" in result.generated_code
@@ -0,0 +1,41 @@
+# tests/test_embedding_cache.py
+"""Cache embeddingów: rozmiar śledzony przyrostowo (LRUTable) i eviction LRU."""
+
+import sqlite3
+
+from services.embedding_cache import EmbeddingCache
+
+# float32
+VECTOR_BYTES = 4 * 4
+
+
+def _summed_size(cache: EmbeddingCache) -> int:
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+
+def test_tracked_size_matches_table(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", max_size_mb=1.0)
+    
+    cache.put_many("m", {"a": [1.0] * 4, "b": [2.0] * 4})
+    cache.put_many("m", {"a": [3.0] * 8})
+    
+    assert cache.get_stats()["size_bytes"] == _summed_size(cache) == 3 * VECTOR_BYTES
+    assert cache.get_many("m", ["a"]) == {"a": [3.0] * 8}
+    
+    cache.clear()
+    assert cache.get_stats()["size_bytes"] == 0
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", max_size_mb=2 * VECTOR_BYTES / (1024 * 1024))
+    
+    cache.put_many("m", {"old": [1.0] * 4})
+    cache.put_many("m", {"used": [2.0] * 4})
+    cache.get_many("m", ["used"])
+    cache.put_many("m", {"new": [3.0] * 4})
+    
+    assert cache.get_many("m", ["old", "used", "new"]).keys() == {"used", "new"}
+    stats = cache.get_stats()
+    assert stats["size_bytes"] == _summed_size(cache) == 2 * VECTOR_BYTES
+    assert stats["evictions"] == 1
@@ -0,0 +1,148 @@
+# tests/test_endpoint_pool.py
+"""
+Pula endpointów przez prawdziwe wywołania ChatOllama do lokalnych
+serwerów HTTP udających Ollamę: routing least-loaded, wyłączenie
+zawieszonego endpointu i powrót po eject_seconds.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from config import settings
+from services.endpoint_pool import EndpointPool
+from services.llm_service import LLMService
+
+TIMEOUT = 0.5
+EJECT_SECONDS = 1.0
+
+
+class StubOllama:
+    """Serwer /api/chat odpowiadający po delay sekundach (zmienialnym w trakcie testu)."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = 0
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests += 1
+                time.sleep(stub.delay)
+                body = json.dumps({
+                    "model": "stub",
+                    "created_at": "2026-01-01T00:00:00Z",
+                    "message": {"role": "assistant", "content": "ok"},
+                    "done": True,
+                    "done_reason": "stop",
+                }).encode() + b"\n"
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    # Klient zerwał połączenie po timeoucie
+                    pass
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama() for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def service(monkeypatch, stubs):
+    """LLMService z pulą trzech lokalnych serwerów, bez cache i guarda."""
+    monkeypatch.setattr(settings, "ollama_base_urls", [stub.url for stub in stubs])
+    monkeypatch.setattr(settings, "ollama_timeout", TIMEOUT)
+    monkeypatch.setattr(settings, "ollama_eject_seconds", EJECT_SECONDS)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_guard_enabled", False)
+    return LLMService()
+
+
+def _call(service: LLMService) -> str:
+    return service.invoke(service.get_chat_model("stub"), [HumanMessage(content="hi")]).content
+
+
+def test_least_loaded_routing(service, stubs):
+    for stub in stubs:
+        stub.delay = 0.2
+    
+    # Trzy równoległe żądania - każde na innym endpoincie
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert list(executor.map(lambda _: _call(service), range(3))) == ["ok"] * 3
+    
+    assert [stub.requests for stub in stubs] == [1, 1, 1]
+    stats = service.get_endpoint_stats()
+    assert all(ep["successes"] == 1 and ep["in_flight"] == 0 for ep in stats)
+
+
+def test_stalled_endpoint_is_ejected_and_readmitted(service, stubs):
+    stalled = stubs[0]
+    stalled.delay = 5 * TIMEOUT
+    
+    # Pierwsze żądanie trafia na pierwszy endpoint i kończy się timeoutem
+    with pytest.raises(Exception):
+        _call(service)
+    
+    stats = service.get_endpoint_stats()
+    assert stats[0]["healthy"] is False and stats[0]["failures"] == 1
+    
+    # Wyłączony endpoint nie dostaje ruchu
+    for _ in range(4):
+        assert _call(service) == "ok"
+    assert stalled.requests == 1
+    assert stubs[1].requests + stubs[2].requests == 4
+    
+    # Po eject_seconds wraca do puli
+    stalled.delay = 0.0
+    time.sleep(EJECT_SECONDS)
+    assert service.get_endpoint_stats()[0]["healthy"] is True
+    assert _call(service) == "ok"
+    assert stalled.requests == 2
+
+
+def test_avg_latency_ignores_in_flight_requests():
+    pool = EndpointPool(["http://a", "http://b"])
+    first, second = pool.endpoints
+    
+    pool.release(pool.acquire(), 1.0)
+    pool.release(pool.acquire(), 1.0)
+    assert first.avg_latency == second.avg_latency == 1.0
+    
+    # Trwające żądanie nie zaniża średniej
+    pending = pool.acquire()
+    assert pending.avg_latency == 1.0
+    pool.release(pending, 3.0)
+    assert pending.avg_latency == 2.0
+    
+    # Anulowanie nie jest ani sukcesem, ani błędem
+    cancelled = pool.acquire()
+    before = (cancelled.avg_latency, cancelled.successes)
+    pool.release(cancelled, 10.0, cancelled=True)
+    assert (cancelled.avg_latency, cancelled.successes) == before
+    assert cancelled.failures == 0 and cancelled.in_flight == 0
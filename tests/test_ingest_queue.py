@@ -0,0 +1,108 @@
+# tests/test_ingest_queue.py
+"""
+Kolejka ingestii: flush, przywracanie przerwanych zadań po restarcie,
+zastępowanie oczekujących zadań projektu i ponowienia aż do failed.
+"""
+
+import sqlite3
+
+import pytest
+
+from services.ingest_queue import STATUS_FAILED, STATUS_PENDING, IngestQueue
+
+
+class RecordingHandler:
+    """Handler zapisujący wywołania; pierwsze `failures` wywołań rzuca wyjątek."""
+    
+    def __init__(self, failures: int = 0):
+        self.calls = []
+        self.failures = failures
+    
+    def __call__(self, project_name, code_dict):
+        self.calls.append((project_name, code_dict))
+        if len(self.calls) <= self.failures:
+            raise ConnectionError("Ollama niedostępna")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "ingest_queue.sqlite"
+
+
+def _statuses(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT project, status, attempts FROM jobs ORDER BY id").fetchall()
+
+
+def test_flush_processes_in_order(db_path):
+    handler = RecordingHandler()
+    queue = IngestQueue(db_path, handler)
+    queue.enqueue("snake", {"main.py": "print(1)"})
+    queue.enqueue("tetris", {"main.py": "print(2)"})
+    
+    assert queue.flush(timeout=5)
+    assert handler.calls == [("snake", {"main.py": "print(1)"}), ("tetris", {"main.py": "print(2)"})]
+    assert queue.depth() == 0
+    assert queue.get_stats()["processed"] == 2
+
+
+def test_flush_waits_for_worker(db_path):
+    handler = RecordingHandler()
+    queue = IngestQueue(db_path, handler)
+    queue.start()
+    try:
+        queue.enqueue("snake", {"main.py": "print(1)"})
+        assert queue.flush(timeout=5)
+    finally:
+        queue.stop(timeout=5)
+    
+    assert handler.calls == [("snake", {"main.py": "print(1)"})]
+
+
+def test_running_job_is_restored_after_restart(db_path):
+    crashed = IngestQueue(db_path, RecordingHandler())
+    crashed.enqueue("snake", {"main.py": "print(1)"})
+    # Proces padł w trakcie zadania
+    assert crashed._claim()["project"] == "snake"
+    
+    handler = RecordingHandler()
+    queue = IngestQueue(db_path, handler)
+    assert _statuses(db_path) == [("snake", STATUS_PENDING, 0)]
+    assert queue.flush(timeout=5)
+    assert handler.calls == [("snake", {"main.py": "print(1)"})]
+
+
+def test_enqueue_supersedes_pending_job(db_path):
+    handler = RecordingHandler()
+    queue = IngestQueue(db_path, handler)
+    queue.enqueue("snake", {"main.py": "v1"})
+    queue.enqueue("tetris", {"main.py": "t1"})
+    queue.enqueue("snake", {"main.py": "v2"})
+    
+    assert queue.depth() == 2
+    assert queue.flush(timeout=5)
+    assert handler.calls == [("tetris", {"main.py": "t1"}), ("snake", {"main.py": "v2"})]
+
+
+def test_failing_job_is_retried_then_failed(db_path):
+    handler = RecordingHandler(failures=10)
+    queue = IngestQueue(db_path, handler, max_attempts=3, retry_delay=0.01)
+    queue.enqueue("snake", {"main.py": "print(1)"})
+    
+    # Zadanie, które ostatecznie zawiodło, nie blokuje flush
+    assert queue.flush(timeout=5)
+    assert len(handler.calls) == 3
+    assert _statuses(db_path) == [("snake", STATUS_FAILED, 3)]
+    stats = queue.get_stats()
+    assert (stats["retries"], stats["failed"], stats["failed_jobs"], stats["depth"]) == (2, 1, 1, 0)
+
+
+def test_retry_succeeds_after_transient_failure(db_path):
+    handler = RecordingHandler(failures=1)
+    queue = IngestQueue(db_path, handler, max_attempts=3, retry_delay=0.01)
+    queue.enqueue("snake", {"main.py": "print(1)"})
+    
+    assert queue.flush(timeout=5)
+    assert len(handler.calls) == 2
+    assert _statuses(db_path) == []
+    assert queue.get_stats()["processed"] == 1
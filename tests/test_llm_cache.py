@@ -0,0 +1,71 @@
+# tests/test_llm_cache.py
+"""Cache odpowiedzi LLM: rozmiar śledzony przyrostowo, eviction LRU, async poza event loopem."""
+
+import asyncio
+import sqlite3
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config import settings
+from services.llm_cache import LLMResponseCache
+from services.llm_service import llm_service
+
+
+def _summed_size(cache: LLMResponseCache) -> int:
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def test_tracked_size_matches_table(tmp_path):
+    cache = LLMResponseCache(tmp_path / "responses.sqlite", max_size_mb=1.0)
+    
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 200)
+    cache.put("a", "z" * 50)
+    
+    assert cache.get_stats()["size_bytes"] == _summed_size(cache)
+    assert cache.get("a")[0] == "z" * 50
+    
+    cache.clear()
+    assert cache.get_stats()["size_bytes"] == 0
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = LLMResponseCache(tmp_path / "responses.sqlite", max_size_mb=3000 / (1024 * 1024))
+    
+    cache.put("old", "x" * 1000)
+    cache.put("used", "y" * 1000)
+    cache.get("used")
+    cache.put("new", "z" * 1000)
+    cache.put("newest", "w" * 500)
+    
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
+    stats = cache.get_stats()
+    assert stats["size_bytes"] == _summed_size(cache) <= cache.max_size_bytes
+    assert stats["evictions"] == 1
+
+
+def test_existing_database_size_is_backfilled(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    LLMResponseCache(path).put("a", "x" * 100)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE cache_size")
+    
+    assert LLMResponseCache(path).get_stats()["size_bytes"] == _summed_size(LLMResponseCache(path))
+
+
+def test_async_lookup_runs_off_event_loop(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    threads = []
+    
+    def lookup(model, messages, use_cache):
+        threads.append(threading.current_thread())
+        return AIMessage(content="cached")
+    
+    monkeypatch.setattr(llm_service, "_cache_lookup", lookup)
+    cached = asyncio.run(llm_service._acache_lookup(None, [HumanMessage(content="hi")], True))
+    
+    assert cached.content == "cached"
+    assert threads and threads[0] is not threading.main_thread()
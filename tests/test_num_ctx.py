@@ -0,0 +1,127 @@
+# tests/test_num_ctx.py
+"""
+Dobór num_ctx per wywołanie: prompt + odpowiedź zawsze mieszczą się
+w kontekście, a ping keep-alive nie przeładowuje modelu z innym num_ctx.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents import developer
+from config import settings
+from services.llm_service import LLMService
+from utils.token_budget import SECTION_LOW, SECTION_REQUIRED, PromptSection, estimate_tokens
+
+
+class RecordingOllama:
+    """Serwer /api/chat i /api/generate zapisujący num_ctx każdego żądania."""
+    
+    def __init__(self):
+        self.num_ctx = []
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                stub.num_ctx.append((self.path, (request.get("options") or {}).get("num_ctx")))
+                reply = {"model": "stub", "created_at": "2026-01-01T00:00:00Z", "done": True, "done_reason": "stop"}
+                if self.path == "/api/chat":
+                    reply["message"] = {"role": "assistant", "content": "ok"}
+                else:
+                    reply["response"] = ""
+                body = json.dumps(reply).encode() + b"\n"
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "llm_dynamic_num_ctx", True)
+    monkeypatch.setattr(settings, "llm_num_ctx", 8192)
+    monkeypatch.setattr(settings, "llm_num_predict", 8192)
+    monkeypatch.setattr(settings, "llm_num_ctx_buckets", [2048, 4096, 8192, 16384])
+    return LLMService()
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    stub = RecordingOllama()
+    monkeypatch.setattr(settings, "ollama_base_urls", [stub.url])
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_guard_enabled", False)
+    yield stub
+    stub.close()
+
+
+def _prompt(tokens: int) -> list:
+    return [SystemMessage(content="Jesteś Architektem."), HumanMessage(content="x" * (3 * tokens))]
+
+
+@pytest.mark.parametrize("prompt_tokens", [100, 900, 1900, 3000, 7000])
+def test_answer_fits_next_to_prompt(service, prompt_tokens):
+    messages = _prompt(prompt_tokens)
+    model = service._sized(service.get_chat_model("stub"), messages, expected_output_tokens=1024)
+    
+    used = sum(estimate_tokens(m.content) for m in messages)
+    assert used + model.num_predict <= model.num_ctx
+    assert model.num_predict > 0
+
+
+def test_small_prompt_keeps_small_bucket(service):
+    model = service._sized(service.get_chat_model("stub"), _prompt(900), expected_output_tokens=1024)
+    
+    assert model.num_ctx == 2048
+    assert model.num_predict == 1024
+
+
+def test_developer_prompt_leaves_room_for_its_output(service, monkeypatch):
+    monkeypatch.setattr(settings, "llm_dynamic_num_ctx", False)
+    agent = developer._agent
+    messages = agent.build_messages([
+        PromptSection("requirements", "wymaganie " * 1000, SECTION_REQUIRED),
+        PromptSection("rag_context", "def helper(): pass\n" * 3000, SECTION_LOW),
+    ])
+    model = service._sized(service.get_chat_model("stub"), messages, agent.expected_output_tokens)
+    
+    used = sum(estimate_tokens(m.content) for m in messages)
+    assert used <= settings.llm_num_ctx // 2
+    assert used + model.num_predict <= model.num_ctx
+    assert model.num_predict >= settings.llm_num_ctx // 2
+
+
+def test_keep_alive_ping_uses_last_bucket(ollama, service):
+    # Przed pierwszym wywołaniem - najmniejszy kubełek
+    service._ping_model(ollama.url, "stub", "chat", "5m")
+    
+    service.invoke(service.get_chat_model("stub"), _prompt(100), expected_output_tokens=64)
+    service._ping_model(ollama.url, "stub", "chat", "5m")
+    
+    service.invoke(service.get_chat_model("stub"), _prompt(3000), expected_output_tokens=1024)
+    service._ping_model(ollama.url, "stub", "chat", "5m")
+    
+    assert ollama.num_ctx == [
+        ("/api/generate", 2048),
+        ("/api/chat", 2048),
+        ("/api/generate", 2048),
+        ("/api/chat", 4096),
+        ("/api/generate", 4096),
+    ]
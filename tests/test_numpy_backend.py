@@ -0,0 +1,166 @@
+# tests/test_numpy_backend.py
+"""
+Backend NumPy: upsert, usuwanie, odtwarzanie po przerwanym zapisie,
+kompaktowanie i wyszukiwanie na kodach int8.
+"""
+
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.quantization import MatrixEmbeddings
+from services.numpy_backend import NumpyBackend
+
+
+class LiteralEmbeddings(Embeddings):
+    """Treść chunka to jego wektor, np. "1,0,0"."""
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return [float(value) for value in text.split(",")]
+
+
+def _open(path) -> NumpyBackend:
+    return NumpyBackend(path, LiteralEmbeddings())
+
+
+def _add(backend: NumpyBackend, **chunks: str) -> None:
+    backend.add(list(chunks), list(chunks.values()), [{"name": name} for name in chunks])
+
+
+def _nearest(backend: NumpyBackend, vector: List[float]):
+    chunk, distance = backend.search(vector, 1)[0]
+    return chunk.id, chunk.text, distance
+
+
+def test_add_upsert_and_delete(tmp_path):
+    backend = _open(tmp_path)
+    _add(backend, a="1,0,0", b="0,1,0", c="0,0,1")
+    
+    _add(backend, a="0,0,2")
+    backend.delete(["b", "missing"])
+    
+    assert backend.count() == 2
+    assert sorted(chunk.id for chunk in backend.get()) == ["a", "c"]
+    assert _nearest(backend, [0, 0, 2]) == ("a", "0,0,2", 0.0)
+    assert [chunk.id for chunk, _ in backend.search([0, 1, 0], 5)] == ["c", "a"]
+    
+    # Ten sam stan po ponownym otwarciu
+    reopened = _open(tmp_path)
+    assert sorted(chunk.id for chunk in reopened.get()) == ["a", "c"]
+    assert _nearest(reopened, [0, 0, 2]) == ("a", "0,0,2", 0.0)
+
+
+def test_reload_after_partial_metadata_write(tmp_path):
+    backend = _open(tmp_path)
+    _add(backend, a="1,0,0")
+    
+    # Przerwany add: wektor dopisany, linia metadanych urwana
+    with open(backend._vectors_path(backend._generation), "ab") as f:
+        f.write(np.array([9, 9, 9], dtype=np.float32).tobytes())
+    with open(backend._chunks_path(backend._generation), "a", encoding="utf-8") as f:
+        f.write('{"id": "b", "te')
+    
+    reopened = _open(tmp_path)
+    assert [chunk.id for chunk in reopened.get()] == ["a"]
+    _add(reopened, c="0,1,0")
+    assert _nearest(reopened, [0, 1, 0]) == ("c", "0,1,0", 0.0)
+    assert _nearest(_open(tmp_path), [0, 1, 0]) == ("c", "0,1,0", 0.0)
+
+
+@pytest.mark.parametrize("compacted", [False, True])
+def test_orphan_vector_in_empty_index_is_dropped(tmp_path, compacted):
+    backend = _open(tmp_path)
+    _add(backend, old="5,5,5")
+    backend.delete(["old"])
+    if compacted:
+        backend.compact()
+    else:
+        # Pusty indeks: tylko wymiar w index.json
+        backend._vectors_path(backend._generation).unlink()
+        backend._chunks_path(backend._generation).unlink()
+    
+    # Przerwany add na pustym indeksie: wektor bez metadanych
+    with open(backend._vectors_path(backend._generation), "ab") as f:
+        f.write(np.array([99, 99, 99], dtype=np.float32).tobytes())
+    
+    reopened = _open(tmp_path)
+    assert reopened.count() == 0
+    _add(reopened, a="1,0,0")
+    assert _nearest(reopened, [1, 0, 0]) == ("a", "1,0,0", 0.0)
+    assert _nearest(_open(tmp_path), [1, 0, 0]) == ("a", "1,0,0", 0.0)
+
+
+def test_compact_keeps_live_rows(tmp_path):
+    backend = _open(tmp_path)
+    _add(backend, a="1,0,0", b="0,1,0", c="0,0,1")
+    _add(backend, c="0,0,3")
+    backend.delete(["a"])
+    old_generation = backend._generation
+    
+    backend.compact()
+    
+    assert backend.get_stats()["rows"] == 2
+    assert not backend._vectors_path(old_generation).exists()
+    for reopened in (backend, _open(tmp_path)):
+        assert sorted(chunk.id for chunk in reopened.get()) == ["b", "c"]
+        assert _nearest(reopened, [0, 0, 3]) == ("c", "0,0,3", 0.0)
+        assert _nearest(reopened, [0, 1, 0]) == ("b", "0,1,0", 0.0)
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(7).normal(size=(200, 16)).astype(np.float32)
+
+
+def _open_matrix(path, vectors: np.ndarray, quantization: str, metric: str = "l2") -> NumpyBackend:
+    backend = NumpyBackend(path, MatrixEmbeddings(vectors), metric=metric, quantization=quantization)
+    backend.add([f"v{i}" for i in range(len(vectors))], [str(i) for i in range(len(vectors))], [{}] * len(vectors))
+    return backend
+
+
+def _assert_codes_match_matrix(backend: NumpyBackend) -> None:
+    codes, scales = backend._quantize(np.asarray(backend._matrix))
+    np.testing.assert_array_equal(backend._codes, codes)
+    np.testing.assert_array_equal(backend._scales, scales)
+
+
+@pytest.mark.parametrize("metric", ["l2", "cosine"])
+def test_int8_top_k_matches_float32(tmp_path, vectors, metric):
+    exact = _open_matrix(tmp_path / "f32", vectors, "none", metric)
+    quantized = _open_matrix(tmp_path / "int8", vectors, "int8", metric)
+    queries = np.random.default_rng(8).normal(size=(20, 16)).astype(np.float32)
+    
+    for expected, found in zip(exact.search_many(queries.tolist(), 5), quantized.search_many(queries.tolist(), 5)):
+        assert [chunk.id for chunk, _ in found] == [chunk.id for chunk, _ in expected]
+        # Odległości po rescoringu są dokładne, nie z kodów int8
+        np.testing.assert_allclose([d for _, d in found], [d for _, d in expected], rtol=1e-5, atol=1e-5)
+
+
+def test_int8_distances_are_exact(tmp_path, vectors):
+    backend = _open_matrix(tmp_path, vectors, "int8")
+    query = vectors[3] + 0.01
+    
+    for chunk, distance in backend.search(query.tolist(), 10):
+        row = vectors[int(chunk.text)]
+        assert distance == pytest.approx(float(((row - query) ** 2).sum()), rel=1e-4, abs=1e-4)
+
+
+def test_int8_codes_follow_add_and_compact(tmp_path, vectors):
+    backend = _open_matrix(tmp_path, vectors[:150], "int8")
+    backend.embeddings = MatrixEmbeddings(vectors)
+    backend.add([f"v{i}" for i in range(150, 200)], [str(i) for i in range(150, 200)], [{}] * 50)
+    _assert_codes_match_matrix(backend)
+    
+    backend.delete([f"v{i}" for i in range(0, 200, 2)])
+    backend.compact()
+    
+    assert backend.get_stats()["rows"] == 100
+    _assert_codes_match_matrix(backend)
+    reopened = NumpyBackend(tmp_path, MatrixEmbeddings(vectors), quantization="int8")
+    _assert_codes_match_matrix(reopened)
+    assert _nearest(reopened, vectors[51].tolist())[:2] == ("v51", "51")
@@ -0,0 +1,36 @@
+# tests/test_sandbox.py
+"""Sandbox: aplikacja tkinter bez ekranu to ostrzeżenie, wyjątek przy imporcie - błąd."""
+
+import pytest
+
+from services.sandbox_service import STATUS_ERROR, STATUS_OK, STATUS_WARNING, SandboxService
+
+pytest.importorskip("tkinter")
+
+TK_APP = """import tkinter as tk
+
+root = tk.Tk()
+root.title("Kalkulator")
+tk.Label(root, text="0").pack()
+
+if __name__ == "__main__":
+    root.mainloop()
+"""
+
+
+def _statuses(code_dict):
+    results = SandboxService(timeout=20, max_parallel=2).run_project(code_dict)
+    return {result.file: result.status for result in results}
+
+
+def test_tk_app_without_display_is_a_warning():
+    statuses = _statuses({
+        "app.py": TK_APP,
+        "logic.py": "def add(a, b):\n    return a + b\n",
+    })
+    
+    assert statuses == {"app.py": STATUS_WARNING, "logic.py": STATUS_OK}
+
+
+def test_exception_on_import_is_still_an_error():
+    assert _statuses({"main.py": "raise ValueError('zepsute')\n"}) == {"main.py": STATUS_ERROR}
@@ -0,0 +1,44 @@
+# tests/test_stream_guard.py
+"""StreamGuard: duży plik w bloku ``` nie jest degeneracją, urwany po num_predict - jest."""
+
+from config import settings
+from utils.stream_guard import REASON_REPEATED_LINES, REASON_UNTERMINATED_FENCE, StreamGuard
+
+
+def _guard() -> StreamGuard:
+    return StreamGuard(max_fence_tokens=settings.llm_guard_max_fence_tokens)
+
+
+def _large_file(lines: int = 600) -> str:
+    body = "".join(f"def handler_{i}(event):\n    return process(event, {i})\n" for i in range(lines))
+    return "--- main.py ---\n```python\n" + body
+
+
+def test_large_fenced_file_is_not_flagged():
+    guard = _guard()
+    text = _large_file() + "```\n"
+    assert len(text) > 20000
+    
+    for start in range(0, len(text), 50):
+        assert guard.feed(text[start:start + 50]) is None
+    assert guard.finish("stop") is None
+
+
+def test_open_fence_at_num_predict_limit_is_flagged():
+    guard = _guard()
+    
+    assert guard.feed(_large_file(lines=50)) is None
+    assert guard.finish("length") == REASON_UNTERMINATED_FENCE
+
+
+def test_closed_fence_at_num_predict_limit_is_not_flagged():
+    guard = _guard()
+    
+    assert guard.feed(_large_file(lines=50) + "```") is None
+    assert guard.finish("length") is None
+
+
+def test_repeated_lines_are_still_flagged():
+    guard = _guard()
+    
+    assert guard.feed("```python\n" + "x = 1\n" * 40) == REASON_REPEATED_LINES
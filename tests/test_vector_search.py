@@ -0,0 +1,66 @@
+# tests/test_vector_search.py
+"""
+Wyszukiwanie hybrydowe na backendzie NumPy z embeddingami offline:
+próg bezwzględny dla niepowiązanych chunków i brak cache dla wyników
+zdegradowanych do samego BM25.
+"""
+
+import pytest
+
+from benchmarks.retrieval import HashingEmbeddings
+from config import settings
+from services.vector_store_service import VectorStoreService
+
+PROJECT = {
+    "snake.py": (
+        "def move_snake(snake, direction):\n"
+        "    head = snake[0]\n"
+        "    return [(head[0] + direction[0], head[1] + direction[1])] + snake[:-1]\n"
+    ),
+    "score.py": (
+        "def save_highscore(path, score):\n"
+        "    with open(path, 'w') as handle:\n"
+        "        handle.write(str(score))\n"
+    ),
+}
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "vector_backend", "numpy")
+    monkeypatch.setattr(settings, "chroma_db_path", tmp_path)
+    monkeypatch.setattr(settings, "rag_cache_enabled", True)
+    store = VectorStoreService(embeddings=HashingEmbeddings())
+    store.add_project("snake", PROJECT)
+    return store
+
+
+def test_unrelated_chunks_do_not_pass_hybrid_floor(service):
+    found = service.search_similar("move_snake direction", mode="hybrid")
+    assert [result["filename"] for result in found] == ["snake.py"]
+    
+    assert service.search_similar("quantum lattice chromodynamics tensor", mode="hybrid") == []
+
+
+def test_bm25_fallback_is_not_cached(service, monkeypatch):
+    vector_search = service._vector_search
+    available = False
+    
+    def flaky(query, k):
+        if not available:
+            raise ConnectionError("Ollama niedostępna")
+        return vector_search(query, k)
+    
+    monkeypatch.setattr(service, "_vector_search", flaky)
+    cache_key = ("hybrid:save_highscore", settings.rag_top_k, settings.rag_score_threshold)
+    
+    found = service.search_similar("save_highscore", mode="hybrid")
+    assert [result["filename"] for result in found] == ["score.py"]
+    assert found[0]["score"] is None
+    assert service.retrieval_cache.get_results(*cache_key) is None
+    
+    # Po powrocie embeddingów wynik z wektorami trafia do cache
+    available = True
+    found = service.search_similar("save_highscore", mode="hybrid")
+    assert found[0]["score"] is not None
+    assert service.retrieval_cache.get_results(*cache_key) == found
@@ -0,0 +1,357 @@
+# utils/chunkers.py
+"""
+Chunkowanie kodu dla RAG świadome składni.
+Python dzielony po def/class (ast), JS/CSS po blokach najwyższego
+poziomu, HTML po sekcjach. Małe jednostki są sklejane do limitu
+rozmiaru, za duże - dzielone po liniach (jak dotychczasowy splitter).
+"""
+
+import ast
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.code_checks import top_level_block_ends
+
+LANGUAGE_PYTHON = "python"
+LANGUAGE_JAVASCRIPT = "javascript"
+LANGUAGE_CSS = "css"
+LANGUAGE_HTML = "html"
+LANGUAGE_TEXT = "text"
+
+EXTENSION_LANGUAGES = {
+    ".py": LANGUAGE_PYTHON,
+    ".js": LANGUAGE_JAVASCRIPT,
+    ".mjs": LANGUAGE_JAVASCRIPT,
+    ".cjs": LANGUAGE_JAVASCRIPT,
+    ".css": LANGUAGE_CSS,
+    ".html": LANGUAGE_HTML,
+    ".htm": LANGUAGE_HTML,
+}
+
+JS_SYMBOL = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:async\s+)?"
+    r"(?:function\*?\s+([\w$]+)|class\s+([\w$]+)|(?:const|let|var)\s+([\w$]+))",
+    re.MULTILINE
+)
+CSS_SELECTOR = re.compile(r"^([^\s{}/][^{}]*?)\s*\{", re.MULTILINE)
+HTML_SECTION = re.compile(
+    r"^\s*<(head|body|header|footer|nav|main|section|article|aside|form|table|script|style)\b([^>]*)>",
+    re.IGNORECASE
+)
+HTML_ID = re.compile(r"""\bid\s*=\s*["']?([\w-]+)""")
+
+# Max długość nazwy symbolu w metadanych (np. długi selektor CSS)
+SYMBOL_MAX_CHARS = 60
+
+
+@dataclass
+class CodeChunk:
+    """
+    Fragment pliku do indeksu RAG.
+    
+    Atrybuty:
+        text: Treść fragmentu
+        start_line: Pierwsza linia (od 1)
+        end_line: Ostatnia linia (włącznie)
+        symbols: Nazwy zdefiniowanych symboli (funkcje, klasy, selektory, sekcje)
+        language: LANGUAGE_*
+    """
+    text: str
+    start_line: int
+    end_line: int
+    symbols: List[str] = field(default_factory=list)
+    language: str = LANGUAGE_TEXT
+
+
+@dataclass
+class _Unit:
+    """Jednostka składniowa: zakres linii, symbole i części składowe (ciało bloku)."""
+    start: int
+    end: int
+    symbols: List[str] = field(default_factory=list)
+    children: List["_Unit"] = field(default_factory=list)
+
+
+def detect_language(filename: str) -> str:
+    """Język pliku po rozszerzeniu (LANGUAGE_TEXT gdy nieznany)."""
+    return EXTENSION_LANGUAGES.get(Path(filename).suffix.lower(), LANGUAGE_TEXT)
+
+
+def split_by_size(content: str, chunk_size: int = 1500, overlap: int = 200) -> List[Tuple[int, int]]:
+    """
+    Dzieli tekst na fragmenty po rozmiarze, tnąc na końcach linii.
+    
+    Args:
+        content: Tekst do podziału
+        chunk_size: Rozmiar fragmentu w znakach
+        overlap: Nakładanie się fragmentów
+    
+    Returns:
+        Lista zakresów (start, end) w znakach
+    """
+    if len(content) <= chunk_size:
+        return [(0, len(content))]
+    
+    # Każdy krok przesuwa się o co najmniej 1/4 chunka
+    overlap = min(overlap, chunk_size // 4)
+    spans = []
+    start = 0
+    
+    while start < len(content):
+        end = start + chunk_size
+        
+        # Szukamy końca linii żeby nie ciąć w środku (w drugiej połowie okna)
+        if end < len(content):
+            newline_pos = content.rfind("\n", start + chunk_size // 2, end)
+            if newline_pos != -1:
+                end = newline_pos + 1
+        else:
+            end = len(content)
+        
+        spans.append((start, end))
+        if end >= len(content):
+            break
+        start = end - overlap
+    
+    return spans
+
+
+# === Python ===
+
+def _python_symbols(node: ast.stmt, prefix: str) -> List[str]:
+    """Nazwy definiowane przez instrukcję (klasa z metodami jako Klasa.metoda)."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return [f"{prefix}{node.name}"]
+    if isinstance(node, ast.ClassDef):
+        name = f"{prefix}{node.name}"
+        methods = [
+            f"{name}.{child.name}" for child in node.body
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        return [name, *methods]
+    return []
+
+
+def _python_node_units(
+    lines: List[str],
+    nodes: List[ast.stmt],
+    start: int,
+    end: int,
+    prefix: str = ""
+) -> List[_Unit]:
+    """
+    Dzieli zakres linii na jednostki zaczynające się od kolejnych instrukcji.
+    Dekoratory i komentarze tuż nad definicją należą do niej.
+    """
+    starts = []
+    previous_end = start - 1
+    for node in nodes:
+        first = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        while first - 1 > max(previous_end, start) and lines[first - 2].lstrip().startswith("#"):
+            first -= 1
+        starts.append(max(first, start))
+        previous_end = node.end_lineno or node.lineno
+    
+    if not starts:
+        return [_Unit(start, end)]
+    
+    # Linie przed pierwszą instrukcją (komentarze, docstring klasy) należą do pierwszej jednostki
+    starts[0] = start
+    units = []
+    
+    for i, node in enumerate(nodes):
+        unit_end = starts[i + 1] - 1 if i + 1 < len(nodes) else end
+        unit = _Unit(starts[i], unit_end, _python_symbols(node, prefix))
+        
+        # Części składowe (użyte tylko gdy całość nie mieści się w chunku):
+        # nagłówek + instrukcje ciała, żeby ciąć na granicach instrukcji
+        body = getattr(node, "body", None)
+        if isinstance(body, list) and body and body[0].lineno > starts[i]:
+            name = getattr(node, "name", None)
+            body_start = body[0].lineno
+            inner_prefix = f"{prefix}{name}." if name else prefix
+            header = _Unit(starts[i], body_start - 1, [f"{prefix}{name}"] if name else [])
+            unit.children = [header] + _python_node_units(lines, body, body_start, unit_end, inner_prefix)
+        
+        units.append(unit)
+    
+    return units
+
+
+def _python_units(content: str, lines: List[str]) -> Optional[List[_Unit]]:
+    """Jednostki modułu Pythona (None gdy kod się nie parsuje)."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    return _python_node_units(lines, tree.body, 1, len(lines))
+
+
+# === JS / CSS / HTML ===
+
+def _units_from_ends(ends: List[int], total: int) -> List[_Unit]:
+    """Jednostki kończące się na podanych liniach (reszta pliku jako ostatnia)."""
+    units = []
+    start = 1
+    for end in ends:
+        if end >= start:
+            units.append(_Unit(start, end))
+            start = end + 1
+    if start <= total:
+        units.append(_Unit(start, total))
+    return units
+
+
+def _javascript_units(content: str, lines: List[str]) -> List[_Unit]:
+    """Jednostki JS: granice po zamknięciu bloków najwyższego poziomu."""
+    units = _units_from_ends(top_level_block_ends(content, javascript=True), len(lines))
+    for unit in units:
+        text = "".join(lines[unit.start - 1:unit.end])
+        # Bez duplikatów (np. ta sama zmienna w kilku gałęziach), w kolejności pliku
+        unit.symbols = list(dict.fromkeys(
+            next(name for name in match if name) for match in JS_SYMBOL.findall(text)
+        ))
+    return units
+
+
+def _css_units(content: str, lines: List[str]) -> List[_Unit]:
+    """Jednostki CSS: reguły najwyższego poziomu (także @media w całości)."""
+    units = _units_from_ends(top_level_block_ends(content, javascript=False), len(lines))
+    for unit in units:
+        text = "".join(lines[unit.start - 1:unit.end])
+        # Ten sam selektor bywa powtórzony (np. w @media) - bez duplikatów, w kolejności pliku
+        unit.symbols = list(dict.fromkeys(
+            " ".join(selector.split())[:SYMBOL_MAX_CHARS] for selector in CSS_SELECTOR.findall(text)
+        ))
+    return units
+
+
+def _html_units(content: str, lines: List[str]) -> List[_Unit]:
+    """Jednostki HTML: od każdej sekcji (head, body, section, script...) do następnej."""
+    starts: List[Tuple[int, str]] = []
+    for number, line in enumerate(lines, start=1):
+        match = HTML_SECTION.match(line)
+        if match:
+            tag = match.group(1).lower()
+            element_id = HTML_ID.search(match.group(2))
+            starts.append((number, f"{tag}#{element_id.group(1)}" if element_id else tag))
+    
+    if not starts or starts[0][0] > 1:
+        starts.insert(0, (1, ""))
+    
+    units = []
+    for i, (start, symbol) in enumerate(starts):
+        end = starts[i + 1][0] - 1 if i + 1 < len(starts) else len(lines)
+        units.append(_Unit(start, end, [symbol] if symbol else []))
+    return units
+
+
+UNIT_SPLITTERS: Dict[str, Callable[[str, List[str]], Optional[List[_Unit]]]] = {
+    LANGUAGE_PYTHON: _python_units,
+    LANGUAGE_JAVASCRIPT: _javascript_units,
+    LANGUAGE_CSS: _css_units,
+    LANGUAGE_HTML: _html_units,
+}
+
+
+# === Sklejanie jednostek w chunki ===
+
+def _split_unit(
+    lines: List[str],
+    unit: _Unit,
+    language: str,
+    max_chars: int,
+    overlap: int
+) -> List[CodeChunk]:
+    """Za duża jednostka bez części składowych - podział po rozmiarze."""
+    text = "".join(lines[unit.start - 1:unit.end])
+    chunks = []
+    for start, end in split_by_size(text, max_chars, overlap):
+        first = unit.start + text.count("\n", 0, start)
+        last = unit.start + text.count("\n", 0, max(end - 1, start))
+        chunks.append(CodeChunk(text[start:end], first, last, list(unit.symbols), language))
+    return chunks
+
+
+def _pack(
+    lines: List[str],
+    units: List[_Unit],
+    language: str,
+    max_chars: int,
+    overlap: int
+) -> List[CodeChunk]:
+    """
+    Skleja kolejne jednostki do max_chars. Za duża klasa jest zastępowana
+    swoimi częściami (sklejanymi dalej z sąsiadami), inne za duże
+    jednostki są dzielone po rozmiarze.
+    """
+    chunks: List[CodeChunk] = []
+    current: List[_Unit] = []
+    size = 0
+    
+    def flush() -> None:
+        nonlocal size
+        if current:
+            text = "".join(lines[current[0].start - 1:current[-1].end])
+            symbols = list(dict.fromkeys(symbol for unit in current for symbol in unit.symbols))
+            chunks.append(CodeChunk(text, current[0].start, current[-1].end, symbols, language))
+            current.clear()
+        size = 0
+    
+    pending = list(reversed(units))
+    while pending:
+        unit = pending.pop()
+        unit_size = sum(len(line) for line in lines[unit.start - 1:unit.end])
+        
+        if unit_size > max_chars:
+            if unit.children:
+                pending.extend(reversed(unit.children))
+            else:
+                flush()
+                chunks.extend(_split_unit(lines, unit, language, max_chars, overlap))
+            continue
+        
+        if current and size + unit_size > max_chars:
+            flush()
+        current.append(unit)
+        size += unit_size
+    
+    flush()
+    return [chunk for chunk in chunks if chunk.text.strip()]
+
+
+def chunk_file(
+    filename: str,
+    content: str,
+    max_chars: int = 1500,
+    overlap: int = 200
+) -> List[CodeChunk]:
+    """
+    Dzieli plik na chunki wzdłuż granic składniowych.
+    
+    Funkcje i klasy nie są cięte w połowie, dopóki mieszczą się w max_chars.
+    Nieznany język lub kod, który się nie parsuje, idzie przez split_by_size.
+    
+    Args:
+        filename: Nazwa pliku (rozszerzenie wybiera język)
+        content: Treść pliku
+        max_chars: Max rozmiar chunka w znakach
+        overlap: Nakładanie się fragmentów przy podziale po rozmiarze
+    
+    Returns:
+        Lista chunków w kolejności pliku (pusta dla pustego pliku)
+    """
+    if not content.strip():
+        return []
+    
+    language = detect_language(filename)
+    lines = content.splitlines(keepends=True)
+    splitter = UNIT_SPLITTERS.get(language)
+    units = splitter(content, lines) if splitter else None
+    
+    if units is None:
+        whole = _Unit(1, len(lines))
+        return _pack(lines, [whole], language, max_chars, overlap)
+    
+    return _pack(lines, units, language, max_chars, overlap)
@@ -0,0 +1,495 @@
+# utils/code_checks.py
+"""
+Rejestr statycznych checkerów kodu (bez zależności zewnętrznych).
+Python przez ast/compile, JS/CSS przez tokenizer świadomy stringów
+i komentarzy, HTML przez html.parser, JSON przez json.
+Każdy checker zwraca diagnostyki z dokładną linią i kolumną.
+"""
+
+import ast
+import json
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+# Błędy przed ostrzeżeniami
+SEVERITY_ORDER = {SEVERITY_ERROR: 0, SEVERITY_WARNING: 1}
+
+BRACKETS = {")": "(", "]": "[", "}": "{"}
+
+
+@dataclass
+class Diagnostic:
+    """
+    Problem znaleziony przez checker.
+    
+    Atrybuty:
+        file: Nazwa pliku
+        line: Linia (od 1)
+        column: Kolumna (od 1)
+        severity: SEVERITY_ERROR lub SEVERITY_WARNING
+        message: Opis problemu
+    """
+    file: str
+    line: int
+    column: int
+    severity: str
+    message: str
+    
+    def format(self) -> str:
+        """Opis w formacie plik:linia:kolumna - komunikat."""
+        return f"{self.file}:{self.line}:{self.column} - {self.message}"
+
+
+Checker = Callable[[str, str], List[Diagnostic]]
+
+_REGISTRY: Dict[str, Checker] = {}
+
+
+def register_checker(*extensions: str) -> Callable[[Checker], Checker]:
+    """
+    Dekorator rejestrujący checker dla rozszerzeń plików.
+    
+    Args:
+        extensions: Rozszerzenia z kropką, np. ".js", ".mjs"
+    """
+    def decorator(checker: Checker) -> Checker:
+        for extension in extensions:
+            _REGISTRY[extension.lower()] = checker
+        return checker
+    return decorator
+
+
+def get_checker(filename: str) -> Optional[Checker]:
+    """Checker dla pliku (po rozszerzeniu) lub None."""
+    dot = filename.rfind(".")
+    return _REGISTRY.get(filename[dot:].lower()) if dot >= 0 else None
+
+
+def run_checks(filename: str, content: str) -> List[Diagnostic]:
+    """
+    Uruchamia checker pasujący do pliku (funkcja top-level - działa w puli procesów).
+    
+    Args:
+        filename: Nazwa pliku
+        content: Zawartość pliku
+    
+    Returns:
+        Lista diagnostyk (pusta gdy OK, brak checkera lub checker się wywrócił)
+    """
+    checker = get_checker(filename)
+    if checker is None:
+        return []
+    
+    try:
+        return checker(filename, content)
+    except Exception as e:
+        # Błąd checkera nie może odrzucić poprawnego kodu - QA odrzuca przy każdej diagnostyce
+        logger.warning(f"Checker dla {filename} nie zadziałał, pomijam plik: {e!r}")
+        return []
+
+
+# === Python ===
+
+@register_checker(".py")
+def check_python(filename: str, content: str) -> List[Diagnostic]:
+    """Składnia (ast) + błędy kompilacji (np. return poza funkcją)."""
+    try:
+        tree = ast.parse(content, filename)
+        compile(tree, filename, "exec")
+    except SyntaxError as e:
+        return [Diagnostic(
+            filename, e.lineno or 1, e.offset or 1, SEVERITY_ERROR,
+            f"Błąd składni Python: {e.msg}"
+        )]
+    
+    return []
+
+
+# === JSON ===
+
+@register_checker(".json")
+def check_json(filename: str, content: str) -> List[Diagnostic]:
+    """Poprawność JSON."""
+    try:
+        json.loads(content)
+    except json.JSONDecodeError as e:
+        return [Diagnostic(filename, e.lineno, e.colno, SEVERITY_ERROR, f"Błąd JSON: {e.msg}")]
+    
+    return []
+
+
+# === Tokenizer C-podobny (JS/CSS) ===
+
+class _Scanner:
+    """Pozycja w tekście z numerem linii i kolumny."""
+    
+    def __init__(self, text: str, line: int = 1, column: int = 1):
+        self.text = text
+        self.pos = 0
+        self.line = line
+        self.column = column
+    
+    def peek(self, offset: int = 0) -> str:
+        index = self.pos + offset
+        return self.text[index] if index < len(self.text) else ""
+    
+    def advance(self, count: int = 1) -> None:
+        for _ in range(count):
+            if self.pos >= len(self.text):
+                return
+            if self.text[self.pos] == "\n":
+                self.line += 1
+                self.column = 1
+            else:
+                self.column += 1
+            self.pos += 1
+    
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self.text)
+
+
+def _skip_block_comment(scanner: _Scanner) -> bool:
+    """Pomija /* ... */ (scanner na '/*'). False gdy komentarz niedomknięty."""
+    scanner.advance(2)
+    while not scanner.done:
+        if scanner.peek() == "*" and scanner.peek(1) == "/":
+            scanner.advance(2)
+            return True
+        scanner.advance()
+    return False
+
+
+def _skip_string(scanner: _Scanner, quote: str) -> bool:
+    """Pomija string '...' lub "..." (scanner na cudzysłowie). False gdy niedomknięty."""
+    scanner.advance()
+    while not scanner.done:
+        char = scanner.peek()
+        if char == "\\":
+            scanner.advance(2)
+            continue
+        if char == "\n":
+            return False
+        scanner.advance()
+        if char == quote:
+            return True
+    return False
+
+
+def _skip_regex(scanner: _Scanner) -> bool:
+    """
+    Próbuje pominąć literał regex (scanner na '/').
+    False (pozycja bez zmian) gdy to nie regex - np. dzielenie.
+    """
+    saved = (scanner.pos, scanner.line, scanner.column)
+    scanner.advance()
+    in_class = False
+    
+    while not scanner.done:
+        char = scanner.peek()
+        if char == "\n":
+            break
+        if char == "\\":
+            scanner.advance(2)
+            continue
+        scanner.advance()
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            while scanner.peek().isalpha():
+                scanner.advance()
+            return True
+    
+    scanner.pos, scanner.line, scanner.column = saved
+    return False
+
+
+def _scan_brackets(
+    filename: str,
+    text: str,
+    javascript: bool,
+    line: int = 1,
+    column: int = 1,
+    on_top_level_close: Optional[Callable[[str, int, int], None]] = None
+) -> List[Diagnostic]:
+    """
+    Sprawdza balans nawiasów z pominięciem stringów, komentarzy
+    (w JS: template literals, regexów; w CSS: znaków po \\). Raportuje też `var` w JS.
+    
+    on_top_level_close dostaje (nawias, linia otwarcia, linia zamknięcia)
+    każdego bloku najwyższego poziomu (używane przez chunker RAG).
+    """
+    scanner = _Scanner(text, line, column)
+    diagnostics: List[Diagnostic] = []
+    # (nawias, linia, kolumna); "`" oznacza powrót do template literal po ${...}
+    stack: List[Tuple[str, int, int]] = []
+    previous = ""  # ostatni znaczący znak kodu (do odróżnienia regex od dzielenia)
+    
+    def error(message: str, at_line: int, at_column: int) -> None:
+        diagnostics.append(Diagnostic(filename, at_line, at_column, SEVERITY_ERROR, message))
+    
+    def scan_template(open_line: int, open_column: int) -> bool:
+        """Treść template literal aż do ` albo ${ (True = wejście w ${)."""
+        while not scanner.done:
+            char = scanner.peek()
+            if char == "\\":
+                scanner.advance(2)
+                continue
+            if char == "`":
+                scanner.advance()
+                return False
+            if char == "$" and scanner.peek(1) == "{":
+                stack.append(("`", open_line, open_column))
+                scanner.advance(2)
+                return True
+            scanner.advance()
+        error("Niedomknięty template literal (`)", open_line, open_column)
+        return False
+    
+    while not scanner.done:
+        char = scanner.peek()
+        start_line, start_column = scanner.line, scanner.column
+        
+        if char in " \t\r\n":
+            scanner.advance()
+            continue
+        
+        # Escape CSS w selektorze (np. .w-1\/2, \") - następny znak to zwykły znak nazwy
+        if not javascript and char == "\\":
+            scanner.advance(2)
+            continue
+        
+        if char == "/" and scanner.peek(1) == "*":
+            if not _skip_block_comment(scanner):
+                error("Niedomknięty komentarz /* */", start_line, start_column)
+            continue
+        
+        if javascript and char == "/" and scanner.peek(1) == "/":
+            while not scanner.done and scanner.peek() != "\n":
+                scanner.advance()
+            continue
+        
+        if char in "'\"":
+            if not _skip_string(scanner, char):
+                error(f"Niedomknięty string ({char})", start_line, start_column)
+            previous = "a"
+            continue
+        
+        if javascript and char == "`":
+            scanner.advance()
+            scan_template(start_line, start_column)
+            previous = "a"
+            continue
+        
+        if javascript and char == "/" and (not previous or previous in "(,=:[!&|?{};+-*%<>~^"):
+            if _skip_regex(scanner):
+                previous = "a"
+                continue
+        
+        if javascript and (char.isalpha() or char in "_$"):
+            word_start = scanner.pos
+            while scanner.peek().isalnum() or scanner.peek() in "_$":
+                scanner.advance()
+            word = text[word_start:scanner.pos]
+            if word == "var":
+                diagnostics.append(Diagnostic(
+                    filename, start_line, start_column, SEVERITY_WARNING,
+                    "Użyto 'var' zamiast 'const'/'let' (bad practice)"
+                ))
+            # Po słowach kluczowych może wystąpić regex (np. return /x/)
+            previous = "(" if word in ("return", "typeof", "case", "do", "else", "in", "of") else "a"
+            continue
+        
+        scanner.advance()
+        
+        if char in "([{":
+            stack.append((char, start_line, start_column))
+        elif char in ")]}":
+            if stack and stack[-1][0] == "`" and char == "}":
+                # Koniec ${...} - wracamy do treści template literal
+                _, open_line, open_column = stack.pop()
+                scan_template(open_line, open_column)
+                previous = "a"
+                continue
+            if not stack:
+                error(f"Nieoczekiwany '{char}'", start_line, start_column)
+            elif stack[-1][0] != BRACKETS[char]:
+                opener, open_line, open_column = stack.pop()
+                error(
+                    f"Nawias '{char}' nie pasuje do '{opener}' z linii {open_line}:{open_column}",
+                    start_line, start_column
+                )
+            else:
+                _, open_line, _ = stack.pop()
+                if not stack and on_top_level_close is not None:
+                    on_top_level_close(char, open_line, start_line)
+        
+        previous = char
+    
+    for opener, open_line, open_column in stack:
+        label = "`${" if opener == "`" else opener
+        error(f"Niedomknięty '{label}'", open_line, open_column)
+    
+    return diagnostics
+
+
+def top_level_block_ends(content: str, javascript: bool) -> List[int]:
+    """
+    Linie, w których zamykają się bloki najwyższego poziomu (JS/CSS).
+    Liczą się klamry i nawiasy wielolinijkowe - `()` w sygnaturze
+    funkcji nie kończy bloku.
+    
+    Args:
+        content: Treść pliku
+        javascript: True dla JS (template literals, regexy, komentarze //)
+    
+    Returns:
+        Rosnąca lista numerów linii (bez powtórzeń)
+    """
+    ends: List[int] = []
+    
+    def on_close(bracket: str, open_line: int, close_line: int) -> None:
+        if bracket == "}" or open_line != close_line:
+            ends.append(close_line)
+    
+    _scan_brackets("", content, javascript, on_top_level_close=on_close)
+    return sorted(set(ends))
+
+
+@register_checker(".js", ".mjs", ".cjs")
+def check_javascript(filename: str, content: str) -> List[Diagnostic]:
+    """Nawiasy, stringi, komentarze, template literals + ostrzeżenie o var."""
+    return _scan_brackets(filename, content, javascript=True)
+
+
+@register_checker(".css")
+def check_css(filename: str, content: str) -> List[Diagnostic]:
+    """Nawiasy, stringi i komentarze CSS."""
+    return _scan_brackets(filename, content, javascript=False)
+
+
+# === HTML ===
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Elementy, których tag zamykający jest opcjonalny w HTML5
+OPTIONAL_END = {
+    "p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th",
+    "thead", "tbody", "tfoot", "colgroup", "rt", "rp", "caption",
+    "html", "head", "body",
+}
+
+
+class _HTMLStructureParser(HTMLParser):
+    """Zbiera niezbalansowane tagi i sprawdza inline <script>/<style>."""
+    
+    def __init__(self, filename: str):
+        super().__init__(convert_charrefs=True)
+        self.filename = filename
+        self.diagnostics: List[Diagnostic] = []
+        self.stack: List[Tuple[str, int, int]] = []
+        self.has_doctype = False
+        self.has_html = False
+        self._raw_start: Optional[Tuple[int, int]] = None
+    
+    def _position(self) -> Tuple[int, int]:
+        line, offset = self.getpos()
+        return line, offset + 1
+    
+    def _error(self, message: str, line: int, column: int) -> None:
+        self.diagnostics.append(Diagnostic(self.filename, line, column, SEVERITY_ERROR, message))
+    
+    def handle_decl(self, decl: str) -> None:
+        if decl.lower().startswith("doctype html"):
+            self.has_doctype = True
+    
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "html":
+            self.has_html = True
+        if tag in VOID_ELEMENTS:
+            return
+        
+        line, column = self._position()
+        self.stack.append((tag, line, column))
+        
+        if tag in ("script", "style"):
+            # Treść zaczyna się zaraz za tagiem otwierającym
+            text = self.get_starttag_text() or ""
+            lines = text.split("\n")
+            end_column = len(lines[-1]) + (column if len(lines) == 1 else 1)
+            self._raw_start = (line + len(lines) - 1, end_column)
+    
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        if tag == "html":
+            self.has_html = True
+    
+    def handle_data(self, data: str) -> None:
+        if not self._raw_start or not self.stack or not data.strip():
+            return
+        
+        tag = self.stack[-1][0]
+        line, column = self._raw_start
+        self.diagnostics.extend(
+            _scan_brackets(self.filename, data, javascript=(tag == "script"), line=line, column=column)
+        )
+    
+    def handle_endtag(self, tag: str) -> None:
+        self._raw_start = None
+        if tag in VOID_ELEMENTS:
+            return
+        
+        line, column = self._position()
+        open_tags = [name for name, _, _ in self.stack]
+        
+        if tag not in open_tags:
+            self._error(f"Zamknięcie </{tag}> bez otwarcia", line, column)
+            return
+        
+        while self.stack:
+            name, open_line, open_column = self.stack.pop()
+            if name == tag:
+                break
+            if name not in OPTIONAL_END:
+                self._error(
+                    f"Niedomknięty <{name}> (zamknięty przez </{tag}> w linii {line})",
+                    open_line, open_column
+                )
+    
+    def finish(self) -> List[Diagnostic]:
+        """Domyka parser i raportuje tagi otwarte do końca pliku."""
+        self.close()
+        
+        for name, line, column in self.stack:
+            if name not in OPTIONAL_END:
+                self._error(f"Niedomknięty <{name}>", line, column)
+        
+        if not self.has_doctype:
+            self.diagnostics.insert(0, Diagnostic(
+                self.filename, 1, 1, SEVERITY_ERROR, "Brakuje <!DOCTYPE html>"
+            ))
+        if not self.has_html:
+            self.diagnostics.insert(0, Diagnostic(
+                self.filename, 1, 1, SEVERITY_ERROR, "Brakuje tagów <html>"
+            ))
+        
+        return self.diagnostics
+
+
+@register_checker(".html", ".htm")
+def check_html(filename: str, content: str) -> List[Diagnostic]:
+    """DOCTYPE, <html>, balans tagów oraz inline <script>/<style>."""
+    parser = _HTMLStructureParser(filename)
+    parser.feed(content)
+    return parser.finish()
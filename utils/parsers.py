@@ -4,9 +4,10 @@ Parsery odpowiedzi LLM.
 Wyodrębnione z developer.py dla lepszej modularności.
 """
 
+import ast
 import re
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -122,6 +123,65 @@ def parse_code_blocks(text: str) -> Dict[str, str]:
     return {}
 
 
+class StreamingCodeBlockParser:
+    """
+    Przyrostowy parser bloków `--- filename ---` dla strumienia tokenów.
+    
+    Każdy blok jest zwracany z feed() zaraz po dotarciu zamykającego ```,
+    dzięki czemu pliki można wyświetlać i zapisywać jeden po drugim.
+    finish() parsuje całość przez parse_code_blocks (pozostałe formaty).
+    """
+    
+    _BLOCK_PATTERN = re.compile(r'---\s*([^\n]+?)\s*---\s*```(?:\w+)?\n(.*?)```', re.DOTALL)
+    
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self.emitted: Dict[str, str] = {}
+    
+    @property
+    def text(self) -> str:
+        """Cała dotychczas otrzymana odpowiedź."""
+        return self._buffer
+    
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Dokłada fragment odpowiedzi i zwraca nowo zamknięte bloki.
+        
+        Args:
+            chunk: Kolejny fragment tekstu z LLM
+        
+        Returns:
+            Lista (filename, code) dla bloków zakończonych w tym fragmencie
+        """
+        self._buffer += chunk
+        completed = []
+        
+        while True:
+            match = self._BLOCK_PATTERN.search(self._buffer, self._pos)
+            if not match:
+                break
+            
+            self._pos = match.end()
+            filename = match.group(1).strip()
+            code = match.group(2).strip()
+            
+            if filename and code:
+                self.emitted[filename] = code
+                completed.append((filename, code))
+        
+        return completed
+    
+    def finish(self) -> Dict[str, str]:
+        """
+        Kończy parsowanie całej odpowiedzi.
+        
+        Returns:
+            Dict[filename, code_content] - taki sam jak z parse_code_blocks
+        """
+        return parse_code_blocks(self._buffer)
+
+
 def extract_file_list(tech_stack_response: str) -> List[str]:
     """
     Wyciąga listę plików z JSON-a w odpowiedzi Architekta.
@@ -147,6 +207,87 @@ def extract_file_list(tech_stack_response: str) -> List[str]:
     return []
 
 
+def find_mentioned_files(text: str, filenames: List[str]) -> List[str]:
+    """
+    Zwraca pliki z listy wymienione w tekście (np. w feedbacku QA).
+    Plik pasuje po pełnej ścieżce lub samej nazwie ("game.js" ~ "static/game.js").
+    
+    Args:
+        text: Tekst do przeszukania
+        filenames: Kandydaci (kolejność zachowana w wyniku)
+    
+    Returns:
+        Lista wymienionych plików
+    """
+    mentioned = []
+    
+    for filename in filenames:
+        names = {filename, filename.replace("\\", "/").rsplit("/", 1)[-1]}
+        for name in names:
+            if re.search(rf'(?<![\w./\\-]){re.escape(name)}(?![\w-])', text):
+                mentioned.append(filename)
+                break
+    
+    return mentioned
+
+
+def _python_signatures(content: str) -> List[str]:
+    """Sygnatury top-level funkcji i klas (z metodami) pliku Pythona."""
+    tree = ast.parse(content)
+    lines = []
+    
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+            returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+            lines.append(f"{prefix} {node.name}({ast.unparse(node.args)}){returns}")
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(b) for b in node.bases)
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    lines.append(f"    def {item.name}({ast.unparse(item.args)})")
+        elif isinstance(node, ast.Assign):
+            names = [t.id for t in node.targets if isinstance(t, ast.Name) and t.id.isupper()]
+            lines.extend(f"{name} = ..." for name in names)
+    
+    return lines
+
+
+def extract_signatures(filename: str, content: str, max_lines: int = 40) -> str:
+    """
+    Wyciąga interfejs pliku (sygnatury, selektory, id) bez implementacji.
+    Używane do informowania o plikach generowanych równolegle.
+    
+    Args:
+        filename: Nazwa pliku
+        content: Zawartość pliku
+        max_lines: Limit linii wyniku
+    
+    Returns:
+        Skrócony opis interfejsu pliku
+    """
+    lines: List[str] = []
+    
+    if filename.endswith(".py"):
+        try:
+            lines = _python_signatures(content)
+        except SyntaxError:
+            lines = [l.strip() for l in content.splitlines() if re.match(r'\s*(def|class)\s', l)]
+    elif filename.endswith((".js", ".ts")):
+        pattern = r'^\s*(export\s+|async\s+)*(function\s+\w+\s*\([^)]*\)|class\s+\w+|(const|let)\s+\w+\s*=\s*(async\s*)?\([^)]*\)\s*=>|module\.exports.*)'
+        lines = [m.group(0).strip() for m in re.finditer(pattern, content, re.MULTILINE)]
+    elif filename.endswith(".html"):
+        lines = [f'id="{i}"' for i in re.findall(r'\bid="([^"]+)"', content)]
+        lines += re.findall(r'(?:src|href)="[^"]+"', content)
+    elif filename.endswith(".css"):
+        lines = [m.strip() for m in re.findall(r'^([^{}\n]+)\{', content, re.MULTILINE)]
+    else:
+        lines = content.splitlines()[:5]
+    
+    return "\n".join(lines[:max_lines])
+
+
 def extract_json_from_response(response: str) -> Optional[dict]:
     """
     Wyodrębnia pierwszy blok JSON z odpowiedzi LLM.
@@ -162,12 +303,22 @@ def extract_json_from_response(response: str) -> Optional[dict]:
         json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
         if json_match:
             return json.loads(json_match.group(1))
-        
-        # Próbujemy też bez markdown
+    except json.JSONDecodeError:
+        pass
+    
+    # Bez markdown - od pierwszej do ostatniej klamry (obsługuje zagnieżdżenia)
+    start, end = response.find("{"), response.rfind("}")
+    if 0 <= start < end:
+        try:
+            return json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            pass
+    
+    try:
+        # Pierwszy płaski obiekt w tekście
         json_match = re.search(r'\{[^{}]*\}', response, re.DOTALL)
         if json_match:
             return json.loads(json_match.group(0))
-            
     except json.JSONDecodeError:
         pass
     
@@ -0,0 +1,118 @@
+# utils/sqlite.py
+"""
+Wspólne narzędzia SQLite dla cache, manifestu RAG i kolejki ingestu:
+krótkotrwałe połączenia w trybie WAL oraz eviction LRU po rozmiarze
+z łącznym rozmiarem utrzymywanym przez triggery.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+@contextmanager
+def connect(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """
+    Krótkotrwałe połączenie z commitem (sqlite3 nie dzieli połączeń między wątkami).
+    
+    Args:
+        db_path: Ścieżka do pliku bazy
+    
+    Yields:
+        Połączenie - commit po wyjściu bez wyjątku, zamknięcie zawsze
+    """
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@dataclass(frozen=True)
+class LRUTable:
+    """
+    Tabela z kolumną last_access i limitem łącznego rozmiaru.
+    
+    Łączny rozmiar wierszy trzyma jednowierszowa tabela (size_table)
+    aktualizowana triggerami, więc zapis i statystyki nie sumują całej
+    tabeli. Wiersze trzeba zapisywać upsertem - INSERT OR REPLACE nie
+    uruchamia triggera DELETE.
+    """
+    
+    table: str
+    keys: Tuple[str, ...]
+    size_column: str
+    # Rozmiar to LENGTH(size_column) (np. BLOB) zamiast wartości kolumny
+    length_of: bool = False
+    size_table: Optional[str] = None
+    
+    @property
+    def _size_table(self) -> str:
+        return self.size_table or f"{self.table}_size"
+    
+    def _size(self, row: str = "") -> str:
+        column = f"{row}{self.size_column}"
+        return f"LENGTH({column})" if self.length_of else column
+    
+    def create(self, conn: sqlite3.Connection) -> None:
+        """
+        Tworzy tabelę rozmiaru i triggery (tabela danych musi już istnieć).
+        
+        Args:
+            conn: Połączenie z connect()
+        """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self._size_table} (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                total INTEGER NOT NULL
+            )
+        """)
+        # Jednorazowo dla bazy sprzed śledzenia rozmiaru, potem tylko triggery
+        conn.execute(
+            f"INSERT OR IGNORE INTO {self._size_table} "
+            f"SELECT 0, COALESCE(SUM({self._size()}), 0) FROM {self.table}"
+        )
+        conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS {self.table}_size_insert AFTER INSERT ON {self.table}
+            BEGIN UPDATE {self._size_table} SET total = total + {self._size("NEW.")}; END;
+            CREATE TRIGGER IF NOT EXISTS {self.table}_size_delete AFTER DELETE ON {self.table}
+            BEGIN UPDATE {self._size_table} SET total = total - {self._size("OLD.")}; END;
+            CREATE TRIGGER IF NOT EXISTS {self.table}_size_update AFTER UPDATE OF {self.size_column} ON {self.table}
+            BEGIN UPDATE {self._size_table} SET total = total + {self._size("NEW.")} - {self._size("OLD.")}; END;
+        """)
+    
+    def total_size(self, conn: sqlite3.Connection) -> int:
+        """Łączny rozmiar wierszy (utrzymywany przez triggery)."""
+        return conn.execute(f"SELECT total FROM {self._size_table}").fetchone()[0]
+    
+    def evict(self, conn: sqlite3.Connection, max_size_bytes: int) -> int:
+        """
+        LRU eviction - usuwa najdawniej używane wiersze dopóki tabela jest za duża.
+        
+        Args:
+            conn: Połączenie z connect()
+            max_size_bytes: Limit łącznego rozmiaru
+        
+        Returns:
+            Liczba usuniętych wierszy
+        """
+        total = self.total_size(conn)
+        if total <= max_size_bytes:
+            return 0
+        
+        to_delete = []
+        for *key, size in conn.execute(
+            f"SELECT {', '.join(self.keys)}, {self._size()} FROM {self.table} ORDER BY last_access"
+        ):
+            if total <= max_size_bytes:
+                break
+            to_delete.append(tuple(key))
+            total -= size
+        
+        where = " AND ".join(f"{key} = ?" for key in self.keys)
+        conn.executemany(f"DELETE FROM {self.table} WHERE {where}", to_delete)
+        return len(to_delete)
@@ -0,0 +1,162 @@
+# utils/stream_guard.py
+"""
+Wykrywanie zdegenerowanych odpowiedzi LLM w trakcie streamingu.
+Lokalne modele potrafią wpaść w pętlę i wypełnić cały num_predict
+tą samą linią - guard pozwala przerwać taką generację wcześnie.
+"""
+
+from collections import deque
+from typing import List, Optional
+
+from utils.token_budget import CHARS_PER_TOKEN, estimate_tokens
+
+REASON_REPEATED_LINES = "repeated_lines"
+REASON_RUNAWAY_LINE = "runaway_line"
+REASON_UNTERMINATED_FENCE = "unterminated_fence"
+
+
+def _has_shorter_period(block: List[str]) -> bool:
+    """Czy blok to powtórzenie krótszego bloku (sprawdzany osobno, z własnym progiem)."""
+    size = len(block)
+    return any(
+        size % period == 0 and block == block[:period] * (size // period)
+        for period in range(1, size)
+    )
+
+
+class StreamGuard:
+    """
+    Obserwuje kolejne fragmenty odpowiedzi i zgłasza degenerację:
+    
+    - repeated_lines: ta sama linia (lub blok do max_block_period linii)
+      powtórzona wiele razy z rzędu,
+    - runaway_line: pojedyncza linia dłuższa niż max_line_chars,
+    - unterminated_fence: num_predict skończył się w otwartym bloku ```
+      (finish()), a przy max_fence_tokens > 0 także blok dłuższy niż limit.
+    
+    Progi są wysokie celowo - np. siatka planszy w grze to kilkanaście
+    identycznych linii i nie może przerwać poprawnej generacji. Długość
+    bloku kodu sama w sobie nie świadczy o pętli (duży plik to jeden blok),
+    dlatego domyślnie blok jest zgłaszany dopiero po wyczerpaniu budżetu.
+    """
+    
+    def __init__(
+        self,
+        max_line_repeats: int = 30,
+        max_block_repeats: int = 10,
+        max_block_period: int = 8,
+        max_line_chars: int = 4000,
+        max_fence_tokens: int = 0
+    ):
+        self.max_line_repeats = max_line_repeats
+        self.max_block_repeats = max_block_repeats
+        self.max_block_period = max_block_period
+        self.max_line_chars = max_line_chars
+        self.max_fence_chars = int(max_fence_tokens * CHARS_PER_TOKEN) if max_fence_tokens > 0 else None
+        
+        window = max(max_line_repeats, max_block_repeats * max_block_period)
+        self._lines: deque = deque(maxlen=window)
+        self._parts: List[str] = []
+        self._current: List[str] = []
+        self._current_len = 0
+        self._in_fence = False
+        self._fence_chars = 0
+        self.reason: Optional[str] = None
+    
+    @property
+    def text(self) -> str:
+        """Cały dotychczasowy tekst."""
+        return "".join(self._parts)
+    
+    @property
+    def tokens(self) -> int:
+        """Szacowana liczba wygenerowanych tokenów."""
+        return estimate_tokens(self.text)
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Dodaje fragment odpowiedzi.
+        
+        Args:
+            chunk: Kolejny fragment tekstu
+        
+        Returns:
+            Powód degeneracji (REASON_*) lub None gdy odpowiedź wygląda normalnie
+        """
+        if self.reason or not chunk:
+            return self.reason
+        
+        self._parts.append(chunk)
+        
+        for i, piece in enumerate(chunk.split("\n")):
+            if i > 0:
+                self._end_line()
+                if self.reason:
+                    return self.reason
+            
+            self._current.append(piece)
+            self._current_len += len(piece)
+            if self._in_fence:
+                self._fence_chars += len(piece)
+            
+            if self._current_len > self.max_line_chars:
+                self.reason = REASON_RUNAWAY_LINE
+            elif self.max_fence_chars and self._fence_chars > self.max_fence_chars:
+                self.reason = REASON_UNTERMINATED_FENCE
+            
+            if self.reason:
+                return self.reason
+        
+        return None
+    
+    def finish(self, done_reason: Optional[str]) -> Optional[str]:
+        """
+        Koniec streamu - blok ``` otwarty w chwili wyczerpania num_predict
+        oznacza urwany plik.
+        
+        Args:
+            done_reason: Powód zakończenia z odpowiedzi Ollama ("length" = limit num_predict)
+        
+        Returns:
+            Powód degeneracji (REASON_*) lub None
+        """
+        closing = "".join(self._current).lstrip().startswith("```")
+        if not self.reason and done_reason == "length" and self._in_fence and not closing:
+            self.reason = REASON_UNTERMINATED_FENCE
+        return self.reason
+    
+    def _end_line(self) -> None:
+        """Zamyka bieżącą linię i sprawdza powtórzenia."""
+        line = "".join(self._current).rstrip()
+        self._current = []
+        self._current_len = 0
+        
+        if line.lstrip().startswith("```"):
+            self._in_fence = not self._in_fence
+            self._fence_chars = 0
+        elif self._in_fence:
+            self._fence_chars += 1
+        
+        self._lines.append(line)
+        if self._is_repeating():
+            self.reason = REASON_REPEATED_LINES
+    
+    def _is_repeating(self) -> bool:
+        """Czy końcówka to ten sam blok (1..max_block_period linii) powtórzony wiele razy."""
+        lines = list(self._lines)
+        
+        for period in range(1, self.max_block_period + 1):
+            repeats = self.max_line_repeats if period == 1 else self.max_block_repeats
+            span = period * repeats
+            if len(lines) < span:
+                continue
+            
+            block = lines[-period:]
+            if not any(line.strip() for line in block) or _has_shorter_period(block):
+                continue
+            
+            tail = lines[-span:]
+            if all(tail[i] == block[i % period] for i in range(span)):
+                return True
+        
+        return False
@@ -0,0 +1,179 @@
+# utils/token_budget.py
+"""
+Budżet tokenów promptu względem num_ctx.
+Szacuje rozmiar promptu, rezerwuje miejsce na odpowiedź i przycina
+sekcje o najniższym priorytecie (RAG, feedback), żeby prompt się zmieścił.
+"""
+
+import math
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Tuple
+
+# Konserwatywne przybliżenie dla kodu i polskiego tekstu (bez tokenizera modelu)
+CHARS_PER_TOKEN = 3.0
+
+# Priorytety sekcji - niższe są przycinane jako pierwsze
+SECTION_LOW = 0
+SECTION_NORMAL = 1
+SECTION_HIGH = 2
+SECTION_REQUIRED = 3  # nigdy nie przycinane
+
+TRIM_MARKER = "\n[... pominięto ~{tokens} tokenów ...]\n"
+MARKER_TOKENS = math.ceil(len(TRIM_MARKER) / CHARS_PER_TOKEN) + 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Szacuje liczbę tokenów tekstu.
+    
+    Args:
+        text: Dowolny tekst
+    
+    Returns:
+        Przybliżona liczba tokenów
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptSection:
+    """
+    Fragment wiadomości do LLM z priorytetem przycinania.
+    
+    Atrybuty:
+        name: Nazwa sekcji (do logów)
+        content: Treść sekcji
+        priority: SECTION_LOW .. SECTION_REQUIRED
+        keep: Która część zostaje po przycięciu: "head", "tail" lub "middle" (początek + koniec)
+    """
+    name: str
+    content: str
+    priority: int = SECTION_NORMAL
+    keep: str = "head"
+
+
+@dataclass
+class BudgetReport:
+    """Wynik dopasowania promptu do budżetu."""
+    num_ctx: int
+    output_reserve: int
+    prompt_tokens: int
+    trimmed: Dict[str, int] = field(default_factory=dict)
+    
+    @property
+    def available(self) -> int:
+        """Ile tokenów może zająć prompt."""
+        return self.num_ctx - self.output_reserve
+    
+    @property
+    def fits(self) -> bool:
+        """Czy prompt mieści się w budżecie."""
+        return self.prompt_tokens <= self.available
+    
+    def summary(self) -> str:
+        """Krótki opis do logów."""
+        usage = self.prompt_tokens / self.available * 100 if self.available else 100.0
+        text = (
+            f"prompt ~{self.prompt_tokens}/{self.available} tokenów ({usage:.0f}%), "
+            f"rezerwa na odpowiedź {self.output_reserve}, num_ctx {self.num_ctx}"
+        )
+        if self.trimmed:
+            cut = ", ".join(f"{name} -{tokens}" for name, tokens in self.trimmed.items())
+            text += f"; przycięto: {cut}"
+        return text
+
+
+def _trim_text(text: str, max_chars: int, keep: str) -> str:
+    """Skraca tekst do max_chars znaków (plus znacznik pominięcia)."""
+    if len(text) <= max_chars:
+        return text
+    
+    marker = TRIM_MARKER.format(tokens=estimate_tokens(text) - estimate_tokens(text[:max_chars]))
+    
+    if max_chars <= 0:
+        return marker
+    if keep == "tail":
+        return marker + text[-max_chars:]
+    if keep == "middle":
+        half = max_chars // 2
+        return text[:half] + marker + text[-(max_chars - half):]
+    return text[:max_chars] + marker
+
+
+class TokenBudget:
+    """
+    Dopasowuje sekcje promptu do okna kontekstu.
+    
+    Budżet promptu = num_ctx - rezerwa na odpowiedź. Gdy sekcje się nie
+    mieszczą, przycinane są od najniższego priorytetu (przy równym
+    priorytecie - proporcjonalnie do rozmiaru), aż prompt zmieści się w budżecie.
+    """
+    
+    def __init__(self, num_ctx: int, output_reserve: int):
+        self.num_ctx = num_ctx
+        self.output_reserve = min(output_reserve, num_ctx // 2)
+    
+    @property
+    def available(self) -> int:
+        """Ile tokenów może zająć cały prompt."""
+        return self.num_ctx - self.output_reserve
+    
+    def fit(
+        self,
+        sections: List[PromptSection],
+        fixed_tokens: int = 0
+    ) -> Tuple[List[PromptSection], BudgetReport]:
+        """
+        Przycina sekcje tak, żeby prompt zmieścił się w budżecie.
+        
+        Args:
+            sections: Sekcje wiadomości użytkownika
+            fixed_tokens: Tokeny, których nie da się przyciąć (np. prompt systemowy)
+        
+        Returns:
+            (przycięte sekcje w oryginalnej kolejności, raport)
+        """
+        fitted = list(sections)
+        sizes = [estimate_tokens(s.content) for s in fitted]
+        total = fixed_tokens + sum(sizes)
+        trimmed: Dict[str, int] = {}
+        
+        levels = sorted({s.priority for s in fitted if s.priority < SECTION_REQUIRED})
+        
+        for level in levels:
+            if total <= self.available:
+                break
+            
+            # Sekcje o równym priorytecie tracą proporcjonalnie do swojego rozmiaru
+            group = [i for i, s in enumerate(fitted) if s.priority == level]
+            group_size = sum(sizes[i] for i in group)
+            excess = total - self.available
+            
+            for i in group:
+                if not group_size or not sizes[i]:
+                    continue
+                
+                share = math.ceil(excess * sizes[i] / group_size)
+                section = fitted[i]
+                max_chars = max(0, len(section.content) - int((share + MARKER_TOKENS) * CHARS_PER_TOKEN))
+                
+                new_content = _trim_text(section.content, max_chars, section.keep)
+                new_size = estimate_tokens(new_content)
+                
+                if new_size >= sizes[i]:
+                    continue
+                
+                trimmed[section.name] = trimmed.get(section.name, 0) + sizes[i] - new_size
+                total -= sizes[i] - new_size
+                sizes[i] = new_size
+                fitted[i] = replace(section, content=new_content)
+        
+        report = BudgetReport(
+            num_ctx=self.num_ctx,
+            output_reserve=self.output_reserve,
+            prompt_tokens=total,
+            trimmed=trimmed
+        )
+        return fitted, report